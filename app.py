@@ -54,6 +54,7 @@ from contextlib import contextmanager
 from nodes.electrumx import ElectrumXClient
 from electrumx.address import get_address_overview
 from core.electrumx_service import get_electrumx_client
+from core import chart_series, chart_payload
 
 
 
@@ -85,6 +86,7 @@ from core.redis_keys import (
     # ---- MEMPOOL
     MEMPOOL_STATIC_KEY,
     MEMPOOL_DYNAMIC_CACHE,
+    MEMPOOL_PROJECTED_BLOCKS_KEY,
 
     # ---- NETWORK
     NETWORK_DYNAMIC_CACHE,
@@ -155,12 +157,14 @@ from core.redis_keys import (
     BTC_TX_VOLUME_1M,
     BTC_TX_VOLUME_1Y,
     BTC_TX_VOLUME_STATS,
+    BTC_TX_VOLUME_OPEN_BUCKETS,
 
     # ---- METRICS_BTC_TX_FEES
     BTC_TX_FEES_24H,
     BTC_TX_FEES_1W,
     BTC_TX_FEES_1M,
     BTC_TX_FEES_1Y,
+    BTC_TX_FEES_OPEN_BUCKETS,
 
 
 
@@ -229,7 +233,10 @@ from core.redis_keys import (
     INFO_DASHBOARD_TRAFFIC_1W,  
     INFO_DASHBOARD_TRAFFIC_1M,  
     INFO_DASHBOARD_TRAFFIC_1Y,  
+    DASHBOARD_TRAFFIC_OPEN_BUCKETS,
 
+    # ---- CHART SERIES
+    CHART_SERIES_MODE,
 
 )
 
@@ -291,6 +298,9 @@ except Exception as e:
     print(f"❌ Fehler bei Redis-Verbindung: {e}")
     r = None
 
+# Binär-Client für vorkomprimierte Chart-Payloads (gzip/brotli, core.chart_payload)
+r_bin = redis.Redis(host='localhost', port=6379, db=0, decode_responses=False)
+
 
 # =====================
 # 🟢 JSON-LOAD-FUNKTION
@@ -570,23 +580,11 @@ def api_dashboard_traffic(range: str):
     - read only
     """
 
-    key_map = {
-        "1h":  INFO_DASHBOARD_TRAFFIC_1H,
-        "24h": INFO_DASHBOARD_TRAFFIC_24H,
-        "1w":  INFO_DASHBOARD_TRAFFIC_1W,
-        "1m":  INFO_DASHBOARD_TRAFFIC_1M,
-        "1y":  INFO_DASHBOARD_TRAFFIC_1Y,
-    }
-
-    redis_key = key_map.get(range)
+    redis_key = CHART_RANGE_KEYS["dashboard_traffic"].get(range)
     if not redis_key:
         return jsonify({"history": []})
 
-    raw = r.get(redis_key)
-    if not raw:
-        return jsonify({"history": []})
-
-    return raw, 200, {"Content-Type": "application/json"}
+    return _redis_chart_response(redis_key, "dashboard_traffic", range)
 
 
 ## ================================================================================================================================================================ ##
@@ -1250,37 +1248,65 @@ def metrics_btc_usd_eur():
 
 ## ================================================================================================================================================================ ##
 
+# ===============================================================
+# 🗜️ Vorkomprimierte Chart-Payloads (gzip/brotli + ETag → 304)
+# ===============================================================
+def _chart_payload_response(key: str):
+    """
+    Liefert <key> als gzip/brotli/identity je nach Accept-Encoding.
+    ETag pro Encoding (chart_payload.variant_etag) → Caches mischen keine Repräsentationen.
+    If-None-Match == ETag → 304, ohne den Body aus Redis zu laden.
+    """
+    encoding = chart_payload.pick_encoding(request.headers.get("Accept-Encoding", ""))
+
+    etag = chart_payload.read_etag(r_bin, key)
+    if etag and request.if_none_match.contains(chart_payload.variant_etag(etag, encoding)):
+        resp = Response(status=304)
+        resp.set_etag(chart_payload.variant_etag(etag, encoding))
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+    etag, body, encoding = chart_payload.read(r_bin, key, encoding)
+
+    if body is None:
+        return Response(
+            json.dumps({"history": []}),
+            mimetype="application/json"
+        )
+
+    # Variante kann schwächer sein als angefragt (z. B. kein brotli) → ETag der gelieferten Bytes
+    etag = chart_payload.variant_etag(etag, encoding)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+
+    resp.set_etag(etag)
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+
 # ======================================================
 # 🌐 METRICS_DIFFICULTY API     --RAM-ONLY--  --NODE I--
 # ======================================================
 
 @app.route("/api/difficulty/1y")
 def api_difficulty_1y():
-    raw = r.get("CHART_BTC_DIFFICULTY_1y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_DIFFICULTY_1y")
 
 @app.route("/api/difficulty/5y")
 def api_difficulty_5y():
-    raw = r.get("CHART_BTC_DIFFICULTY_5y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_DIFFICULTY_5y")
 
 @app.route("/api/difficulty/10y")
 def api_difficulty_10y():
-    raw = r.get("CHART_BTC_DIFFICULTY_10y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_DIFFICULTY_10y")
 
 @app.route("/api/difficulty/ever")
 def api_difficulty_ever():
-    raw = r.get("CHART_BTC_DIFFICULTY_ever")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_DIFFICULTY_ever")
 
 ## ================================================================================================================================================================ ##
 
@@ -1288,50 +1314,185 @@ def api_difficulty_ever():
 # 🔹 BTC_TX_VOLUME_WORKER                                --RAM-ONLY--
 # ===================================================================
 
-def _redis_chart_response(key: str):
-    raw = r.get(key)
+# ==========================================================
+# 📊 Chart-Helper (RAM-ONLY, SAFE) – BTC_TX_VOLUME, BTC_TX_FEES, DASHBOARD_TRAFFIC
+CHART_RANGE_KEYS = {
+    "btc_tx_volume": {
+        "1h":  BTC_TX_VOLUME_1H,
+        "24h": BTC_TX_VOLUME_24H,
+        "1w":  BTC_TX_VOLUME_1W,
+        "1m":  BTC_TX_VOLUME_1M,
+        "1y":  BTC_TX_VOLUME_1Y,
+    },
+    "btc_tx_fees": {
+        "24h": BTC_TX_FEES_24H,
+        "1w":  BTC_TX_FEES_1W,
+        "1m":  BTC_TX_FEES_1M,
+        "1y":  BTC_TX_FEES_1Y,
+    },
+    "dashboard_traffic": {
+        "1h":  INFO_DASHBOARD_TRAFFIC_1H,
+        "24h": INFO_DASHBOARD_TRAFFIC_24H,
+        "1w":  INFO_DASHBOARD_TRAFFIC_1W,
+        "1m":  INFO_DASHBOARD_TRAFFIC_1M,
+        "1y":  INFO_DASHBOARD_TRAFFIC_1Y,
+    },
+}
 
-    if not raw:
-        return Response(
-            json.dumps({"history": []}),
-            mimetype="application/json"
-        )
+CHART_OPEN_BUCKET_KEYS = {
+    "btc_tx_volume":     BTC_TX_VOLUME_OPEN_BUCKETS,
+    "btc_tx_fees":       BTC_TX_FEES_OPEN_BUCKETS,
+    "dashboard_traffic": DASHBOARD_TRAFFIC_OPEN_BUCKETS,
+}
+
+
+def _chart_points(key: str, t0=None, t1=None) -> list:
+    """Punkte mit t0 <= x <= t1 – aus <key>_ZSET, sonst aus dem gefilterten JSON-Blob."""
+    if r.exists(chart_series.zset_key(key)):
+        return chart_series.read_range(r, key, t0, t1)
+
+    try:
+        history = json.loads(r.get(key) or "{}").get("history", [])
+    except Exception:
+        return []
+
+    return [
+        p for p in history
+        if (t0 is None or p["x"] >= t0) and (t1 is None or p["x"] <= t1)
+    ]
 
-    if isinstance(raw, (bytes, bytearray)):
-        raw = raw.decode()
 
+def _chart_open_point(series: str, window: str):
+    """Aktueller (offener) Bucket als {"x", "y"} aus *_OPEN_BUCKETS, sonst None."""
     try:
-        json.loads(raw)
+        ob = json.loads(r.get(CHART_OPEN_BUCKET_KEYS[series]) or "{}").get(window)
+        if not ob or ob.get("cur_bucket") is None:
+            return None
+
+        if "sum_vbytes" in ob:
+            vb = float(ob.get("sum_vbytes", 0))
+            if vb <= 0:
+                return None
+            y = round(float(ob.get("sum_fee", 0)) / vb, 2)
+        else:
+            y = ob.get("bucket_sum", 0)
+            if y <= 0:
+                return None
+
+        return {"x": int(ob["cur_bucket"]), "y": y}
     except Exception:
+        return None
+
+
+def _int_args(*names):
+    """
+    Optionale int-Query-Parameter → (werte, None); fehlt einer → None.
+    Gesetzt, aber keine Zahl → (None, name) → Aufrufer antwortet 400 (statt still alles zu liefern).
+    """
+    values = []
+    for name in names:
+        raw = request.args.get(name)
+        if raw is None:
+            values.append(None)
+            continue
+        try:
+            values.append(int(raw))
+        except ValueError:
+            return None, name
+    return values, None
+
+
+def _bad_arg_response(name: str):
+    return jsonify({"error": f"invalid '{name}' (expected integer ts_ms)"}), 400
+
+
+def _redis_chart_response(key: str, series: str = None, window: str = None):
+    """
+    Ohne Parameter: komplette Historie (vorkomprimiert, ETag / 304 – siehe _chart_payload_response;
+    CHART_SERIES_MODE = "zset" → kein JSON-Blob, Historie aus dem ZSET).
+    ?since=<ts_ms>: nur abgeschlossene Buckets mit x > since + offener Bucket
+    → {"history": [...], "open": {"x", "y"} | null, "since": since}
+    """
+    args, bad = _int_args("since")
+    if bad:
+        return _bad_arg_response(bad)
+    since, = args
+
+    if since is not None and series:
         return Response(
-            json.dumps({"history": []}),
+            json.dumps({
+                "history": _chart_points(key, since + 1),
+                "open": _chart_open_point(series, window),
+                "since": since,
+            }, separators=(",", ":")),
+            mimetype="application/json"
+        )
+
+    if CHART_SERIES_MODE == "zset":
+        return Response(
+            json.dumps({"history": _chart_points(key)}, separators=(",", ":")),
             mimetype="application/json"
         )
 
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response(key)
+
+
+# ==========================================
+# 📈 Range-Abfrage (Sorted Set, ZRANGEBYSCORE)
+def _redis_chart_range_response(series: str, window: str):
+    """
+    ?from=<ts_ms>&to=<ts_ms> (beide optional, inklusiv) → {"history": [...]}, ungültige Zahl → 400.
+    Quelle: <key>_ZSET; ohne ZSET (CHART_SERIES_MODE = "json") → JSON-Blob gefiltert.
+    """
+    key = CHART_RANGE_KEYS.get(series, {}).get(window)
+    if not key:
+        return jsonify({"error": "unknown series"}), 404
+
+    args, bad = _int_args("from", "to")
+    if bad:
+        return _bad_arg_response(bad)
+    t0, t1 = args
+
+    return Response(
+        json.dumps({"history": _chart_points(key, t0, t1)}, separators=(",", ":")),
+        mimetype="application/json"
+    )
+
+
+@app.route("/api/btc_tx_volume/<window>/range")
+def api_btc_tx_volume_range(window: str):
+    return _redis_chart_range_response("btc_tx_volume", window)
+
+@app.route("/api/btc_tx_fees/<window>/range")
+def api_btc_tx_fees_range(window: str):
+    return _redis_chart_range_response("btc_tx_fees", window)
+
+@app.route("/api/dashboard_traffic/<window>/range")
+def api_dashboard_traffic_range(window: str):
+    return _redis_chart_range_response("dashboard_traffic", window)
 
 
 # ===============
 # Chart Endpoints
 @app.route("/api/btc_tx_volume/1h")
 def api_btc_tx_volume_1h():
-    return _redis_chart_response(BTC_TX_VOLUME_1H)
+    return _redis_chart_response(BTC_TX_VOLUME_1H, "btc_tx_volume", "1h")
 
 @app.route("/api/btc_tx_volume/24h")
 def api_btc_tx_volume_24h():
-    return _redis_chart_response(BTC_TX_VOLUME_24H)
+    return _redis_chart_response(BTC_TX_VOLUME_24H, "btc_tx_volume", "24h")
 
 @app.route("/api/btc_tx_volume/1w")
 def api_btc_tx_volume_1w():
-    return _redis_chart_response(BTC_TX_VOLUME_1W)
+    return _redis_chart_response(BTC_TX_VOLUME_1W, "btc_tx_volume", "1w")
 
 @app.route("/api/btc_tx_volume/1m")
 def api_btc_tx_volume_1m():
-    return _redis_chart_response(BTC_TX_VOLUME_1M)
+    return _redis_chart_response(BTC_TX_VOLUME_1M, "btc_tx_volume", "1m")
 
 @app.route("/api/btc_tx_volume/1y")
 def api_btc_tx_volume_1y():
-    return _redis_chart_response(BTC_TX_VOLUME_1Y)
+    return _redis_chart_response(BTC_TX_VOLUME_1Y, "btc_tx_volume", "1y")
 
 
 # =====
@@ -1391,50 +1552,25 @@ def api_txamount_history():
 # 🔹 BTC_TX_FEE_WORKER                                --RAM-ONLY--
 # ===================================================================
 
-# ======================================
-# 📊 Redis Chart Helper (RAM-ONLY, SAFE)
-def _redis_chart_response(key: str):
-    raw = r.get(key)
-
-    if not raw:
-        return Response(
-            json.dumps({"history": []}),
-            mimetype="application/json"
-        )
-
-    if isinstance(raw, (bytes, bytearray)):
-        raw = raw.decode()
-
-    try:
-        json.loads(raw)
-    except Exception:
-        return Response(
-            json.dumps({"history": []}),
-            mimetype="application/json"
-        )
-
-    return Response(raw, mimetype="application/json")
-
-
 # =============================================
 # 📊 API: BTC_TX_FEES              --RAM-ONLY--
 # =============================================
 
 @app.route("/api/btc_tx_fees/24h")
 def api_btc_tx_fees_24h():
-    return _redis_chart_response(BTC_TX_FEES_24H)
+    return _redis_chart_response(BTC_TX_FEES_24H, "btc_tx_fees", "24h")
 
 @app.route("/api/btc_tx_fees/1w")
 def api_btc_tx_fees_1w():
-    return _redis_chart_response(BTC_TX_FEES_1W)
+    return _redis_chart_response(BTC_TX_FEES_1W, "btc_tx_fees", "1w")
 
 @app.route("/api/btc_tx_fees/1m")
 def api_btc_tx_fees_1m():
-    return _redis_chart_response(BTC_TX_FEES_1M)
+    return _redis_chart_response(BTC_TX_FEES_1M, "btc_tx_fees", "1m")
 
 @app.route("/api/btc_tx_fees/1y")
 def api_btc_tx_fees_1y():
-    return _redis_chart_response(BTC_TX_FEES_1Y)
+    return _redis_chart_response(BTC_TX_FEES_1Y, "btc_tx_fees", "1y")
 
 ## ================================================================================================================================================================ ##
 
@@ -1443,31 +1579,19 @@ def api_btc_tx_fees_1y():
 # =======================================================
 @app.route("/api/hashrate/1y")
 def api_hashrate_1y():
-    raw = r.get("CHART_BTC_HASHRATE_1y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_HASHRATE_1y")
 
 @app.route("/api/hashrate/5y")
 def api_hashrate_5y():
-    raw = r.get("CHART_BTC_HASHRATE_5y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_HASHRATE_5y")
 
 @app.route("/api/hashrate/10y")
 def api_hashrate_10y():
-    raw = r.get("CHART_BTC_HASHRATE_10y")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_HASHRATE_10y")
 
 @app.route("/api/hashrate/ever")
 def api_hashrate_ever():
-    raw = r.get("CHART_BTC_HASHRATE_ever")
-    if not raw:
-        return jsonify({"history": []}), 200
-    return Response(raw, mimetype="application/json")
+    return _chart_payload_response("CHART_BTC_HASHRATE_ever")
 
 
 
@@ -1573,7 +1697,7 @@ def _json_loads_safe(raw, default):
 def get_cached_chain_height() -> int | None:
     """
     Holt die aktuelle Chainhöhe aus Redis.
-    Erwartet aggregate_blockchain_dynamic() → BLOCKCHAIN_DYNAMIC_CACHE
+    Erwartet update_blockchain_dynamic() → BLOCKCHAIN_DYNAMIC_CACHE
     mit z.B. {"current_block_height": 929261, ...}
     """
     combined = _json_loads_safe(r.get(BLOCKCHAIN_DYNAMIC_CACHE), default={})
@@ -2863,6 +2987,24 @@ def api_mempool2():
         mimetype="application/json"
     )
 
+# =================================
+# 🔸 API: MEMPOOL (projected blocks)
+@app.route("/api/mempool/projected_blocks", methods=["GET"])
+def api_mempool_projected_blocks():
+    raw = r.get(MEMPOOL_PROJECTED_BLOCKS_KEY)
+
+    if not raw:
+        return Response(
+            json.dumps({"error": "projected blocks not available"}),
+            status=503,
+            mimetype="application/json"
+        )
+
+    return Response(
+        raw.decode() if isinstance(raw, bytes) else raw,
+        mimetype="application/json"
+    )
+
 
 
 ## ================================================================================================================================================================ ##
@@ -2924,13 +3066,17 @@ def api_network_dynamic():
 def api_3_btc_top():
     try:
         raw = r.get(BTC_TOP_TXS_KEY)
-        mempool_top10 = json.loads(raw).get("top10", []) if raw else []
+        data = json.loads(raw) if raw else {}
+        mempool_top10 = data.get("top10", [])
+        top50_ever = data.get("top50_ever")
 
-        try:
-            with open(BTC_TOP_50_EVER_PATH, "r") as f:
-                top50_ever = json.load(f)
-        except Exception:
-            top50_ever = []
+        # Fallback (Worker noch nicht gelaufen): persistierte Datei
+        if top50_ever is None:
+            try:
+                with open(BTC_TOP_50_EVER_PATH, "r") as f:
+                    top50_ever = json.load(f)
+            except Exception:
+                top50_ever = []
 
         return Response(
             json.dumps({
@@ -0,0 +1,167 @@
+# ================================================================================================================================= #
+# ------------------------------------⛓️ BLOCK EVENTS (WAITFORNEWBLOCK-LISTENER → REDIS PUB/SUB)------------------------------------
+# ================================================================================================================================= #
+#
+# Neue Blöcke ohne 1 s-Polling erkennen:
+#
+#   NewBlockListener  Thread, blockiert in waitfornewblock (timeout_ms) → bei neuem Hash:
+#                       PUBLISH BLOCKCHAIN_NEW_BLOCK_CHANNEL {"hash", "height", "seen_ts"}
+#                       SET     BLOCKCHAIN_LAST_BLOCK_EVENT_KEY (gleiche Payload, für Nachzügler / Neustart)
+#                     + optionaler Callback im Listener-Thread
+#
+#   BlockSubscriber   Consumer-Seite: wait(timeout) statt time.sleep() → kehrt sofort bei neuem Block zurück.
+#                     Ohne Redis-Verbindung fällt wait() auf time.sleep() zurück.
+#
+# Pro Block ein RPC statt ~600 getblockchaininfo-Polls; Block-Alter zählt ab seen_ts (Sekundenbruchteile nach Ankunft).
+# ================================================================================================================================= #
+
+import json
+import time
+import threading
+
+from core.redis_keys import (
+    BLOCKCHAIN_NEW_BLOCK_CHANNEL,
+    BLOCKCHAIN_LAST_BLOCK_EVENT_KEY,
+)
+
+
+def _d(x):
+    return x.decode() if isinstance(x, (bytes, bytearray)) else x
+
+
+def last_block_event(r) -> dict:
+    """Zuletzt publiziertes Block-Event ({} solange der Listener noch nichts gesehen hat)."""
+    raw = r.get(BLOCKCHAIN_LAST_BLOCK_EVENT_KEY)
+    if not raw:
+        return {}
+    try:
+        return json.loads(_d(raw))
+    except Exception:
+        return {}
+
+
+class NewBlockListener(threading.Thread):
+    """
+    waitfornewblock in Schleife. rpc.call(..., timeout=) muss länger als timeout_ms warten dürfen.
+    Fehler (Node weg, Methode unbekannt) → Backoff, Thread läuft weiter.
+    Ohne gespeichertes Event wird last_hash vor der ersten Runde per getbestblockhash gesetzt –
+    sonst meldet der erste Timeout den aktuellen Tip als neuen Block.
+    """
+
+    def __init__(self, rpc, r, timeout_ms: int = 30_000, on_block=None, backoff_s: float = 5.0):
+        super().__init__(name="new_block_listener", daemon=True)
+        self.rpc = rpc
+        self.r = r
+        self.timeout_ms = int(timeout_ms)
+        self.on_block = on_block
+        self.backoff_s = backoff_s
+
+        self.last_hash = _d(last_block_event(r).get("hash")) or None
+        self.healthy = False
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def publish(self, blockhash: str, height: int) -> dict:
+        event = {"hash": blockhash, "height": int(height or 0), "seen_ts": time.time()}
+        payload = json.dumps(event)
+
+        pipe = self.r.pipeline(transaction=False)
+        pipe.set(BLOCKCHAIN_LAST_BLOCK_EVENT_KEY, payload)
+        pipe.publish(BLOCKCHAIN_NEW_BLOCK_CHANNEL, payload)
+        pipe.execute()
+        return event
+
+    def seed_last_hash(self) -> None:
+        """last_hash = aktueller Tip (nur ohne gespeichertes Event), bis die Node antwortet oder stop()."""
+        while self.last_hash is None and not self._stop_event.is_set():
+            try:
+                self.last_hash = _d(self.rpc.call("getbestblockhash")) or None
+            except Exception as e:
+                self.healthy = False
+                print(f"[BLOCK EVENTS] getbestblockhash failed: {e}")
+
+            if self.last_hash is None:
+                self._stop_event.wait(self.backoff_s)
+            else:
+                print(f"[BLOCK EVENTS] seeded tip {self.last_hash}")
+
+    def run(self):
+        print(f"[BLOCK EVENTS] listener started (waitfornewblock {self.timeout_ms}ms)")
+
+        self.seed_last_hash()
+
+        while not self._stop_event.is_set():
+            try:
+                tip = self.rpc.call(
+                    "waitfornewblock", [self.timeout_ms], timeout=self.timeout_ms / 1000 + 10
+                ) or {}
+                self.healthy = True
+            except Exception as e:
+                self.healthy = False
+                print(f"[BLOCK EVENTS] waitfornewblock failed: {e}")
+                self._stop_event.wait(self.backoff_s)
+                continue
+
+            blockhash = tip.get("hash")
+            if not blockhash or blockhash == self.last_hash:
+                continue   # Timeout ohne neuen Block
+
+            self.last_hash = blockhash
+            try:
+                event = self.publish(blockhash, tip.get("height"))
+            except Exception as e:
+                print(f"[BLOCK EVENTS] publish failed: {e}")
+                event = {"hash": blockhash, "height": tip.get("height", 0), "seen_ts": time.time()}
+
+            print(f"[BLOCK EVENTS] new block {event['height']} {blockhash}")
+
+            if self.on_block is not None:
+                try:
+                    self.on_block(event)
+                except Exception as e:
+                    print(f"[BLOCK EVENTS] on_block callback failed: {e}")
+
+
+class BlockSubscriber:
+    """SUBSCRIBE auf BLOCKCHAIN_NEW_BLOCK_CHANNEL; wait(timeout) als unterbrechbares Sleep."""
+
+    def __init__(self, r):
+        self.r = r
+        self._pubsub = None
+
+    def _ensure(self):
+        if self._pubsub is None:
+            self._pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(BLOCKCHAIN_NEW_BLOCK_CHANNEL)
+        return self._pubsub
+
+    def wait(self, timeout: float):
+        """Bis timeout schlafen; neues Block-Event → sofort zurück mit dem Event, sonst None."""
+        deadline = time.time() + max(0.0, timeout)
+        try:
+            pubsub = self._ensure()
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                msg = pubsub.get_message(timeout=remaining)
+                if msg and msg.get("type") == "message":
+                    try:
+                        return json.loads(_d(msg["data"]))
+                    except Exception:
+                        return {}
+        except Exception as e:
+            print(f"[BLOCK EVENTS] subscriber error → sleep fallback: {e}")
+            self.close()
+            time.sleep(max(0.0, deadline - time.time()))
+            return None
+
+    def close(self):
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
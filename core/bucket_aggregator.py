@@ -0,0 +1,373 @@
+# ================================================================================================================================= #
+# ------------------------------------🪣 BUCKET AGGREGATOR (MULTI-RESOLUTION, RINGPUFFER, SNAPSHOT/RESTORE)-------------------------
+# ================================================================================================================================= #
+#
+# Gemeinsame Bucket-State-Machine für btc_tx_volume, btc_tx_fees und dashboard_traffic:
+#
+#   BUCKETS = {"1h": {"bucket_ms": ..., "window_ms": ..., "redis_key": ...}, ...}
+#   agg = BucketAggregator(r, BUCKETS, SumReducer(), name="BTC_TX_VOLUME")
+#
+#   agg.add(ts_ms, value)        O(1) pro Auflösung; abgeschlossene Buckets → Ringpuffer + Publish
+#   agg.republish(now_ms)        Redis-Stand absichern (flush-resistent): geschrieben wird nur,
+#                                was sich geändert hat oder in Redis fehlt
+#
+# Ablage je Fenster (mode, Default CHART_SERIES_MODE):
+#   "json"  → <redis_key> = {"history": [...]}  (gecachte Bytes, neu kodiert nur nach Bucket-Abschluss / Prune)
+#             + <redis_key>_GZ / _BR / _ETAG (core.chart_payload)
+#   "zset"  → <redis_key>_ZSET, ein ZADD pro Bucket-Abschluss (core.chart_series, Range-Abfragen)
+#   "both"  → beides
+#   agg.open_buckets()           {name: {"cur_bucket": ..., <reducer-Felder>}} → *_OPEN_BUCKETS
+#   agg.restore(snapshot)        Warmstart aus Storage-Snapshot ({"buckets", "open_buckets"})
+#
+# Reducer bestimmen Akkumulator, Datenprüfung, Ausgabewert und die Feldnamen
+# im open_buckets-Format (bleibt kompatibel zu bestehenden Snapshots).
+# ================================================================================================================================= #
+
+import json
+from array import array
+
+from core import chart_series, chart_payload
+from core.redis_keys import CHART_SERIES_MODE
+
+
+# =========================
+# Reducer
+# =========================
+class SumReducer:
+    """SUM(value) pro Bucket (btc_tx_volume). Open-Bucket-Feld: bucket_sum."""
+
+    def __init__(self, field: str = "bucket_sum"):
+        self.field = field
+
+    def zero(self) -> list:
+        return [0.0]
+
+    def add(self, acc: list, value) -> None:
+        acc[0] += value
+
+    def has_data(self, acc: list) -> bool:
+        return acc[0] > 0
+
+    def value(self, acc: list) -> float:
+        return acc[0]
+
+    def output(self, v: float):
+        return v
+
+    def to_open(self, acc: list) -> dict:
+        return {self.field: acc[0]}
+
+    def from_open(self, ob: dict) -> list:
+        return [float(ob.get(self.field, 0.0))]
+
+
+class CountReducer(SumReducer):
+    """Ganzzahlige Summe (dashboard_traffic: Requests pro Bucket)."""
+
+    def zero(self) -> list:
+        return [0]
+
+    def output(self, v):
+        return int(v)
+
+    def to_open(self, acc: list) -> dict:
+        return {self.field: int(acc[0])}
+
+    def from_open(self, ob: dict) -> list:
+        return [int(ob.get(self.field, 0))]
+
+
+class WeightedAvgReducer:
+    """
+    SUM(num) / SUM(den) pro Bucket (btc_tx_fees: sat/vB).
+    Open-Bucket-Felder: sum_fee / sum_vbytes.
+    """
+
+    def __init__(self, num_field: str = "sum_fee", den_field: str = "sum_vbytes", ndigits: int = 2):
+        self.num_field = num_field
+        self.den_field = den_field
+        self.ndigits = ndigits
+
+    def zero(self) -> list:
+        return [0, 0]
+
+    def add(self, acc: list, num, den) -> None:
+        acc[0] += num
+        acc[1] += den
+
+    def has_data(self, acc: list) -> bool:
+        return acc[1] > 0
+
+    def value(self, acc: list) -> float:
+        return acc[0] / acc[1]
+
+    def output(self, v: float):
+        return round(v, self.ndigits)
+
+    def to_open(self, acc: list) -> dict:
+        return {self.num_field: acc[0], self.den_field: acc[1]}
+
+    def from_open(self, ob: dict) -> list:
+        return [float(ob.get(self.num_field, 0)), float(ob.get(self.den_field, 0))]
+
+
+# =========================
+# Ringpuffer (eine Auflösung)
+# =========================
+class RingSeries:
+    """
+    Abgeschlossene Buckets (ts_ms, value) in festen Arrays.
+    Kapazität = Buckets pro Fenster (+2 Rand) → kein Wachstum, kein popleft()-Overhead.
+    """
+
+    __slots__ = ("capacity", "ts", "vals", "head", "size")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(2, int(capacity))
+        self.ts = array("q", [0]) * self.capacity
+        self.vals = array("d", [0.0]) * self.capacity
+        self.head = 0   # Index des ältesten Eintrags
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def clear(self) -> None:
+        self.head = 0
+        self.size = 0
+
+    def _idx(self, i: int) -> int:
+        return (self.head + i) % self.capacity
+
+    def last_ts(self):
+        return self.ts[self._idx(self.size - 1)] if self.size else None
+
+    def append(self, ts_ms: int, value: float) -> None:
+        # 🔒 kein doppelter Bucket (z. B. Restore + erneuter Flush desselben Buckets)
+        if self.size and self.ts[self._idx(self.size - 1)] == ts_ms:
+            self.vals[self._idx(self.size - 1)] = value
+            return
+
+        if self.size == self.capacity:
+            # voll → ältesten überschreiben
+            self.head = (self.head + 1) % self.capacity
+            self.size -= 1
+
+        i = self._idx(self.size)
+        self.ts[i] = ts_ms
+        self.vals[i] = value
+        self.size += 1
+
+    def prune(self, cutoff_ms: int) -> int:
+        dropped = 0
+        while self.size and self.ts[self.head] < cutoff_ms:
+            self.head = (self.head + 1) % self.capacity
+            self.size -= 1
+            dropped += 1
+        return dropped
+
+    def items(self):
+        for i in range(self.size):
+            j = self._idx(i)
+            yield self.ts[j], self.vals[j]
+
+
+# =========================
+# Aggregator
+# =========================
+class BucketAggregator:
+
+    def __init__(self, r, buckets: dict, reducer, name: str = "BUCKETS", mode: str = CHART_SERIES_MODE):
+        self.r = r
+        self.buckets = buckets
+        self.reducer = reducer
+        self.name = name
+
+        self.use_json = mode in ("json", "both")
+        self.use_zset = mode in ("zset", "both")
+
+        self.series = {
+            n: RingSeries(cfg["window_ms"] // cfg["bucket_ms"] + 2)
+            for n, cfg in buckets.items()
+        }
+        self.cur_bucket = {n: None for n in buckets}
+        self.acc = {n: reducer.zero() for n in buckets}
+
+        # kodierte Historie pro Auflösung; None = neu kodieren
+        self._encoded = {n: None for n in buckets}
+        self.encode_count = 0
+
+        # zuletzt nach Redis geschriebene Bytes / ZSET komplett geschrieben?
+        self._published = {n: None for n in buckets}
+        self._zset_synced = {n: False for n in buckets}
+
+    # -------------------------
+    # Ingest
+    # -------------------------
+    def add(self, ts_ms: int, *values) -> None:
+        reducer = self.reducer
+
+        for n, cfg in self.buckets.items():
+            size = cfg["bucket_ms"]
+            b = (ts_ms // size) * size
+            cur = self.cur_bucket[n]
+
+            if cur is None:
+                self.cur_bucket[n] = b
+            elif b > cur:
+                self._close(n, ts_ms)
+                self.cur_bucket[n] = b
+                self.acc[n] = reducer.zero()
+            # b < cur: verspätetes Event → zählt in den offenen Bucket (Historie bleibt monoton)
+
+            reducer.add(self.acc[n], *values)
+
+    def _close(self, n: str, now_ms: int) -> bool:
+        acc = self.acc[n]
+        if self.cur_bucket[n] is None or not self.reducer.has_data(acc):
+            return False  # keine leeren Buckets
+
+        v = self.reducer.value(acc)
+        self.series[n].append(self.cur_bucket[n], v)
+        self._encoded[n] = None
+
+        if self.use_zset and self._zset_synced[n]:
+            cfg = self.buckets[n]
+            pipe = self.r.pipeline(transaction=False)
+            chart_series.append_point(
+                pipe, cfg["redis_key"], self.cur_bucket[n],
+                self.reducer.output(v), now_ms - cfg["window_ms"],
+            )
+            pipe.execute()
+
+        if self.use_json:
+            self.publish(n, now_ms)
+        return True
+
+    # -------------------------
+    # Lesen / Publish
+    # -------------------------
+    def open_value(self, n: str):
+        acc = self.acc[n]
+        if self.cur_bucket[n] is None or not self.reducer.has_data(acc):
+            return self.reducer.output(0)
+        return self.reducer.output(self.reducer.value(acc))
+
+    def history(self, n: str) -> list:
+        out = self.reducer.output
+        return [{"x": int(t), "y": out(v)} for t, v in self.series[n].items()]
+
+    def payload(self, n: str) -> dict:
+        return {"history": self.history(n)}
+
+    def encoded(self, n: str, now_ms: int) -> bytes:
+        """Auf das Fenster gekürzte Historie als JSON-Bytes (Cache bis zur nächsten Änderung)."""
+        if self.series[n].prune(now_ms - self.buckets[n]["window_ms"]):
+            self._encoded[n] = None
+
+        data = self._encoded[n]
+        if data is None:
+            data = json.dumps(self.payload(n), separators=(",", ":")).encode()
+            self._encoded[n] = data
+            self.encode_count += 1
+        return data
+
+    def publish(self, n: str, now_ms: int) -> None:
+        # JSON + gzip/brotli + ETag (core.chart_payload)
+        data = self.encoded(n, now_ms)
+        chart_payload.publish(self.r, self.buckets[n]["redis_key"], data)
+        self._published[n] = data
+
+    def republish(self, now_ms: int) -> None:
+        """
+        Spiegel den RAM-State nach Redis (flush-resistent):
+        JSON nur bei Änderung oder fehlendem Key, ZSET komplett nur nach
+        Restore / fehlendem Key, sonst nur Trim aufs Fenster.
+        """
+        names = list(self.buckets)
+
+        pipe = self.r.pipeline(transaction=False)
+        for n in names:
+            key = self.buckets[n]["redis_key"]
+            pipe.exists(key)
+            pipe.exists(chart_series.zset_key(key))
+        flags = pipe.execute()
+
+        pipe = self.r.pipeline(transaction=False)
+        for i, n in enumerate(names):
+            cfg = self.buckets[n]
+            json_exists, zset_exists = flags[2 * i], flags[2 * i + 1]
+
+            if self.use_json:
+                data = self.encoded(n, now_ms)
+                if not json_exists or data is not self._published[n]:
+                    self.publish(n, now_ms)
+
+            if self.use_zset:
+                cutoff = now_ms - cfg["window_ms"]
+                self.series[n].prune(cutoff)
+                if not self._zset_synced[n] or (not zset_exists and len(self.series[n])):
+                    out = self.reducer.output
+                    chart_series.replace_series(
+                        pipe, cfg["redis_key"],
+                        ((int(t), out(v)) for t, v in self.series[n].items()),
+                    )
+                    self._zset_synced[n] = True
+                else:
+                    chart_series.trim(pipe, cfg["redis_key"], cutoff)
+
+        pipe.execute()
+
+    # -------------------------
+    # Snapshot / Restore
+    # -------------------------
+    def open_buckets(self) -> dict:
+        return {
+            n: {"cur_bucket": self.cur_bucket[n], **self.reducer.to_open(self.acc[n])}
+            for n in self.buckets
+            if self.cur_bucket[n] is not None
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": {n: self.payload(n) for n in self.buckets},
+            "open_buckets": self.open_buckets(),
+        }
+
+    def reset(self) -> None:
+        for n in self.buckets:
+            self.series[n].clear()
+            self._encoded[n] = None
+            self._zset_synced[n] = False
+            self.cur_bucket[n] = None
+            self.acc[n] = self.reducer.zero()
+
+    def restore(self, snap: dict) -> None:
+        """Abgeschlossene + offene Buckets aus einem Storage-Snapshot übernehmen."""
+        self.reset()
+
+        for n, bucket in (snap.get("buckets") or {}).items():
+            if n not in self.series:
+                continue
+            ser = self.series[n]
+            for p in bucket.get("history", []):
+                try:
+                    t, v = int(p["x"]), float(p["y"])
+                except Exception:
+                    continue
+                if ser.size and t < ser.last_ts():
+                    continue
+                ser.append(t, v)
+            self._encoded[n] = None
+            self._zset_synced[n] = False
+
+        for n, ob in (snap.get("open_buckets") or {}).items():
+            if n not in self.cur_bucket:
+                continue
+            try:
+                self.cur_bucket[n] = int(ob.get("cur_bucket"))
+                self.acc[n] = self.reducer.from_open(ob)
+            except Exception:
+                # Safety: korrupten offenen Bucket ignorieren
+                self.cur_bucket[n] = None
+                self.acc[n] = self.reducer.zero()
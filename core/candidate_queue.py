@@ -0,0 +1,100 @@
+# ================================================================================================================================= #
+# ------------------------------------🚦 CANDIDATE QUEUE (PRIORITÄT NACH MEMPOOL-METADATEN, AGING, WARTEZEIT)-----------------------
+# ================================================================================================================================= #
+#
+# Reihenfolge, in der btc_top ungesehene TXs per getrawtransaction holt:
+#
+#   score = vsize + DEPENDS_VB * len(depends) + min(aging_max_vb, aging_vb_per_s * Wartezeit in der Queue)
+#
+#   - große TXs zuerst (viele In-/Outputs → Wal-Kandidaten für die Top-Liste)
+#   - depends = unbestätigte Eltern im Mempool → untere Schranke für weitere Inputs
+#   - Aging: kleine TXs rutschen mit der Wartezeit nach vorne → kein Verhungern bei Dauer-Backlog
+#     Wartezeit zählt ab dem ersten Einreihen (queued_at, vom Worker über Zyklen gehalten), nicht ab
+#     "time" im Mempool – sonst wäre die Reihenfolge nach einem Neustart / Backlog praktisch oldest-first.
+#     Der Deckel hält den Bonus unter der Größe eines Wals.
+#
+# fees.base geht bewusst nicht ein: Gebühr ≈ vsize × Feerate, die Feerate sagt nichts über den Output-Wert.
+#
+# Heap wird O(n) aufgebaut, pop_chunk() holt nur so viel, wie ins Zeitbudget passt (O(k log n)),
+# der Rest bleibt für den nächsten Zyklus liegen (drain()).
+# Ohne Metadaten (ZMQ-Kandidaten vor getmempoolentry) zählt size_hint (Raw-Länge) bzw. Ankunftsreihenfolge.
+# ================================================================================================================================= #
+
+import heapq
+import itertools
+
+DEPENDS_VB = 68     # ~ ein P2WPKH-Input
+
+
+def priority(info, now: float, aging_vb_per_s: float = 0.0, size_hint: int = 0,
+             queued_at: float = None, aging_max_vb: float = 0.0) -> float:
+    """
+    Score (größer = früher holen). info = Eintrag aus getrawmempool true / getmempoolentry oder None.
+    queued_at = erstes Einreihen (None = jetzt), aging_max_vb = Deckel für den Aging-Bonus (0 = ohne).
+    """
+    if info:
+        score = float(info.get("vsize") or size_hint or 0)
+        score += DEPENDS_VB * len(info.get("depends") or ())
+    else:
+        score = float(size_hint or 0)
+
+    if aging_vb_per_s and queued_at:
+        bonus = aging_vb_per_s * max(0.0, now - queued_at)
+        score += min(bonus, aging_max_vb) if aging_max_vb else bonus
+    return score
+
+
+def percentiles(values, qs=(50, 90, 99)) -> dict:
+    """Nearest-rank-Perzentile {q: wert} (leer → {})."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    n = len(ordered)
+    return {q: ordered[min(n - 1, max(0, -(-q * n // 100) - 1))] for q in qs}
+
+
+class CandidateQueue:
+    def __init__(self, candidates=(), now: float = None, aging_vb_per_s: float = 0.0, size_hints=None,
+                 queued_at=None, aging_max_vb: float = 0.0):
+        """
+        candidates = [(txid, info)], size_hints = {txid: bytes} (optional),
+        queued_at = {txid: ts erstes Einreihen} (optional, fehlend = jetzt).
+        """
+        self.aging_vb_per_s = aging_vb_per_s
+        self.aging_max_vb = aging_max_vb
+        self._seq = itertools.count()
+        self._heap = []
+        self.extend(candidates, now, size_hints, queued_at)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def extend(self, candidates, now: float = None, size_hints=None, queued_at=None) -> None:
+        size_hints = size_hints or {}
+        queued_at = queued_at or {}
+        now = now or 0.0
+        items = [
+            (-priority(info, now, self.aging_vb_per_s, size_hints.get(txid, 0),
+                       queued_at.get(txid), self.aging_max_vb), next(self._seq), txid, info)
+            for txid, info in candidates
+        ]
+        if self._heap:
+            for it in items:
+                heapq.heappush(self._heap, it)
+        else:
+            heapq.heapify(items)
+            self._heap = items
+
+    def pop_chunk(self, n: int) -> list:
+        """Bis zu n Kandidaten [(txid, info)] mit höchstem Score."""
+        out = []
+        while self._heap and len(out) < n:
+            _, _, txid, info = heapq.heappop(self._heap)
+            out.append((txid, info))
+        return out
+
+    def drain(self) -> list:
+        """Alle verbleibenden txids (unsortiert) und Queue leeren."""
+        txids = [it[2] for it in self._heap]
+        self._heap = []
+        return txids
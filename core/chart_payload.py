@@ -0,0 +1,162 @@
+# ================================================================================================================================= #
+# ------------------------------------🗜️ CHART PAYLOADS (VORKOMPRIMIERT, ETAG-VERSIONIERT)-------------------------------------------
+# ================================================================================================================================= #
+#
+# Worker schreiben neben jedem Chart-Key:
+#
+#   <key>        JSON (unverändert, Altbestand / Fallback)
+#   <key>_GZ     gzip-Variante
+#   <key>_BR     brotli-Variante (nur wenn das Paket brotli installiert ist)
+#   <key>_ETAG   Content-Hash des JSON (Basis; ausgeliefert wird pro Encoding ein eigenes starkes ETag,
+#                z. B. "<hash>-gz" – gzip-, brotli- und identity-Body sind verschiedene Bytes)
+#
+# Alles in einer MULTI-Pipeline → Reader sehen nie ETag und Body aus verschiedenen Ständen.
+# Flask liefert per Accept-Encoding die passende Variante, 304 bei If-None-Match.
+# ================================================================================================================================= #
+
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # optional → nur gzip
+    brotli = None
+
+from core.redis_keys import (
+    CHART_PAYLOAD_GZIP_SUFFIX,
+    CHART_PAYLOAD_BROTLI_SUFFIX,
+    CHART_PAYLOAD_ETAG_SUFFIX,
+)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+# Prozess-Cache: key → (etag, gz, br) → unveränderte Payloads nicht erneut komprimieren
+_compressed = {}
+
+
+def gzip_key(key: str) -> str:
+    return f"{key}{CHART_PAYLOAD_GZIP_SUFFIX}"
+
+
+def brotli_key(key: str) -> str:
+    return f"{key}{CHART_PAYLOAD_BROTLI_SUFFIX}"
+
+
+def etag_key(key: str) -> str:
+    return f"{key}{CHART_PAYLOAD_ETAG_SUFFIX}"
+
+
+def compute_etag(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+_ETAG_SUFFIX = {"br": "-br", "gzip": "-gz", "identity": ""}
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """Starkes ETag pro Repräsentation (Basis-ETag + Encoding-Suffix)."""
+    return f"{etag}{_ETAG_SUFFIX.get(encoding, '')}"
+
+
+def _variants(key: str, data: bytes):
+    etag = compute_etag(data)
+
+    cached = _compressed.get(key)
+    if cached and cached[0] == etag:
+        return cached
+
+    gz = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    br = brotli.compress(data, quality=BROTLI_QUALITY) if brotli is not None else None
+
+    _compressed[key] = (etag, gz, br)
+    return _compressed[key]
+
+
+# =========================
+# Writer (Worker)
+# =========================
+def publish(r, key: str, data) -> str:
+    """
+    JSON + gzip/brotli + ETag atomar schreiben. data = str | bytes.
+    Returns das ETag.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+
+    etag, gz, br = _variants(key, data)
+
+    pipe = r.pipeline(transaction=True)
+    pipe.set(key, data)
+    pipe.set(gzip_key(key), gz)
+    if br is not None:
+        pipe.set(brotli_key(key), br)
+    else:
+        pipe.delete(brotli_key(key))
+    pipe.set(etag_key(key), etag)
+    pipe.execute()
+
+    return etag
+
+
+# =========================
+# Reader (Flask)
+# =========================
+def pick_encoding(accept_encoding: str) -> str:
+    """"br" | "gzip" | "identity" – Reihenfolge nach Kompressionsrate, q=0 wird respektiert."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 1.0
+        offered[token] = q
+
+    for enc in ("br", "gzip"):
+        if offered.get(enc, offered.get("*", 0)) > 0:
+            return enc
+    return "identity"
+
+
+def read(r, key: str, encoding: str):
+    """
+    (etag, body, encoding) aus Redis; r muss Bytes liefern (decode_responses=False).
+    Fehlende Variante → nächstschwächere; fehlendes ETag (Altbestand) → aus dem JSON berechnet.
+    Returns (None, None, None), wenn der Key nicht existiert.
+    """
+    candidates = []
+    if encoding == "br":
+        candidates.append(("br", brotli_key(key)))
+    if encoding in ("br", "gzip"):
+        candidates.append(("gzip", gzip_key(key)))
+    candidates.append(("identity", key))
+
+    values = r.mget([etag_key(key)] + [k for _, k in candidates])
+    etag = values[0]
+
+    for (enc, _), body in zip(candidates, values[1:]):
+        if body:
+            if etag is None:
+                raw = body if enc == "identity" else r.get(key)
+                if not raw:
+                    return None, None, None
+                etag = compute_etag(raw)
+            if isinstance(etag, bytes):
+                etag = etag.decode()
+            return etag, body, enc
+
+    return None, None, None
+
+
+def read_etag(r, key: str):
+    etag = r.get(etag_key(key))
+    if isinstance(etag, bytes):
+        etag = etag.decode()
+    return etag
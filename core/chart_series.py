@@ -0,0 +1,90 @@
+# ================================================================================================================================= #
+# ------------------------------------📈 CHART SERIES (REDIS SORTED SET, APPEND-ONLY, RANGE QUERIES)---------------------------------
+# ================================================================================================================================= #
+#
+# Pro Chart-Fenster ein Sorted Set neben dem JSON-Blob:
+#
+#   <redis_key>_ZSET    score = bucket ts_ms    member = "[ts_ms,y]"
+#
+# Writer (BucketAggregator): ein ZADD pro abgeschlossenem Bucket + Trim aufs Fenster.
+# Reader (API): beliebige [from, to]-Bereiche per ZRANGEBYSCORE.
+# ================================================================================================================================= #
+
+import json
+
+from core.redis_keys import CHART_SERIES_ZSET_SUFFIX
+
+
+def zset_key(redis_key: str) -> str:
+    return f"{redis_key}{CHART_SERIES_ZSET_SUFFIX}"
+
+
+def _member(ts_ms: int, y) -> str:
+    return json.dumps([int(ts_ms), y], separators=(",", ":"))
+
+
+# =========================
+# Writer
+# =========================
+def append_point(pipe, redis_key: str, ts_ms: int, y, cutoff_ms: int) -> None:
+    """
+    Bucket ts_ms setzen (ersetzt einen evtl. vorhandenen Punkt mit gleichem ts)
+    und alles vor cutoff_ms entfernen. pipe = Redis-Pipeline (oder Client).
+    """
+    key = zset_key(redis_key)
+    pipe.zremrangebyscore(key, ts_ms, ts_ms)
+    pipe.zadd(key, {_member(ts_ms, y): ts_ms})
+    pipe.zremrangebyscore(key, "-inf", f"({int(cutoff_ms)}")
+
+
+def replace_series(pipe, redis_key: str, points) -> None:
+    """Komplettes Set neu schreiben (Warmstart / nach Redis-Flush). points = [(ts_ms, y)]."""
+    key = zset_key(redis_key)
+    pipe.delete(key)
+    mapping = {_member(t, y): t for t, y in points}
+    if mapping:
+        pipe.zadd(key, mapping)
+
+
+def trim(pipe, redis_key: str, cutoff_ms: int) -> None:
+    pipe.zremrangebyscore(zset_key(redis_key), "-inf", f"({int(cutoff_ms)}")
+
+
+# =========================
+# Reader
+# =========================
+def read_range(r, redis_key: str, t0_ms=None, t1_ms=None, limit: int = 0) -> list:
+    """
+    Punkte mit t0_ms <= x <= t1_ms als [{"x", "y"}] (aufsteigend).
+    None = offenes Ende; limit > 0 → nur die ersten limit Punkte.
+    """
+    lo = "-inf" if t0_ms is None else int(t0_ms)
+    hi = "+inf" if t1_ms is None else int(t1_ms)
+
+    if limit > 0:
+        members = r.zrangebyscore(zset_key(redis_key), lo, hi, start=0, num=int(limit))
+    else:
+        members = r.zrangebyscore(zset_key(redis_key), lo, hi)
+
+    out = []
+    for m in members:
+        try:
+            t, y = json.loads(m)
+        except Exception:
+            continue
+        out.append({"x": t, "y": y})
+    return out
+
+
+def read_history(r, redis_key: str) -> list:
+    """
+    Komplette Historie [{"x", "y"}] unabhängig vom CHART_SERIES_MODE:
+    JSON-Blob ("json" / "both"), sonst das ZSET ("zset").
+    """
+    raw = r.get(redis_key)
+    if raw:
+        try:
+            return json.loads(raw).get("history", [])
+        except Exception:
+            pass
+    return read_range(r, redis_key)
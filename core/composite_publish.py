@@ -0,0 +1,41 @@
+# ================================================================================================================================= #
+# ------------------------------------📤 COMPOSITE PUBLISH (SUBKEYS + AGGREGAT IN EINER MULTI-PIPELINE)-----------------------------
+# ================================================================================================================================= #
+#
+# Muster "Subkeys → Aggregat" (blockchain / mempool):
+#
+#   vorher:  update_x() liest Input-Key, parst, SET Subkey     (× N)
+#            aggregate() GET Subkeys, parst, SET Aggregat
+#   jetzt:   Teile aus einem In-Memory-Input berechnen → publish_composite() → ein MULTI/EXEC
+#
+# Key-Layout bleibt gleich (Subkeys + Aggregat = Merge der Subkeys in Reihenfolge),
+# Leser sehen Subkeys und Aggregat immer im selben Stand.
+# ================================================================================================================================= #
+
+import json
+
+
+def publish_composite(r, parts: dict, combined_key: str = None, extra: dict = None) -> dict:
+    """
+    parts        {subkey: dict}        → SET subkey JSON
+    combined_key                      → SET Merge aller parts (spätere überschreiben frühere Felder)
+    extra        {key: str | bytes}    → weitere SETs in derselben Transaktion (z. B. Input-Key)
+    Returns das Aggregat.
+    """
+    combined = {}
+    pipe = r.pipeline(transaction=True)
+
+    for key, value in (extra or {}).items():
+        pipe.set(key, value)
+
+    for key, data in parts.items():
+        if data is None:
+            continue
+        pipe.set(key, json.dumps(data))
+        combined.update(data)
+
+    if combined_key and combined:
+        pipe.set(combined_key, json.dumps(combined))
+
+    pipe.execute()
+    return combined
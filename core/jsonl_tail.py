@@ -0,0 +1,179 @@
+# ================================================================================================================================= #
+# ------------------------------------📜 JSONL TAIL READER (TXID-HISTORY, OFFSET-BASIERT)-------------------------------------------
+# ================================================================================================================================= #
+
+import os
+import json
+import time
+
+
+def _d(x):
+    return x.decode() if isinstance(x, (bytes, bytearray)) else x
+
+
+def utc_day_from_ms(ts_ms: int) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(ts_ms / 1000))
+
+
+class JsonlTailReader:
+    """
+    Inkrementeller Reader für die Tagesdateien `<prefix>YYYYMMDD.jsonl`.
+
+    Die Leseposition (inode, byte offset, day) liegt in einem Redis-Hash →
+    pro Lauf werden nur neu angehängte Bytes geparst, nicht die ganze Datei.
+
+    - unvollständige letzte Zeilen bleiben liegen, bis sie fertig geschrieben sind
+    - Tageswechsel: der alte Tag wird bis EOF gelesen, bevor auf den neuen gewechselt wird
+      (btc_top legt die neue Datei erst im ersten Zyklus nach Mitternacht an →
+       sobald sie existiert, wird die alte nicht mehr beschrieben)
+    - inode-Wechsel / Truncate → Datei wird ab Byte 0 neu gelesen
+      (Duplikate filtert der Aufrufer über TxEventCursor)
+    """
+
+    READ_BLOCK_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, r, directory: str, state_key: str,
+                 prefix: str = "all_mempool_seen_", suffix: str = ".jsonl",
+                 name: str = "TAIL"):
+        self.r = r
+        self.directory = directory
+        self.state_key = state_key
+        self.prefix = prefix
+        self.suffix = suffix
+        self.name = name
+
+        self.day = None
+        self.inode = None
+        self.offset = 0
+        self.bad_lines = 0
+
+    # -------------------------
+    # Dateien
+    # -------------------------
+    def _day_files(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        out = []
+        for fname in names:
+            if not (fname.startswith(self.prefix) and fname.endswith(self.suffix)):
+                continue
+            day = fname[len(self.prefix):-len(self.suffix)]
+            if len(day) == 8 and day.isdigit():
+                out.append((day, os.path.join(self.directory, fname)))
+
+        return sorted(out)
+
+    # -------------------------
+    # State (Redis)
+    # -------------------------
+    def resume(self, last_ts_ms: int) -> None:
+        """
+        Lädt die gespeicherte Position – aber nur, wenn sie nicht VOR dem
+        Warmstart-Stand (last_ts_ms) des Workers liegt. Ist Redis weiter als der
+        Snapshot, wird ab Tagesbeginn von last_ts_ms neu gelesen, damit die Events
+        zwischen Snapshot und Restart nicht verloren gehen.
+        """
+        self.day, self.inode, self.offset = None, None, 0
+
+        try:
+            raw = self.r.hgetall(self.state_key) or {}
+        except Exception as e:
+            print(f"[{self.name}] state load failed: {e}")
+            raw = {}
+
+        state = {_d(k): _d(v) for k, v in raw.items()}
+        start_day = utc_day_from_ms(last_ts_ms) if last_ts_ms > 0 else None
+
+        try:
+            saved_day = state.get("day")
+            saved_ts = int(state.get("ts_ms", 0))
+            saved_inode = int(state["inode"]) if state.get("inode") else None
+            saved_offset = int(state.get("offset", 0))
+        except Exception:
+            saved_day = None
+
+        if saved_day and saved_ts <= last_ts_ms and (start_day is None or saved_day >= start_day):
+            self.day, self.inode, self.offset = saved_day, saved_inode, saved_offset
+            print(f"[{self.name}] resume day={self.day} offset={self.offset}")
+            return
+
+        self.day = start_day
+        print(f"[{self.name}] rescan from day={self.day or 'latest'} (last_ts_ms={last_ts_ms})")
+
+    def save(self, last_ts_ms: int) -> None:
+        if self.day is None:
+            return
+        self.r.hset(self.state_key, mapping={
+            "day": self.day,
+            "inode": str(self.inode or ""),
+            "offset": str(self.offset),
+            "ts_ms": str(int(last_ts_ms)),
+        })
+
+    # -------------------------
+    # Lesen
+    # -------------------------
+    def read_new(self):
+        """
+        Generator über alle neuen, vollständigen JSONL-Zeilen (dict) – über
+        Tagesgrenzen hinweg, ältester Tag zuerst.
+        """
+        files = self._day_files()
+        if not files:
+            return
+
+        if self.day is None:
+            self.day, self.inode, self.offset = files[-1][0], None, 0
+
+        for day, path in files:
+            if day < self.day:
+                continue
+
+            if day > self.day:
+                self.day, self.inode, self.offset = day, None, 0
+
+            yield from self._read_file(path)
+
+    def _read_file(self, path: str):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+
+        if self.inode is not None and st.st_ino != self.inode:
+            print(f"[{self.name}] inode changed → reread {os.path.basename(path)}")
+            self.offset = 0
+
+        if st.st_size < self.offset:
+            print(f"[{self.name}] file truncated → reread {os.path.basename(path)}")
+            self.offset = 0
+
+        self.inode = st.st_ino
+
+        if st.st_size == self.offset:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(self.offset)
+            pending = b""
+
+            while True:
+                block = f.read(self.READ_BLOCK_BYTES)
+                if not block:
+                    break
+
+                lines = (pending + block).split(b"\n")
+                pending = lines.pop()  # unvollständige letzte Zeile
+
+                for line in lines:
+                    self.offset += len(line) + 1
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except Exception:
+                        self.bad_lines += 1
+                        print(f"[{self.name}] skip invalid line @ {os.path.basename(path)}:{self.offset}")
@@ -0,0 +1,192 @@
+# ================================================================================================================================= #
+# ------------------------------------🧱 PROJECTED BLOCKS (MEMPOOL → NÄCHSTE BLÖCKE, NUMPY-VEKTORISIERT)-----------------------------
+# ================================================================================================================================= #
+#
+# Simuliert, wie der aktuelle Mempool in die nächsten Blöcke passt:
+#
+#   1. pro TX: Ancestor-Feerate = fees.ancestor / ancestorsize (sat/vB), Weight (weight oder vsize × 4)
+#   2. absteigend nach Ancestor-Feerate sortieren, Weights aufsummieren
+#   3. Block k = alle TXs, deren kumulierte Weight in (k·W, (k+1)·W] endet   (W = 4 MWU − Coinbase-Reserve)
+#      → vektorisierbar, dafür kann ein Block um die Weight einer TX über W liegen (kein Lückenfüllen)
+#
+# Näherung wie bei gängigen Mempool-Explorern: kein echtes Package-Mining (CPFP-Eltern laufen mit ihrer eigenen
+# Ancestor-Rate), neue Ankünfte bis zum Block sind nicht eingerechnet.
+#
+# Ausgabe: pro Block tx_count / weight / Fees / Feerate-Spanne + Median / ETA, Rest jenseits max_blocks
+# zusammengefasst, ETA für Feerate-Stufen (fee_tiers).
+#
+# Input = getrawmempool true (dict txid → entry). numpy optional → reiner Python-Fallback (langsamer, gleiches Ergebnis).
+# ================================================================================================================================= #
+
+import time
+import bisect
+import itertools
+
+try:
+    import numpy as np
+except ImportError:  # numpy optional → Python-Fallback
+    np = None
+
+SATS_PER_BTC = 100_000_000
+BLOCK_TIME_SECONDS = 600
+
+MAX_BLOCK_WEIGHT = 4_000_000
+COINBASE_RESERVE_WEIGHT = 4_000                  # wie bitcoind (Block-Template)
+BLOCK_WEIGHT = MAX_BLOCK_WEIGHT - COINBASE_RESERVE_WEIGHT
+
+DEFAULT_FEE_TIERS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _extract(mempool: dict):
+    """
+    getrawmempool true → drei flache Listen (ancestor_feerate sat/vB, weight, fee_sat).
+    Flache Listen statt Tupel: np.array() darauf ist um ein Vielfaches schneller.
+    """
+    rates, weights, fee_sats = [], [], []
+    for info in mempool.values():
+        fees = info.get("fees") or {}
+        vsize = info.get("vsize") or 0
+        fee_sat = (fees.get("modified", fees.get("base", 0)) or 0) * SATS_PER_BTC
+
+        anc_size = info.get("ancestorsize") or vsize
+        anc_fee = fees.get("ancestor")
+        anc_fee_sat = anc_fee * SATS_PER_BTC if anc_fee is not None else fee_sat
+
+        rates.append(anc_fee_sat / anc_size if anc_size else 0.0)
+        weights.append(info.get("weight") or vsize * 4)
+        fee_sats.append(fee_sat)
+    return rates, weights, fee_sats
+
+
+def _block_entry(index: int, rates_desc, weights, fees) -> dict:
+    """rates_desc = Feerates eines Blocks, absteigend sortiert."""
+    n = len(rates_desc)
+    if n:
+        mid = n // 2
+        median = rates_desc[mid] if n % 2 else (rates_desc[mid - 1] + rates_desc[mid]) / 2
+    else:
+        median = 0.0
+    return {
+        "index": index,
+        "tx_count": n,
+        "weight": int(sum(weights)),
+        "total_fee_sat": int(round(float(sum(fees)))),
+        "min_feerate": round(float(rates_desc[-1]), 2) if n else 0.0,
+        "max_feerate": round(float(rates_desc[0]), 2) if n else 0.0,
+        "median_feerate": round(float(median), 2),
+        "eta_s": (index + 1) * BLOCK_TIME_SECONDS,
+    }
+
+
+def _project_numpy(rates, weights, fee_sats, block_weight, max_blocks, fee_tiers):
+    n = len(rates)
+    rate = np.array(rates, dtype=np.float64)
+    weight = np.array(weights, dtype=np.int64)
+    fee = np.array(fee_sats, dtype=np.float64)
+
+    order = np.argsort(-rate, kind="stable")
+    rate, weight, fee = rate[order], weight[order], fee[order]
+
+    cum = np.cumsum(weight)
+    block_of = (cum - 1) // block_weight if n else cum
+    total_blocks = int(block_of[-1]) + 1 if n else 0
+
+    # Blockgrenzen im (aufsteigenden) block_of
+    bounds = np.searchsorted(block_of, np.arange(min(total_blocks, max_blocks) + 1), side="left")
+    blocks = [
+        _block_entry(k, rate[bounds[k]:bounds[k + 1]], weight[bounds[k]:bounds[k + 1]],
+                     fee[bounds[k]:bounds[k + 1]])
+        for k in range(len(bounds) - 1)
+    ]
+
+    rest_start = int(bounds[-1]) if len(bounds) else 0
+    rest = {
+        "blocks": max(0, total_blocks - len(blocks)),
+        "tx_count": int(n - rest_start),
+        "weight": int(weight[rest_start:].sum()),
+        "total_fee_sat": int(round(float(fee[rest_start:].sum()))),
+    }
+
+    # ETA: Weight aller TXs mit höherer Feerate → Block, in dem eine neue TX mit dieser Rate landet
+    neg = -rate
+    eta = []
+    for tier in fee_tiers:
+        ahead = int(np.searchsorted(neg, -tier, side="left"))    # Anzahl TXs mit rate > tier
+        pos = int(cum[ahead - 1]) if ahead else 0
+        eta.append(_eta_entry(tier, pos // block_weight))
+
+    return blocks, rest, eta, total_blocks, int(cum[-1]) if n else 0
+
+
+def _project_python(rates, weights, fee_sats, block_weight, max_blocks, fee_tiers):
+    rows = sorted(zip(rates, weights, fee_sats), key=lambda x: -x[0])
+    rate = [x[0] for x in rows]
+    weight = [x[1] for x in rows]
+    fee = [x[2] for x in rows]
+
+    cum = list(itertools.accumulate(weight))
+    block_of = [(c - 1) // block_weight for c in cum]
+    total_blocks = block_of[-1] + 1 if rows else 0
+
+    bounds = [bisect.bisect_left(block_of, k) for k in range(min(total_blocks, max_blocks) + 1)]
+    blocks = [
+        _block_entry(k, rate[bounds[k]:bounds[k + 1]], weight[bounds[k]:bounds[k + 1]], fee[bounds[k]:bounds[k + 1]])
+        for k in range(len(bounds) - 1)
+    ]
+
+    rest_start = bounds[-1] if bounds else 0
+    rest = {
+        "blocks": max(0, total_blocks - len(blocks)),
+        "tx_count": len(rows) - rest_start,
+        "weight": int(sum(weight[rest_start:])),
+        "total_fee_sat": int(round(sum(fee[rest_start:]))),
+    }
+
+    neg = [-x for x in rate]
+    eta = []
+    for tier in fee_tiers:
+        ahead = bisect.bisect_left(neg, -tier)
+        pos = cum[ahead - 1] if ahead else 0
+        eta.append(_eta_entry(tier, pos // block_weight))
+
+    return blocks, rest, eta, total_blocks, cum[-1] if rows else 0
+
+
+def _eta_entry(feerate, block_index: int) -> dict:
+    return {
+        "feerate": feerate,
+        "block": int(block_index),
+        "eta_s": (int(block_index) + 1) * BLOCK_TIME_SECONDS,
+    }
+
+
+def project(mempool: dict, max_blocks: int = 8, block_weight: int = BLOCK_WEIGHT,
+            fee_tiers=DEFAULT_FEE_TIERS, use_numpy: bool = True) -> dict:
+    """
+    mempool = getrawmempool true (txid → entry).
+    Returns {"computed_at", "engine", "compute_ms", "mempool_tx", "mempool_weight", "total_blocks",
+             "blocks": [...], "rest": {...}, "eta": [{"feerate", "block", "eta_s"}]}.
+    """
+    t0 = time.perf_counter()
+    columns = _extract(mempool)
+
+    if use_numpy and np is not None:
+        engine = "numpy"
+        blocks, rest, eta, total_blocks, total_weight = _project_numpy(*columns, block_weight, max_blocks, fee_tiers)
+    else:
+        engine = "python"
+        blocks, rest, eta, total_blocks, total_weight = _project_python(*columns, block_weight, max_blocks, fee_tiers)
+
+    return {
+        "computed_at": int(time.time()),
+        "engine": engine,
+        "compute_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "mempool_tx": len(columns[0]),
+        "mempool_weight": int(total_weight),
+        "block_weight": block_weight,
+        "total_blocks": int(total_blocks),
+        "blocks": blocks,
+        "rest": rest,
+        "eta": eta,
+    }
+
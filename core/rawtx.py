@@ -0,0 +1,322 @@
+# ================================================================================================================================= #
+# ------------------------------------🧬 RAW TX PARSER (LEGACY + SEGWIT, STRUCT/MEMORYVIEW)-----------------------------------------
+# ================================================================================================================================= #
+#
+# Parst die Serialisierung aus getrawtransaction [txid, false] direkt, statt bitcoind
+# verbose JSON (Scripts, asm, Adressen) bauen und Python es wieder parsen zu lassen.
+#
+# Liefert nur, was die Worker brauchen:
+#   value_sat (Summe aller Outputs), weight, vsize, size, base_size,
+#   vin_count, vout_count, segwit, script_types (Output-Typen, Namen wie bitcoind "type")
+#
+# Scripts werden nicht kopiert (memoryview), nur Länge + die ersten Bytes geprüft.
+#
+# Benchmark (verbose JSON vs. raw):
+#   python -m core.rawtx bench [--n N] [<hexfile>]        nur Python-Seite (JSON-Decode vs. parse)
+#   python -m core.rawtx bench-rpc [--n N] [<node>]       Ende-zu-Ende gegen die Node (inkl. bitcoind)
+# ================================================================================================================================= #
+
+import sys
+import json
+import time
+import struct
+import hashlib
+
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_U64 = struct.Struct("<Q")
+_U16 = struct.Struct("<H")
+
+SATS_PER_BTC = 100_000_000
+
+
+class RawTxError(ValueError):
+    pass
+
+
+def _varint(buf, pos: int):
+    """(wert, neue position)"""
+    try:
+        n = buf[pos]
+    except IndexError:
+        raise RawTxError("truncated varint")
+    if n < 0xFD:
+        return n, pos + 1
+    if n == 0xFD:
+        size, fmt = 2, _U16
+    elif n == 0xFE:
+        size, fmt = 4, _U32
+    else:
+        size, fmt = 8, _U64
+    if pos + 1 + size > len(buf):
+        raise RawTxError("truncated varint")
+    return fmt.unpack_from(buf, pos + 1)[0], pos + 1 + size
+
+
+def script_type(script) -> str:
+    """Output-Script-Typ (Namen wie bitcoind scriptPubKey.type)."""
+    n = len(script)
+    if n == 0:
+        return "nonstandard"
+
+    op = script[0]
+
+    if n == 25 and op == 0x76 and script[1] == 0xA9 and script[2] == 0x14 and script[23] == 0x88 and script[24] == 0xAC:
+        return "pubkeyhash"
+    if n == 23 and op == 0xA9 and script[1] == 0x14 and script[22] == 0x87:
+        return "scripthash"
+    if n == 22 and op == 0x00 and script[1] == 0x14:
+        return "witness_v0_keyhash"
+    if n == 34 and op == 0x00 and script[1] == 0x20:
+        return "witness_v0_scripthash"
+    if n == 34 and op == 0x51 and script[1] == 0x20:
+        return "witness_v1_taproot"
+    if n == 4 and op == 0x51 and script[1] == 0x02 and script[2] == 0x4E and script[3] == 0x73:
+        return "anchor"
+    if op == 0x6A:
+        return "nulldata"
+    if (n == 35 and op == 0x21 and script[34] == 0xAC) or (n == 67 and op == 0x41 and script[66] == 0xAC):
+        return "pubkey"
+    if (op == 0x00 or 0x51 <= op <= 0x60) and 4 <= n <= 42 and script[1] == n - 2:
+        return "witness_unknown"
+    if n >= 37 and script[-1] == 0xAE and 0x51 <= op <= 0x60:
+        return "multisig"
+    return "nonstandard"
+
+
+def parse(raw, with_script_types: bool = True, with_txid: bool = False) -> dict:
+    """
+    raw = bytes | bytearray | memoryview | hex-str.
+    with_script_types=False → Output-Scripts nur überspringen (schnellster Pfad, script_types = {}).
+    with_txid=True → zusätzlich "txid" (sha256d der Serialisierung ohne Witness, Anzeige-Reihenfolge).
+    Raises RawTxError bei kaputter / abgeschnittener Serialisierung.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = bytes.fromhex(raw)
+        except ValueError as e:
+            raise RawTxError(f"invalid hex: {e}")
+
+    buf = memoryview(raw)
+    total = len(buf)
+    if total < 10:
+        raise RawTxError("too short")
+
+    version = _I32.unpack_from(buf, 0)[0]
+    pos = 4
+
+    segwit = buf[4] == 0x00 and buf[5] != 0x00
+    if segwit:
+        pos += 2
+
+    vin_count, pos = _varint(buf, pos)
+    for _ in range(vin_count):
+        pos += 36                                   # prevout txid + index
+        slen, pos = _varint(buf, pos)
+        pos += slen + 4                             # scriptSig + sequence
+    if pos > total:
+        raise RawTxError("truncated inputs")
+
+    vout_count, pos = _varint(buf, pos)
+    value_sat = 0
+    script_types = {}
+    for _ in range(vout_count):
+        if pos + 8 > total:
+            raise RawTxError("truncated outputs")
+        value_sat += _U64.unpack_from(buf, pos)[0]
+        slen, pos = _varint(buf, pos + 8)
+        if pos + slen > total:
+            raise RawTxError("truncated script")
+        if with_script_types:
+            st = script_type(buf[pos:pos + slen])
+            script_types[st] = script_types.get(st, 0) + 1
+        pos += slen
+
+    outputs_end = pos
+
+    witness_size = 0
+    if segwit:
+        wstart = pos
+        for _ in range(vin_count):
+            items, pos = _varint(buf, pos)
+            for _ in range(items):
+                ilen, pos = _varint(buf, pos)
+                pos += ilen
+        if pos > total:
+            raise RawTxError("truncated witness")
+        witness_size = pos - wstart + 2             # + marker/flag
+
+    if pos + 4 != total:
+        raise RawTxError(f"trailing/missing bytes ({total - pos - 4})")
+
+    locktime = _U32.unpack_from(buf, pos)[0]
+
+    base_size = total - witness_size
+    weight = base_size * 3 + total
+
+    result = {
+        "version": version,
+        "locktime": locktime,
+        "segwit": segwit,
+        "vin_count": vin_count,
+        "vout_count": vout_count,
+        "value_sat": value_sat,
+        "size": total,
+        "base_size": base_size,
+        "weight": weight,
+        "vsize": (weight + 3) // 4,
+        "script_types": script_types,
+    }
+
+    if with_txid:
+        if segwit:
+            h = hashlib.sha256(buf[:4])
+            h.update(buf[6:outputs_end])
+            h.update(buf[total - 4:])
+        else:
+            h = hashlib.sha256(buf)
+        result["txid"] = hashlib.sha256(h.digest()).digest()[::-1].hex()
+
+    return result
+
+
+# =========================
+# Benchmark
+# =========================
+# 2-in / 2-out P2WPKH (Mainnet-typisch), Signaturen/Keys sind Füllbytes
+_SAMPLE_HEX = (
+    "02000000" "0001" "02"
+    + ("11" * 32 + "00000000" + "00" + "fdffffff")
+    + ("22" * 32 + "01000000" + "00" + "fdffffff")
+    + "02"
+    + ("a086010000000000" + "16" + "0014" + "33" * 20)
+    + ("40420f0000000000" + "16" + "0014" + "44" * 20)
+    + ("02" + "47" + "55" * 71 + "21" + "02" + "66" * 32) * 2
+    + "00000000"
+)
+
+
+def _verbose_like(raw_hex: str, info: dict) -> str:
+    """Grobe Nachbildung der verbose-Antwort (Felder + Größenordnung wie bitcoind)."""
+    vin = [{
+        "txid": "ab" * 32, "vout": 0,
+        "scriptSig": {"asm": "", "hex": ""},
+        "txinwitness": ["55" * 71, "02" + "66" * 32],
+        "sequence": 4294967293,
+    } for _ in range(info["vin_count"])]
+    vout = [{
+        "value": 0.001, "n": i,
+        "scriptPubKey": {
+            "asm": "0 " + "33" * 20, "desc": "addr(bc1q...)#xxxxxxxx",
+            "hex": "0014" + "33" * 20, "address": "bc1q" + "x" * 38, "type": "witness_v0_keyhash",
+        },
+    } for i in range(info["vout_count"])]
+    return json.dumps({
+        "txid": "ab" * 32, "hash": "cd" * 32, "version": 2,
+        "size": info["size"], "vsize": info["vsize"], "weight": info["weight"],
+        "locktime": 0, "vin": vin, "vout": vout, "hex": raw_hex,
+    })
+
+
+def bench(raw_hex: str, n: int = 20000) -> dict:
+    info = parse(raw_hex)
+    verbose = _verbose_like(raw_hex, info)
+    raw_reply = json.dumps(raw_hex)
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        d = json.loads(verbose)
+        sum(v.get("value", 0) for v in d.get("vout", []))
+        d.get("weight", 0)
+    t_verbose = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        parse(json.loads(raw_reply))
+    t_raw = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        parse(json.loads(raw_reply), with_script_types=False)
+    t_raw_fast = time.perf_counter() - t0
+
+    return {
+        "n": n,
+        "verbose_bytes": len(verbose),
+        "raw_bytes": len(raw_reply),
+        "verbose_us_per_tx": round(t_verbose / n * 1e6, 2),
+        "raw_us_per_tx": round(t_raw / n * 1e6, 2),
+        "raw_no_scripts_us_per_tx": round(t_raw_fast / n * 1e6, 2),
+        "speedup": round(t_verbose / t_raw, 2) if t_raw else None,
+        "speedup_no_scripts": round(t_verbose / t_raw_fast, 2) if t_raw_fast else None,
+    }
+
+
+def bench_rpc(rpc, n: int = 2000, batch: int = 200) -> dict:
+    """
+    Ende-zu-Ende gegen eine echte Node (inkl. bitcoind-Serialisierung + HTTP):
+    die ersten n Mempool-TXs einmal verbose, einmal raw + parse.
+    """
+    txids = (rpc.call("getrawmempool", [False]) or [])[:n]
+    if not txids:
+        return {"n": 0}
+
+    def _run(verbose: bool) -> float:
+        t0 = time.perf_counter()
+        for i in range(0, len(txids), batch):
+            replies = rpc.call_batch(
+                [("getrawtransaction", [t, verbose]) for t in txids[i:i + batch]], batch
+            )
+            for rep in replies:
+                res = rep.get("result")
+                if not res:
+                    continue
+                if verbose:
+                    sum(v.get("value", 0) for v in res.get("vout", []))
+                else:
+                    parse(res, with_script_types=False)
+        return time.perf_counter() - t0
+
+    t_verbose = _run(True)
+    t_raw = _run(False)
+
+    return {
+        "n": len(txids),
+        "verbose_us_per_tx": round(t_verbose / len(txids) * 1e6, 2),
+        "raw_us_per_tx": round(t_raw / len(txids) * 1e6, 2),
+        "speedup": round(t_verbose / t_raw, 2) if t_raw else None,
+    }
+
+
+_USAGE = (
+    "usage: python -m core.rawtx bench [--n N] [<hexfile>]\n"
+    "       python -m core.rawtx bench-rpc [--n N] [<node>]   (default node3)"
+)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] not in ("bench", "bench-rpc"):
+        print(_USAGE)
+        sys.exit(1)
+
+    mode, args = args[0], args[1:]
+    n = 20000 if mode == "bench" else 2000
+    if len(args) >= 2 and args[0] == "--n":
+        n = int(args[1])
+        args = args[2:]
+
+    if mode == "bench-rpc":
+        from nodes.config import NODE_CONFIG
+        from nodes.rpc import BitcoinRPC
+
+        rpc = BitcoinRPC(NODE_CONFIG[args[0] if args else "node3"])
+        print(json.dumps(bench_rpc(rpc, n)))
+        sys.exit(0)
+
+    raw_hex = _SAMPLE_HEX
+    if args:
+        with open(args[0], "r") as f:
+            raw_hex = f.read().strip()
+
+    print(json.dumps(parse(raw_hex)))
+    print(json.dumps(bench(raw_hex, n)))
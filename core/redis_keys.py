@@ -8,8 +8,9 @@
 # ================================================================================================================================= #
 BLOCKCHAIN_PREFIX = "2_BLOCKCHAIN_"
 
-# ---- Block Detail
-BLOCKCHAIN_LATEST_BLOCK_KEY = f"{BLOCKCHAIN_PREFIX}GETBLOCK_LATEST"
+# ---- Block Detail (nur bei neuem bestblockhash geschrieben)
+BLOCKCHAIN_LATEST_BLOCK_KEY       = f"{BLOCKCHAIN_PREFIX}GETBLOCK_LATEST"          # kompakt: height, hash, time, nTx, size, weight, fees (getblockstats)
+BLOCKCHAIN_LATEST_BLOCK_TXIDS_KEY = f"{BLOCKCHAIN_PREFIX}GETBLOCK_LATEST_TXIDS"    # {"hash", "height", "tx": [txid, ...]}
 
 
 # ---- Core Keys
@@ -27,6 +28,10 @@ BLOCKCHAIN_DYNAMIC_HASHRATE_KEY   = f"{BLOCKCHAIN_PREFIX}DYNAMIC_HASHRATE"
 BLOCKCHAIN_DYNAMIC_HALVING_KEY    = f"{BLOCKCHAIN_PREFIX}DYNAMIC_HALVING"
 BLOCKCHAIN_DYNAMIC_WINNERHASH_KEY = f"{BLOCKCHAIN_PREFIX}DYNAMIC_WINNERHASH"
 
+# ---- New-Block-Events (core/block_events.py, Listener im blockchain_worker)
+BLOCKCHAIN_NEW_BLOCK_CHANNEL    = f"{BLOCKCHAIN_PREFIX}NEW_BLOCK"            # Pub/Sub: {"hash", "height", "seen_ts"}
+BLOCKCHAIN_LAST_BLOCK_EVENT_KEY = f"{BLOCKCHAIN_PREFIX}LAST_BLOCK_EVENT"     # letztes Event (gleiche Payload)
+
 # ---- Blockchain Constants
 HALVING_INTERVAL      = 210_000
 LAST_HALVING_BLOCK    = 840_000
@@ -39,6 +44,8 @@ BLOCKCHAIN_LOCK_TTL_SECONDS = 10
 # ---- Worker Intervals
 BLOCKCHAIN_DYNAMIC_UPDATE_INTERVAL = 1 # UPDATE-INTERVALL
 BLOCKCHAIN_STATIC_UPDATE_INTERVAL  = 60 * 60 * 6
+BLOCKCHAIN_BLOCK_WAIT_TIMEOUT_MS   = 30_000   # waitfornewblock-Timeout pro Aufruf
+BLOCKCHAIN_INPUT_FALLBACK_INTERVAL = 60       # Sekunden; getblockchaininfo trotzdem (Listener gesund), sonst jede Sekunde
 
 
 # ================================================================================================================================= #
@@ -63,6 +70,11 @@ MEMPOOL_DYNAMIC_SIZEFEE_KEY   = f"{MEMPOOL_PREFIX}DYNAMIC_SIZEFEE"
 MEMPOOL_DYNAMIC_AVGTX_KEY     = f"{MEMPOOL_PREFIX}DYNAMIC_AVGTX"
 MEMPOOL_DYNAMIC_WAITTIME_KEY  = f"{MEMPOOL_PREFIX}DYNAMIC_WAITTIME"
 
+# ---- Projected Blocks (core/projected_blocks.py, geschrieben von btc_top aus getrawmempool true)
+MEMPOOL_PROJECTED_BLOCKS_KEY     = f"{MEMPOOL_PREFIX}PROJECTED_BLOCKS"
+MEMPOOL_PROJECTED_BLOCKS_COUNT   = 8     # einzeln ausgewiesene Blöcke, Rest zusammengefasst
+MEMPOOL_PROJECTED_BLOCKS_MAX_AGE = 30    # Sekunden; älter → Wait-Time fällt auf size / 3000 zurück
+
 # ---- Intervals
 MEMPOOL_DYNAMIC_UPDATE_INTERVAL = 1   # UPDATE-INTERVALL
 MEMPOOL_STATIC_UPDATE_INTERVAL  = 60 * 60 * 24
@@ -94,20 +106,41 @@ NETWORK_STATIC_UPDATE_INTERVAL  = 60 * 60 * 6
 # [HOME] 🔸 BTC_TOP                                       🛑 INPUT-WORKER 🛑                                           --NODE III--
 # ================================================================================================================================= #
 BTC_TOP_50_EVER_PATH = ("/raid/data/bitcoin_dashboard/metrics_history/btc_top_history/btc_top_50_history.json")
+BTC_TOP_SEEN_INDEX_SNAPSHOT_PATH = ("/raid/data/bitcoin_dashboard/metrics_history/btc_top_history/btc_top_seen_index.bin")
 
 BTC_TOP_PREFIX = "3_BTC_TOP_"
 
 # ---- Core Keys
-BTC_TOP_SEEN_KEY        = f"{BTC_TOP_PREFIX}SEEN"
 BTC_TOP_TXS_KEY         = f"{BTC_TOP_PREFIX}TXS"
 BTC_TOP_STATS_KEY       = f"{BTC_TOP_PREFIX}STATS"
 BTC_TOP_LOCK_KEY        = f"{BTC_TOP_PREFIX}LOCK"
 
-BTC_TOP_SEEN_VALUE_KEY  = f"{BTC_TOP_PREFIX}SEEN_VALUE"     # 🛑 ZENTRALE QUELLE ALLER TX-WERTE (READ-ONLY für andere Worker)
+BTC_TOP_SEEN_INDEX_KEY  = f"{BTC_TOP_PREFIX}SEEN_INDEX"     # 🛑 ZENTRALE QUELLE ALLER TX-WERTE: Hash txid(32 B) → <QQ sat, first_seen_ms (core/seen_index.py)
+BTC_TOP_SEEN_TOTALS_KEY = f"{BTC_TOP_PREFIX}SEEN_TOTALS"    # Hash count | sum_sat über SEEN_INDEX (Lua-atomar)
+BTC_TOP_SEEN_TOTALS_RECONCILE_INTERVAL = 300                # Sekunden zwischen zwei Voll-Nachrechnungen
+
+# ---- Altbestand (nur noch für workers/services/migrate/seen_index_migrate.py)
+BTC_TOP_SEEN_KEY        = f"{BTC_TOP_PREFIX}SEEN"           # SET hex-txid
+BTC_TOP_SEEN_VALUE_KEY  = f"{BTC_TOP_PREFIX}SEEN_VALUE"     # HASH hex-txid → JSON {"btc_value", "timestamp_ms"}
+
+# ---- Event-Bus (mempool-seen TX-Events, JSONL bleibt Archiv)
+BTC_TOP_EVENT_STREAM_KEY    = f"{BTC_TOP_PREFIX}EVENTS"     # Redis Stream (XADD durch btc_top)
+BTC_TOP_EVENT_STREAM_MAXLEN = 200_000                       # ~ mehrere Stunden, MAXLEN ~ (approx.)
 
 BTC_TOP_TOP_N = 50
 BTC_TOP_LOCK_TTL = 20               
 BTC_TOP_UPDATE_INTERVAL = 2.5          # UPDATE-INTERVALL
+BTC_TOP_RPC_BATCH_SIZE = 200          # getrawtransaction pro JSON-RPC-Batch (ein HTTP-Roundtrip)
+BTC_TOP_FETCH_WORKERS = 4             # parallele RPC-Batches (Thread-Pool)
+BTC_TOP_FETCH_BUDGET = 2.0            # Sekunden Fetch-Zeit pro Zyklus, Rest → nächster Zyklus
+BTC_TOP_INGEST_MODE = "poll"          # "poll" = getrawmempool true pro Zyklus | "zmq" = rawtx/sequence-Events (core/zmq_mempool.py)
+BTC_TOP_ZMQ_RECONCILE_INTERVAL = 60   # Sekunden; Abgleich per getrawmempool false (zusätzlich nach Block / Sequenz-Lücke)
+BTC_TOP_ZMQ_RAW_CACHE_MAX = 50_000    # Raw-TXs im Listener-Puffer
+BTC_TOP_SEEN_SNAPSHOT_INTERVAL = 300  # Sekunden; Seen-Index → Disk (Kaltstart nach Redis-Flush)
+BTC_TOP_BOOTSTRAP_FETCH_WORKERS = 8   # Kaltstart: mehr parallele Batches ...
+BTC_TOP_BOOTSTRAP_BUDGET = 15.0       # ... und mehr Fetch-Zeit pro Zyklus (Lock wird dabei verlängert)
+BTC_TOP_PRIORITY_AGING_VB_PER_S = 50  # Candidate-Queue: Wartesekunde zählt wie 50 vB (core/candidate_queue.py)
+BTC_TOP_PRIORITY_AGING_MAX_VB = 2_000 # ... gedeckelt (ab erstem Einreihen), Wale mit vielen kB bleiben vorne
 
 
 # ================================================================================================================================= #
@@ -290,9 +323,20 @@ BTC_TX_VOLUME_STATS         = f"{BTC_TX_VOLUME_PREFIX}STATS"
 
 BTC_TX_VOLUME_OPEN_BUCKETS  = f"{BTC_TX_VOLUME_PREFIX}OPEN_BUCKETS"
 
+BTC_TX_VOLUME_TAIL_STATE    = f"{BTC_TX_VOLUME_PREFIX}TAIL_STATE"     # JSONL-Leseposition (inode, offset, day)
+BTC_TX_VOLUME_STREAM_GROUP  = f"{BTC_TX_VOLUME_PREFIX}GROUP"          # Consumer-Group auf BTC_TOP_EVENT_STREAM_KEY
+
 
 # ================================================================================================================================= #
 POLL_SECONDS = 10  # UPDATE-INTERVALL (smallest bucket - 10s) => SOWOHL FÜR BTC_TX_VOLUME ALS AUCH FÜR BTC_TX_FEES
+TX_EVENT_SOURCE = "stream"  # "stream" (Redis Stream, live) | "jsonl" (Tail der txid_history) => SOWOHL FÜR BTC_TX_VOLUME ALS AUCH FÜR BTC_TX_FEES
+CHART_SERIES_MODE = "both"  # "json" (Blob je Fenster) | "zset" (Sorted Set je Fenster, 1 ZADD pro Bucket-Abschluss) | "both" => BTC_TX_VOLUME, BTC_TX_FEES, DASHBOARD_TRAFFIC
+CHART_SERIES_ZSET_SUFFIX = "_ZSET"  # z. B. METRICS_BTC_TX_VOLUME_1H_ZSET (score = bucket ts_ms, member = "[ts,y]")
+
+# ---- Vorkomprimierte Chart-Payloads (core.chart_payload) → <key>_GZ / <key>_BR / <key>_ETAG
+CHART_PAYLOAD_GZIP_SUFFIX   = "_GZ"
+CHART_PAYLOAD_BROTLI_SUFFIX = "_BR"
+CHART_PAYLOAD_ETAG_SUFFIX   = "_ETAG"
 # ================================================================================================================================= #
 
 
@@ -311,6 +355,9 @@ BTC_TX_FEES_STATS = f"{BTC_TX_FEES_PREFIX}STATS"
 
 BTC_TX_FEES_OPEN_BUCKETS = f"{BTC_TX_FEES_PREFIX}OPEN_BUCKETS"
 
+BTC_TX_FEES_TAIL_STATE   = f"{BTC_TX_FEES_PREFIX}TAIL_STATE"          # JSONL-Leseposition (inode, offset, day)
+BTC_TX_FEES_STREAM_GROUP = f"{BTC_TX_FEES_PREFIX}GROUP"               # Consumer-Group auf BTC_TOP_EVENT_STREAM_KEY
+
 # ================================================================================================================================= #
 
 
@@ -0,0 +1,255 @@
+# ================================================================================================================================= #
+# ------------------------------------🗂️ SEEN INDEX (BINÄR-TXID → <QQ, LAUFENDE SUMMEN, LUA-ATOMAR)---------------------------------
+# ================================================================================================================================= #
+#
+# Ein Hash für alle vom btc_top gesehenen Mempool-TXs (ersetzt SEEN-SET + SEEN_VALUE-JSON-Hash):
+#
+#   BTC_TOP_SEEN_INDEX_KEY    field = txid raw 32 B (bytes.fromhex)    value = <QQ value_sat | first_seen_ms (16 B)
+#   BTC_TOP_SEEN_TOTALS_KEY   laufende Summen (Layout + Reader: core/seen_totals.py)
+#
+# Add/Remove laufen als Lua-Script → Index-Eintrag und Summen ändern sich atomar,
+# doppelte Adds / Removes unbekannter txids verändern die Summen nicht.
+# reconcile() rechnet die Summen periodisch aus dem Index nach (Drift nach Crash / manuellem Eingriff).
+#
+# Index-Reader brauchen einen Client mit decode_responses=False (Felder/Werte sind Binär).
+#
+# Disk-Snapshot (Kaltstart nach Redis-Flush): dump() / restore(), Format:
+#   Header (16 B): magic "SIDX" | version u16 | record_size u16 | reserved 8 B
+#   Record (48 B): txid 32 B | value <QQ
+#
+# Migration vom Altbestand: python -m workers.services.migrate.seen_index_migrate
+# ================================================================================================================================= #
+
+import os
+import math
+import struct
+
+from redis.commands.core import Script
+
+from core import seen_totals
+from core.redis_keys import (
+    BTC_TOP_SEEN_INDEX_KEY,
+    BTC_TOP_SEEN_TOTALS_KEY,
+)
+
+SATS_PER_BTC = 100_000_000
+
+VALUE = struct.Struct("<QQ")   # value_sat, first_seen_ms
+
+SNAPSHOT_MAGIC = b"SIDX"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHH8x")
+SNAPSHOT_RECORD_SIZE = 32 + VALUE.size
+
+# value_sat = erste 8 Byte little-endian (< 2^53 → in Lua-Double exakt)
+_LUA_SAT_OF = """
+local function sat_of(v)
+    local n = 0
+    for i = 8, 1, -1 do
+        n = n * 256 + string.byte(v, i)
+    end
+    return n
+end
+"""
+
+_LUA_ADD = _LUA_SAT_OF + seen_totals.LUA_APPLY + """
+local added, sum = 0, 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1]) == 1 then
+        added = added + 1
+        sum = sum + sat_of(ARGV[i + 1])
+    end
+end
+apply_totals(KEYS[2], added, sum)
+return added
+"""
+
+_LUA_REMOVE = _LUA_SAT_OF + seen_totals.LUA_APPLY + """
+local removed, sum = 0, 0
+for i = 1, #ARGV do
+    local v = redis.call('HGET', KEYS[1], ARGV[i])
+    if v then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+        removed = removed + 1
+        if #v >= 8 then
+            sum = sum + sat_of(v)
+        end
+    end
+end
+apply_totals(KEYS[2], -removed, -sum)
+return removed
+"""
+
+# Einmal pro Prozess (bytes → kein Client fürs Encoding nötig), Aufruf immer mit client=
+_ADD_SCRIPT = Script(None, _LUA_ADD.encode())
+_REMOVE_SCRIPT = Script(None, _LUA_REMOVE.encode())
+
+
+def btc_to_sat(btc_value) -> int:
+    return int(math.floor(float(btc_value) * SATS_PER_BTC + 0.5))
+
+
+def txid_field(txid: str) -> bytes:
+    return bytes.fromhex(txid)
+
+
+def txid_hex(field) -> str:
+    return bytes(field).hex()
+
+
+def pack(value_sat: int, first_seen_ms: int) -> bytes:
+    return VALUE.pack(int(value_sat), int(first_seen_ms))
+
+
+def unpack(raw: bytes):
+    """(value_sat, first_seen_ms)"""
+    return VALUE.unpack_from(raw)
+
+
+# =========================
+# Writer (btc_top)
+# =========================
+def add(r, entries: dict, client=None) -> None:
+    """
+    entries = {txid_hex: (value_sat, first_seen_ms)}.
+    client = Pipeline (optional) → läuft mit deren execute().
+    """
+    if not entries:
+        return
+    args = []
+    for txid, (value_sat, first_seen_ms) in entries.items():
+        args.append(txid_field(txid))
+        args.append(pack(value_sat, first_seen_ms))
+    _add_raw(r, args, client)
+
+
+def _add_raw(r, args: list, client=None) -> None:
+    """args = [field, packed_value, field, packed_value, ...] (Binär, wie im Index)."""
+    _ADD_SCRIPT(keys=[BTC_TOP_SEEN_INDEX_KEY, BTC_TOP_SEEN_TOTALS_KEY], args=args, client=client or r)
+
+
+def remove(r, txids, client=None) -> None:
+    """HDEL + Summen abziehen. txids = hex."""
+    if not txids:
+        return
+    _REMOVE_SCRIPT(
+        keys=[BTC_TOP_SEEN_INDEX_KEY, BTC_TOP_SEEN_TOTALS_KEY],
+        args=[txid_field(t) for t in txids],
+        client=client or r,
+    )
+
+
+def reconcile(r, scan_count: int = 5000) -> dict:
+    """
+    Summen komplett aus dem Index neu berechnen (HSCAN, kein Riesen-Reply) und überschreiben.
+    Nur vom einzigen Writer (btc_top) zwischen zwei Zyklen aufrufen.
+    Returns {"count", "sum_sat", "drift_count", "drift_sat"}.
+    """
+    count = 0
+    sum_sat = 0
+    for _, raw in r.hscan_iter(BTC_TOP_SEEN_INDEX_KEY, count=scan_count):
+        count += 1
+        if len(raw) >= VALUE.size:
+            sum_sat += unpack(raw)[0]
+
+    prev_count, prev_sat = seen_totals.read_raw(r)
+    seen_totals.store(r, count, sum_sat)
+
+    return {
+        "count": count,
+        "sum_sat": sum_sat,
+        "drift_count": count - prev_count,
+        "drift_sat": sum_sat - prev_sat,
+    }
+
+
+# =========================
+# Disk-Snapshot
+# =========================
+def dump(r, path: str, scan_count: int = 5000) -> int:
+    """Index per HSCAN nach path schreiben (tmp + os.replace). Returns Anzahl Records."""
+    tmp_path = f"{path}.tmp"
+    count = 0
+    buf = []
+
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_RECORD_SIZE))
+        for field, raw in r.hscan_iter(BTC_TOP_SEEN_INDEX_KEY, count=scan_count):
+            if len(field) != 32 or len(raw) != VALUE.size:
+                continue
+            buf.append(field)
+            buf.append(raw)
+            count += 1
+            if len(buf) >= 2 * scan_count:
+                f.write(b"".join(buf))
+                buf = []
+        f.write(b"".join(buf))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def iter_snapshot(path: str):
+    """Yields (field 32 B, packed_value 16 B). Fehlende Datei → nichts, fremder Header → ValueError."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+
+    if len(data) < SNAPSHOT_HEADER.size:
+        return
+    magic, version, record_size = SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or record_size != SNAPSHOT_RECORD_SIZE:
+        raise ValueError(f"unexpected seen index snapshot header in {path}")
+
+    view = memoryview(data)
+    for off in range(SNAPSHOT_HEADER.size, len(data) - SNAPSHOT_RECORD_SIZE + 1, SNAPSHOT_RECORD_SIZE):
+        yield bytes(view[off:off + 32]), bytes(view[off + 32:off + SNAPSHOT_RECORD_SIZE])
+
+
+def restore(r, path: str, mempool_txids=None, batch: int = 5000) -> int:
+    """
+    Snapshot zurück in den Index (HSETNX, vorhandene Einträge bleiben).
+    mempool_txids (hex) → nur TXs, die noch im Mempool sind. Summen danach per reconcile().
+    Returns Anzahl übernommener Records.
+    """
+    restored = 0
+    args = []
+    pipe = r.pipeline(transaction=False)
+
+    for field, raw in iter_snapshot(path):
+        if mempool_txids is not None and txid_hex(field) not in mempool_txids:
+            continue
+        args.append(field)
+        args.append(raw)
+        restored += 1
+        if len(args) >= 2 * batch:
+            _add_raw(r, args, client=pipe)
+            args = []
+
+    if args:
+        _add_raw(r, args, client=pipe)
+    pipe.execute()
+
+    reconcile(r)
+    return restored
+
+
+# =========================
+# Reader
+# =========================
+def txids(r) -> set:
+    """Alle gesehenen txids (hex)."""
+    return {txid_hex(f) for f in r.hkeys(BTC_TOP_SEEN_INDEX_KEY)}
+
+
+def get(r, txid: str):
+    """(btc_value, first_seen_ms) oder None."""
+    raw = r.hget(BTC_TOP_SEEN_INDEX_KEY, txid_field(txid))
+    if not raw or len(raw) < VALUE.size:
+        return None
+    value_sat, first_seen_ms = unpack(raw)
+    return value_sat / SATS_PER_BTC, first_seen_ms
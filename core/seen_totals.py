@@ -0,0 +1,71 @@
+# ================================================================================================================================= #
+# ------------------------------------🧮 SEEN TOTALS (LAUFENDE SUMMEN ÜBER DEN SEEN INDEX, LUA-ATOMAR)------------------------------
+# ================================================================================================================================= #
+#
+# btc_top pflegt neben dem Seen-Index (core/seen_index.py) einen kleinen Stats-Hash:
+#
+#   BTC_TOP_SEEN_TOTALS_KEY   count | sum_sat | reconciled_ts
+#
+# Das Feld-Layout gehört diesem Modul:
+#   LUA_APPLY   Lua-Funktion apply_totals(key, d_count, d_sat) → wird in die Add/Remove-Scripts des Index
+#               eingebettet, Index-Eintrag und Summen ändern sich damit in einem Script (atomar)
+#   store()     Summen nach einer Voll-Nachrechnung überschreiben (seen_index.reconcile)
+#
+# Reader (mempool avg_tx, btc_volume): read() = ein HMGET statt HVALS über den ganzen Mempool.
+# ================================================================================================================================= #
+
+import time
+
+from core.redis_keys import BTC_TOP_SEEN_TOTALS_KEY
+
+SATS_PER_BTC = 100_000_000
+
+# d_sat als Double (< 2^53 exakt), HINCRBY braucht eine Ganzzahl ohne "-0"
+LUA_APPLY = """
+local function apply_totals(key, d_count, d_sat)
+    if d_count ~= 0 then
+        redis.call('HINCRBY', key, 'count', d_count)
+    end
+    if d_sat ~= 0 then
+        redis.call('HINCRBY', key, 'sum_sat', string.format('%.0f', d_sat))
+    end
+end
+"""
+
+
+def _d(x):
+    return x.decode() if isinstance(x, (bytes, bytearray)) else x
+
+
+# =========================
+# Writer (btc_top)
+# =========================
+def store(r, count: int, sum_sat: int) -> None:
+    r.hset(BTC_TOP_SEEN_TOTALS_KEY, mapping={
+        "count": int(count),
+        "sum_sat": int(sum_sat),
+        "reconciled_ts": int(time.time()),
+    })
+
+
+# =========================
+# Reader
+# =========================
+def read_raw(r):
+    """(count, sum_sat) – 0/0, solange btc_top noch nichts geschrieben hat."""
+    count, sum_sat = r.hmget(BTC_TOP_SEEN_TOTALS_KEY, "count", "sum_sat")
+    try:
+        count = int(_d(count) or 0)
+    except ValueError:
+        count = 0
+    try:
+        sum_sat = int(_d(sum_sat) or 0)
+    except ValueError:
+        sum_sat = 0
+    return count, sum_sat
+
+
+def read(r):
+    """(tx_count, volume_btc) des aktuell gesehenen Mempools – O(1)."""
+    count, sum_sat = read_raw(r)
+    return count, sum_sat / SATS_PER_BTC
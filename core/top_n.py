@@ -0,0 +1,96 @@
+# ================================================================================================================================= #
+# ------------------------------------🏆 TOP-N (MIN-HEAP, TXID-DEDUPE, EXPIRY)-----------------------------------------------------
+# ================================================================================================================================= #
+#
+# Begrenzte Top-N-Liste nach btc_value:
+#
+#   - Min-Heap mit höchstens limit Einträgen → Insert O(log N), kleinster Wert liegt oben
+#   - txid-Dedupe (eine TX wird nie doppelt aufgenommen)
+#   - expire(cutoff_ms) für Zeitfenster (24h, 1w, ...) über timestamp_ms
+#
+# Einträge sind die bisherigen Dicts ({"txid", "btc_value", ...}) → Ausgabe bleibt JSON-kompatibel.
+# Gleichstand: älterer Eintrag wird zuerst verdrängt, items() sortiert wie sorted(..., reverse=True).
+# ================================================================================================================================= #
+
+import heapq
+import itertools
+
+
+class TopN:
+    def __init__(self, limit: int, value_field: str = "btc_value", ts_field: str = "timestamp_ms"):
+        self.limit = int(limit)
+        self.value_field = value_field
+        self.ts_field = ts_field
+
+        self._heap = []         # (value, seq, entry)
+        self._txids = set()
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, txid):
+        return txid in self._txids
+
+    def is_full(self) -> bool:
+        return len(self._heap) >= self.limit
+
+    def min_value(self):
+        """Kleinster Wert in der Liste (Eintrittsschwelle, sobald voll) oder None."""
+        return self._heap[0][0] if self._heap else None
+
+    def accepts(self, value) -> bool:
+        """Würde ein Eintrag mit diesem Wert aufgenommen? (vor teuren Lookups prüfen)"""
+        return not self.is_full() or value > self._heap[0][0]
+
+    def push(self, entry: dict) -> bool:
+        """Eintrag aufnehmen, falls neu und groß genug. Returns True, wenn er jetzt in der Liste ist."""
+        txid = entry.get("txid")
+        if not txid or txid in self._txids or self.limit <= 0:
+            return False
+
+        value = entry[self.value_field]
+        if not self.accepts(value):
+            return False
+
+        item = (value, next(self._seq), entry)
+        if self.is_full():
+            _, _, evicted = heapq.heapreplace(self._heap, item)
+            self._txids.discard(evicted.get("txid"))
+        else:
+            heapq.heappush(self._heap, item)
+
+        self._txids.add(txid)
+        return True
+
+    def extend(self, entries) -> int:
+        return sum(1 for e in entries if self.push(e))
+
+    def expire(self, cutoff_ms: int) -> int:
+        """Einträge mit ts < cutoff_ms entfernen. Returns Anzahl entfernter Einträge."""
+        keep = [it for it in self._heap if it[2].get(self.ts_field, 0) >= cutoff_ms]
+        removed = len(self._heap) - len(keep)
+        if removed:
+            heapq.heapify(keep)
+            self._heap = keep
+            self._txids = {it[2].get("txid") for it in keep}
+        return removed
+
+    def retain(self, txids) -> int:
+        """Nur Einträge behalten, deren txid in txids liegt (z. B. noch im Mempool)."""
+        keep = [it for it in self._heap if it[2].get("txid") in txids]
+        removed = len(self._heap) - len(keep)
+        if removed:
+            heapq.heapify(keep)
+            self._heap = keep
+            self._txids = {it[2].get("txid") for it in keep}
+        return removed
+
+    def reset(self, entries=()) -> None:
+        self._heap = []
+        self._txids = set()
+        self.extend(entries)
+
+    def items(self) -> list:
+        """Einträge absteigend nach Wert (bei Gleichstand der ältere zuerst)."""
+        return [it[2] for it in sorted(self._heap, key=lambda it: (-it[0], it[1]))]
@@ -0,0 +1,242 @@
+# ================================================================================================================================= #
+# ------------------------------------📡 TX EVENT STREAM (REDIS STREAMS, MEMPOOL-SEEN EVENTS)---------------------------------------
+# ================================================================================================================================= #
+
+import redis
+
+from core.redis_keys import (
+    BTC_TOP_EVENT_STREAM_KEY,
+    BTC_TOP_EVENT_STREAM_MAXLEN,
+)
+
+# Feldtypen eines Events (identisch zur JSONL-Zeile in txid_history)
+_INT_FIELDS = ("timestamp_ms", "weight", "fee_sat", "mempool_size")
+_FLOAT_FIELDS = ("btc_value",)
+
+
+def _d(x):
+    return x.decode() if isinstance(x, (bytes, bytearray)) else x
+
+
+# =========================
+# Producer (btc_top)
+# =========================
+def xadd_event(r, entry: dict, stream_key: str = BTC_TOP_EVENT_STREAM_KEY) -> None:
+    """
+    Hängt ein TX-Event an den gekappten Stream an (r darf auch eine Pipeline sein).
+    MAXLEN ~ → Redis trimmt blockweise, O(1) amortisiert.
+    """
+    r.xadd(
+        stream_key,
+        {k: str(v) for k, v in entry.items()},
+        maxlen=BTC_TOP_EVENT_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+def decode_event(fields: dict) -> dict:
+    entry = {_d(k): _d(v) for k, v in fields.items()}
+
+    for k in _INT_FIELDS:
+        try:
+            entry[k] = int(entry.get(k, 0))
+        except Exception:
+            entry[k] = 0
+
+    for k in _FLOAT_FIELDS:
+        try:
+            entry[k] = float(entry.get(k, 0.0))
+        except Exception:
+            entry[k] = 0.0
+
+    return entry
+
+
+# =========================
+# Dedupe (Live-Worker + Rebuild)
+# =========================
+class TxEventCursor:
+    """
+    Gemeinsame Dedupe-Regel für TX-Events (JSONL, Stream, Rebuild):
+    ein Event zählt, wenn (timestamp_ms, txid) hinter dem Cursor liegt.
+
+    btc_top schreibt einen ganzen Fetch-Batch mit (fast) gleichem timestamp_ms →
+    innerhalb derselben ms unterscheidet die txid, nicht der Timestamp.
+    Nach seek() ohne txids (Warmstart) gilt die Grenz-ms als bereits gezählt.
+    """
+
+    def __init__(self, last_ts_ms: int = 0, txids=None):
+        self.seek(last_ts_ms, txids)
+
+    def seek(self, last_ts_ms: int, txids=None) -> None:
+        self.last_ts_ms = int(last_ts_ms or 0)
+        self._txids = set(txids) if txids is not None else None
+
+    def accept(self, entry: dict) -> bool:
+        """True = neues Event (Cursor rückt vor), False = älter oder Duplikat."""
+        ts = int(entry.get("timestamp_ms", 0))
+        if ts < self.last_ts_ms:
+            return False
+
+        txid = entry.get("txid") or ""
+        if ts == self.last_ts_ms:
+            if self._txids is None or txid in self._txids:
+                return False
+            self._txids.add(txid)
+            return True
+
+        self.last_ts_ms = ts
+        self._txids = {txid}
+        return True
+
+
+# =========================
+# Consumer (Metrics-Worker)
+# =========================
+def _id_tuple(msg_id) -> tuple:
+    """Stream-ID "ms-seq" → (ms, seq) zum Vergleichen."""
+    ms, _, seq = _d(msg_id).partition("-")
+    return int(ms), int(seq or 0)
+
+
+class TxEventConsumer:
+    """
+    Consumer-Group-Leser für den TX-Event-Stream.
+
+    - jede Gruppe (= ein Worker) hat ihren eigenen, von Redis gehaltenen Offset
+    - Events werden nach der Verarbeitung per XACK bestätigt
+    - Restart: resume(ts_ms) spielt die Lücke Snapshot → last-delivered-id der Gruppe per XRANGE nach
+      (Gruppen-Offset bleibt), read() holt danach zuerst die eigene PEL ("0"), dann neue Events (">")
+    - nur bei neuer Gruppe oder getrimmtem Stream: JSONL-Catch-up beim Worker + start_after(ts_ms);
+      die Stream-IDs sind ms-basiert (Redis-Uhr), daher mit Sicherheitsabstand –
+      doppelte Events filtert der Worker über TxEventCursor
+    """
+
+    SETID_SLACK_MS = 60 * 1000
+    REPLAY_COUNT = 1000
+
+    def __init__(self, r, group: str, consumer: str = "worker",
+                 stream_key: str = BTC_TOP_EVENT_STREAM_KEY, name: str = "STREAM"):
+        self.r = r
+        self.group = group
+        self.consumer = consumer
+        self.stream_key = stream_key
+        self.name = name
+        self._pending_id = "0"      # PEL-Position; None = PEL abgearbeitet → ">"
+
+    def ensure_group(self) -> None:
+        try:
+            self.r.xgroup_create(self.stream_key, self.group, id="$", mkstream=True)
+            print(f"[{self.name}] group created: {self.group}")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _start_id(self, ts_ms: int) -> str:
+        return f"{max(0, int(ts_ms) - self.SETID_SLACK_MS)}-0" if ts_ms > 0 else "0-0"
+
+    def _group_info(self):
+        """XINFO GROUPS-Eintrag dieser Gruppe oder None (Gruppe / Stream fehlt)."""
+        try:
+            groups = self.r.xinfo_groups(self.stream_key)
+        except redis.ResponseError:
+            return None
+        for g in groups:
+            if _d(g.get("name")) == self.group:
+                return g
+        return None
+
+    def _trimmed_since(self, start_id: str) -> bool:
+        """True = Einträge ab start_id wurden schon getrimmt (MAXLEN) → Stream allein reicht nicht."""
+        info = self.r.xinfo_stream(self.stream_key)
+        deleted = info.get("max-deleted-entry-id")
+        if deleted is not None and _id_tuple(deleted) > (0, 0):
+            return _id_tuple(deleted) >= _id_tuple(start_id)
+
+        # Redis < 7 (bzw. Feld nicht gepflegt): konservativ über den ältesten Eintrag
+        added = info.get("entries-added")
+        if added is not None and int(added) <= int(info.get("length") or 0):
+            return False        # nie etwas gelöscht
+        first = info.get("first-entry")
+        return bool(first) and _id_tuple(first[0]) > _id_tuple(start_id)
+
+    def resume(self, ts_ms: int):
+        """
+        Anschluss an den Warmstart-Stand ts_ms ohne Tagesdatei.
+        Returns Iterator über (msg_id, entry) von ts_ms (minus Slack) bis last-delivered-id der Gruppe,
+        oder None → Gruppe neu / Stream getrimmt: JSONL-Catch-up, danach start_after(ts_ms).
+        """
+        group = self._group_info()
+        if group is None:
+            print(f"[{self.name}] no group {self.group} → JSONL catch-up")
+            return None
+
+        start_id = self._start_id(ts_ms)
+        if self._trimmed_since(start_id):
+            print(f"[{self.name}] stream trimmed past {start_id} → JSONL catch-up")
+            return None
+
+        last_id = _d(group.get("last-delivered-id"))
+        print(
+            f"[{self.name}] resume group {self.group}: replay {start_id}..{last_id}, "
+            f"pending={group.get('pending')} lag={group.get('lag')}"
+        )
+        return self._replay(start_id, last_id)
+
+    def _replay(self, start_id: str, last_id: str):
+        if _id_tuple(last_id) < _id_tuple(start_id):
+            return
+        lo = start_id
+        while True:
+            msgs = self.r.xrange(self.stream_key, min=lo, max=last_id, count=self.REPLAY_COUNT)
+            for msg_id, fields in msgs:
+                yield msg_id, decode_event(fields)
+            if len(msgs) < self.REPLAY_COUNT:
+                return
+            lo = "(" + _d(msgs[-1][0])
+
+    def start_after(self, ts_ms: int) -> None:
+        """
+        Neue Gruppe / getrimmter Stream: Offset auf ts_ms (minus Slack) setzen, nachdem der Worker aus der
+        JSONL aufgeholt hat. Liegengebliebene PEL-Einträge kommen über read() noch einmal (Cursor filtert).
+        """
+        self.ensure_group()
+
+        start_id = self._start_id(ts_ms) if ts_ms > 0 else "$"
+        self.r.xgroup_setid(self.stream_key, self.group, id=start_id)
+        self._pending_id = "0"
+
+        print(f"[{self.name}] start_after id={start_id}")
+
+    def read(self, block_ms: int, count: int = 1000):
+        """
+        Liefert [(msg_id, entry)]: erst die eigene PEL (ohne Blockieren), dann neue Events;
+        blockiert bis block_ms, falls leer. Getrimmte PEL-Einträge kommen als leeres Event (→ nur ack).
+        """
+        if self._pending_id is not None:
+            resp = self.r.xreadgroup(
+                self.group, self.consumer, {self.stream_key: self._pending_id}, count=count
+            ) or []
+            msgs = [m for _, batch in resp for m in batch]
+            if msgs:
+                self._pending_id = _d(msgs[-1][0])
+                return [(msg_id, decode_event(fields or {})) for msg_id, fields in msgs]
+            self._pending_id = None
+
+        resp = self.r.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream_key: ">"},
+            count=count,
+            block=max(1, int(block_ms)),
+        ) or []
+
+        return [
+            (msg_id, decode_event(fields))
+            for _, msgs in resp
+            for msg_id, fields in msgs
+        ]
+
+    def ack(self, ids) -> None:
+        if ids:
+            self.r.xack(self.stream_key, self.group, *ids)
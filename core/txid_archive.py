@@ -0,0 +1,263 @@
+# ================================================================================================================================= #
+# ------------------------------------🗜️ TXID-HISTORY ARCHIV (ZSTD-FRAMES + SIDECAR-INDEX, NVMe)------------------------------------
+# ================================================================================================================================= #
+#
+# Abgeschlossene Tage werden vom Storage-Worker finalisiert:
+#
+#   all_mempool_seen_YYYYMMDD.jsonl.zst       unabhängige zstd-Frames à FRAME_LINES JSONL-Zeilen
+#                                             (aneinandergehängt = gültiger zstd-Stream → `zstd -dc` funktioniert)
+#   all_mempool_seen_YYYYMMDD.jsonl.zst.idx   JSON: pro Frame [offset, length, first_ts_ms, last_ts_ms, lines]
+#
+# Zeitbereichsabfragen dekomprimieren nur die Frames, die [t0, t1) überlappen.
+# ================================================================================================================================= #
+
+import os
+import json
+import time
+import heapq
+
+try:
+    import zstandard as zstd
+except ImportError:  # optional → Storage-Worker bleibt beim Raw-Copy
+    zstd = None
+
+
+FILE_PREFIX = "all_mempool_seen_"
+ARCHIVE_SUFFIX = ".jsonl.zst"
+INDEX_SUFFIX = ".jsonl.zst.idx"
+RAW_SUFFIX = ".jsonl"
+
+FRAME_LINES = 8192
+ZSTD_LEVEL = 9
+INDEX_VERSION = 1
+
+DAY_MS = 86400 * 1000
+
+
+def available() -> bool:
+    return zstd is not None
+
+
+def archive_path(archive_dir: str, day: str) -> str:
+    return os.path.join(archive_dir, f"{FILE_PREFIX}{day}{ARCHIVE_SUFFIX}")
+
+
+def index_path(archive_dir: str, day: str) -> str:
+    return os.path.join(archive_dir, f"{FILE_PREFIX}{day}{INDEX_SUFFIX}")
+
+
+def raw_path(archive_dir: str, day: str) -> str:
+    return os.path.join(archive_dir, f"{FILE_PREFIX}{day}{RAW_SUFFIX}")
+
+
+def is_finalized(archive_dir: str, day: str) -> bool:
+    # Index wird als letztes geschrieben → erst dann gilt der Tag als fertig
+    return os.path.exists(archive_path(archive_dir, day)) and os.path.exists(index_path(archive_dir, day))
+
+
+def _filter_lines(lines, t0_ms: int, t1_ms: int):
+    for line in lines:
+        try:
+            e = json.loads(line)
+        except Exception:
+            continue
+        if t0_ms <= int(e.get("timestamp_ms", 0)) < t1_ms:
+            yield e
+
+
+# =========================
+# Finalisieren (Storage-Worker)
+# =========================
+def _iter_source(path: str):
+    """(timestamp_ms, txid, line) einer Quelle, in Dateireihenfolge."""
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                e = json.loads(line)
+            except Exception:
+                continue  # abgeschnittene Zeile (Crash / Segment-Ende)
+            yield int(e.get("timestamp_ms", 0)), e.get("txid") or "", line
+
+
+def merge_sources(sources):
+    """
+    k-way Merge aller Quellen nach timestamp_ms (jede Quelle ist von btc_top in
+    Zeitreihenfolge angehängt) → Duplikate (gleiche ms + txid) liegen direkt
+    hintereinander und fallen raus. Speicher: nur die txids der aktuellen ms.
+    """
+    streams = [_iter_source(src) for src in sources if os.path.exists(src)]
+
+    cur_ts = None
+    cur_txids = set()
+    for ts, txid, line in heapq.merge(*streams, key=lambda x: x[0]):
+        if ts != cur_ts:
+            cur_ts = ts
+            cur_txids = set()
+        elif txid in cur_txids:
+            continue
+        cur_txids.add(txid)
+        yield ts, line
+
+
+def finalize_day(sources, archive_dir: str, day: str) -> int:
+    """
+    Führt alle Quellen eines Tages (RAM-Datei, NVMe-Kopie, degraded Segmente)
+    zusammen → dedupliziert (txid, timestamp_ms), nach Zeit gemergt, und
+    schreibt Archiv + Index atomar (tmp + os.replace). Returns Anzahl Zeilen.
+    Streamend: im Speicher liegt höchstens ein Frame.
+    """
+    if zstd is None:
+        raise RuntimeError("zstandard not installed")
+
+    os.makedirs(archive_dir, exist_ok=True)
+    dst = archive_path(archive_dir, day)
+    idx = index_path(archive_dir, day)
+
+    cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+    frames = []
+    offset = 0
+    lines = 0
+
+    def write_frame(f, chunk):
+        nonlocal offset
+        blob = cctx.compress(b"\n".join(line for _, line in chunk) + b"\n")
+        f.write(blob)
+        # min/max statt erster/letzter Zeile → Index bleibt korrekt, falls eine Quelle
+        # nicht streng sortiert ist (Uhrsprung)
+        ts = [t for t, _ in chunk]
+        frames.append([offset, len(blob), min(ts), max(ts), len(chunk)])
+        offset += len(blob)
+
+    with open(dst + ".tmp", "wb") as f:
+        chunk = []
+        for row in merge_sources(sources):
+            chunk.append(row)
+            if len(chunk) >= FRAME_LINES:
+                write_frame(f, chunk)
+                lines += len(chunk)
+                chunk = []
+        if chunk:
+            write_frame(f, chunk)
+            lines += len(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+    with open(idx + ".tmp", "w") as f:
+        json.dump({
+            "version": INDEX_VERSION,
+            "day": day,
+            "lines": lines,
+            "frames": frames,
+            "created_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }, f, separators=(",", ":"))
+
+    os.replace(dst + ".tmp", dst)
+    os.replace(idx + ".tmp", idx)
+
+    return lines
+
+
+def load_index(archive_dir: str, day: str):
+    try:
+        with open(index_path(archive_dir, day), "r") as f:
+            idx = json.load(f)
+    except Exception:
+        return None
+
+    if idx.get("version") != INDEX_VERSION:
+        return None
+    return idx
+
+
+def verify_day(archive_dir: str, day: str, expected_lines: int) -> bool:
+    """Archiv komplett dekomprimieren und Zeilen zählen (vor dem Löschen der Rohdaten)."""
+    idx = load_index(archive_dir, day)
+    if not idx or idx.get("lines") != expected_lines:
+        return False
+
+    n = sum(1 for _ in _iter_frames(archive_dir, day, idx["frames"]))
+    return n == expected_lines
+
+
+# =========================
+# Reader
+# =========================
+def _iter_frames(archive_dir: str, day: str, frames):
+    dctx = zstd.ZstdDecompressor()
+    with open(archive_path(archive_dir, day), "rb") as f:
+        for off, length, _, _, _ in frames:
+            f.seek(off)
+            data = dctx.decompress(f.read(length))
+            for line in data.split(b"\n"):
+                if line:
+                    yield line
+
+
+def _iter_raw(path: str, t0_ms: int, t1_ms: int):
+    with open(path, "rb") as f:
+        yield from _filter_lines(f, t0_ms, t1_ms)
+
+
+def _iter_day_file(archive_dir: str, day: str, t0_ms: int, t1_ms: int, raw_fallback: bool = True):
+    if zstd is not None and is_finalized(archive_dir, day):
+        idx = load_index(archive_dir, day)
+        if idx is None:
+            return
+
+        frames = [fr for fr in idx["frames"] if fr[3] >= t0_ms and fr[2] < t1_ms]
+        yield from _filter_lines(_iter_frames(archive_dir, day, frames), t0_ms, t1_ms)
+        return
+
+    raw = raw_path(archive_dir, day)
+    if raw_fallback and os.path.exists(raw):
+        yield from _iter_raw(raw, t0_ms, t1_ms)
+
+
+def iter_events(archive_dir: str, t0_ms: int, t1_ms: int):
+    """
+    Streamt alle Events mit t0_ms <= timestamp_ms < t1_ms über beliebig viele Tage.
+    Finalisierte Tage: nur überlappende Frames werden dekomprimiert.
+    Nicht finalisierte Tage (heute): Fallback auf die Raw-JSONL.
+
+    Die Tagesdatei richtet sich nach dem Zyklusstart von btc_top → die ersten
+    Sekunden nach Mitternacht können noch im Vortag liegen; der Vortag wird
+    daher über den Index (ohne Raw-Fallback) mitgeprüft.
+    """
+    if t1_ms <= t0_ms:
+        return
+
+    day_ms = (t0_ms // DAY_MS) * DAY_MS - DAY_MS
+    first = True
+    while day_ms < t1_ms:
+        day = time.strftime("%Y%m%d", time.gmtime(day_ms / 1000))
+        day_ms += DAY_MS
+
+        yield from _iter_day_file(archive_dir, day, t0_ms, t1_ms, raw_fallback=not first)
+        first = False
+
+
+def iter_day(archive_dir: str, day: str):
+    """Alle Events einer Tagesdatei (YYYYMMDD), ohne Zeitfilter."""
+    yield from _iter_day_file(archive_dir, day, -1, 2 ** 63)
+
+
+def list_days(archive_dir: str):
+    """Alle Tage (YYYYMMDD), für die ein Archiv oder eine Raw-JSONL existiert."""
+    try:
+        names = os.listdir(archive_dir)
+    except FileNotFoundError:
+        return []
+
+    days = set()
+    for fname in names:
+        if not fname.startswith(FILE_PREFIX):
+            continue
+        rest = fname[len(FILE_PREFIX):]
+        day = rest[:8]
+        if day.isdigit() and rest[8:] in (RAW_SUFFIX, ARCHIVE_SUFFIX):
+            days.add(day)
+
+    return sorted(days)
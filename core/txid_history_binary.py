@@ -0,0 +1,283 @@
+# ================================================================================================================================= #
+# ------------------------------------💾 TXID-HISTORY BINÄRFORMAT (FIXED-WIDTH, MMAP-READER)----------------------------------------
+# ================================================================================================================================= #
+#
+# Kompaktes Gegenstück zu all_mempool_seen_YYYYMMDD.jsonl:
+#
+#   Header (16 B):  magic "TXHB" | version u16 | record_size u16 | reserved 8 B
+#   Record (64 B):  txid 32 B (raw, RPC-Anzeigereihenfolge)
+#                   timestamp_ms u64 | value_sat u64 | fee_sat u64 | weight u32 | mempool_size u32
+#
+# Little-endian, feste Breite → Reader mappt die Datei per mmap und liefert
+# (mit numpy) eine structured-array View ohne Parsing / Kopie.
+#
+# btc_top schreibt pro Zyklus dieselben Einträge wie in die JSONL (all_mempool_seen_YYYYMMDD.bin).
+# Die JSONL bleibt nur für heute + gestern auf der RAM-Disk (Tail-Reader, Storage-Kopie, Archiv);
+# ältere Tage löscht der Storage-Worker, sobald sie archiviert sind und covers_jsonl() gilt →
+# auf der RAM-Disk liegen ältere Tage nur noch mit 64 B / TX statt ~190 B JSONL.
+# Leser: tx_buckets_rebuild (load_day + accepted_indices, ohne JSON-Parsing).
+#
+# CLI:
+#   python -m core.txid_history_binary to-bin   <src.jsonl> <dst.bin>
+#   python -m core.txid_history_binary to-jsonl <src.bin>   <dst.jsonl>
+# ================================================================================================================================= #
+
+import os
+import sys
+import json
+import mmap
+import struct
+
+from core.txid_archive import FILE_PREFIX
+
+try:
+    import numpy as np
+except ImportError:  # numpy optional → struct-Fallback
+    np = None
+
+
+MAGIC = b"TXHB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHH8x")
+RECORD = struct.Struct("<32sQQQII")
+
+HEADER_SIZE = HEADER.size   # 16
+RECORD_SIZE = RECORD.size   # 64
+
+SATS_PER_BTC = 100_000_000
+
+BIN_SUFFIX = ".bin"
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ("txid", "u1", (32,)),      # raw bytes (kein "S32": würde 0x00 am Ende abschneiden)
+        ("timestamp_ms", "<u8"),
+        ("value_sat", "<u8"),
+        ("fee_sat", "<u8"),
+        ("weight", "<u4"),
+        ("mempool_size", "<u4"),
+    ])
+    assert RECORD_DTYPE.itemsize == RECORD_SIZE
+else:
+    RECORD_DTYPE = None
+
+
+def day_path(directory: str, day: str) -> str:
+    """all_mempool_seen_YYYYMMDD.bin (neben der JSONL gleichen Namens)."""
+    return os.path.join(directory, f"{FILE_PREFIX}{day}{BIN_SUFFIX}")
+
+
+def list_days(directory: str):
+    """Alle Tage (YYYYMMDD) mit .bin in directory."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    days = {
+        name[len(FILE_PREFIX):-len(BIN_SUFFIX)]
+        for name in names
+        if name.startswith(FILE_PREFIX) and name.endswith(BIN_SUFFIX)
+    }
+    return sorted(day for day in days if len(day) == 8 and day.isdigit())
+
+
+# =========================
+# Encode / Decode
+# =========================
+def pack_entry(entry: dict) -> bytes:
+    """JSONL-Entry (btc_value in BTC) → 64-Byte-Record (Beträge in sats)."""
+    return RECORD.pack(
+        bytes.fromhex(entry["txid"]),
+        int(entry.get("timestamp_ms", 0)),
+        int(round(float(entry.get("btc_value", 0.0)) * SATS_PER_BTC)),
+        max(0, int(entry.get("fee_sat", 0))),
+        int(entry.get("weight", 0)),
+        int(entry.get("mempool_size", 0)),
+    )
+
+
+def unpack_record(rec) -> dict:
+    txid, ts_ms, value_sat, fee_sat, weight, mempool_size = RECORD.unpack(rec)
+    return _entry(txid, ts_ms, value_sat, fee_sat, weight, mempool_size)
+
+
+def _entry(txid: bytes, ts_ms, value_sat, fee_sat, weight, mempool_size) -> dict:
+    return {
+        "txid": txid.hex(),
+        "timestamp_ms": int(ts_ms),
+        "btc_value": round(int(value_sat) / SATS_PER_BTC, 8),
+        "weight": int(weight),
+        "fee_sat": int(fee_sat),
+        "mempool_size": int(mempool_size),
+    }
+
+
+# =========================
+# Writer (btc_top)
+# =========================
+def append_entries(path: str, entries) -> int:
+    """
+    Hängt Records an (Header wird bei leerer Datei geschrieben).
+    Ein halbes Record / halber Header am Dateiende (abgebrochener write()) wird
+    vorher abgeschnitten → neue Records liegen immer auf HEADER_SIZE + k * RECORD_SIZE.
+    """
+    payload = b"".join(pack_entry(e) for e in entries)
+    if not payload:
+        return 0
+
+    with open(path, "ab") as f:
+        size = f.tell()
+        if size < HEADER_SIZE:
+            aligned = 0
+        else:
+            aligned = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_SIZE * RECORD_SIZE
+
+        if aligned != size:
+            f.truncate(aligned)
+            f.seek(aligned)
+        if aligned == 0:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        f.write(payload)
+
+    return len(payload) // RECORD_SIZE
+
+
+# =========================
+# Reader
+# =========================
+def _check_header(buf) -> None:
+    magic, version, rec_size = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or rec_size != RECORD_SIZE:
+        raise ValueError(f"invalid txid_history header (magic={magic!r}, v={version}, rec={rec_size})")
+
+
+def record_count(path: str) -> int:
+    size = os.path.getsize(path)
+    if size < HEADER_SIZE:
+        return 0
+    return (size - HEADER_SIZE) // RECORD_SIZE
+
+
+def load_day(path: str):
+    """
+    numpy structured array (read-only memmap) über alle vollständigen Records.
+    Spalten: txid, timestamp_ms, value_sat, fee_sat, weight, mempool_size.
+    """
+    if np is None:
+        raise RuntimeError("numpy not installed – use iter_entries()")
+
+    n = record_count(path)
+    if n == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+
+    with open(path, "rb") as f:
+        _check_header(f.read(HEADER_SIZE))
+
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(n,))
+
+
+def accepted_indices(arr):
+    """
+    TxEventCursor-Regel vektorisiert: Indizes der Records, die ein frischer Cursor in Dateireihenfolge zählt
+    (timestamp_ms > 0, nicht hinter dem bisherigen Maximum, (timestamp_ms, txid) nur einmal).
+    """
+    ts = np.asarray(arr["timestamp_ms"], dtype=np.int64)
+    if len(ts) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    prev = np.zeros_like(ts)
+    np.maximum.accumulate(ts[:-1], out=prev[1:])
+    idx = np.flatnonzero((ts > 0) & (ts >= prev))
+
+    # erste Vorkommen von (timestamp_ms, txid): 8 + 32 Byte als ein Vergleichsschlüssel
+    keys = np.empty((len(idx), 40), dtype=np.uint8)
+    keys[:, :8] = ts[idx].view(np.uint8).reshape(-1, 8)
+    keys[:, 8:] = arr["txid"][idx]
+    _, first = np.unique(keys.view("V40").ravel(), return_index=True)
+    return idx[np.sort(first)]
+
+
+def jsonl_line_count(path: str) -> int:
+    """Vollständige Zeilen einer JSONL (0 = fehlt)."""
+    count = 0
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                count += block.count(b"\n")
+    except FileNotFoundError:
+        return 0
+    return count
+
+
+def covers_jsonl(bin_path: str, jsonl_path: str) -> bool:
+    """
+    True = die .bin enthält mindestens so viele Records wie die JSONL Zeilen
+    (btc_top schreibt beide im Gleichschritt; erster Tag nach Deploy / fehlgeschlagener Binär-Write → False).
+    """
+    try:
+        records = record_count(bin_path)
+    except FileNotFoundError:
+        return False
+    return records >= jsonl_line_count(jsonl_path)
+
+
+def iter_entries(path: str):
+    """Generator über JSONL-kompatible dicts (ohne numpy)."""
+    n = record_count(path)
+    if n == 0:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        _check_header(mm)
+        end = HEADER_SIZE + n * RECORD_SIZE
+        for fields in RECORD.iter_unpack(mm[HEADER_SIZE:end]):
+            yield _entry(*fields)
+
+
+# =========================
+# Converter JSONL ⇄ Binär
+# =========================
+def jsonl_to_binary(src: str, dst: str) -> int:
+    tmp = dst + ".tmp"
+    count = 0
+
+    with open(src, "r") as fin, open(tmp, "wb") as fout:
+        fout.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        for line in fin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                fout.write(pack_entry(json.loads(line)))
+                count += 1
+            except Exception as e:
+                print(f"[TXID_BIN] skip invalid line: {e}")
+
+    os.replace(tmp, dst)
+    return count
+
+
+def binary_to_jsonl(src: str, dst: str) -> int:
+    tmp = dst + ".tmp"
+    count = 0
+
+    with open(tmp, "w") as fout:
+        for entry in iter_entries(src):
+            fout.write(json.dumps(entry) + "\n")
+            count += 1
+
+    os.replace(tmp, dst)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-bin", "to-jsonl"):
+        print("Usage:")
+        print("  python -m core.txid_history_binary to-bin   <src.jsonl> <dst.bin>")
+        print("  python -m core.txid_history_binary to-jsonl <src.bin>   <dst.jsonl>")
+        sys.exit(1)
+
+    mode, src, dst = sys.argv[1:]
+    n = jsonl_to_binary(src, dst) if mode == "to-bin" else binary_to_jsonl(src, dst)
+    print(f"[TXID_BIN] {mode}: {n} records → {dst}")
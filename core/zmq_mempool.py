@@ -0,0 +1,301 @@
+# ================================================================================================================================= #
+# ------------------------------------📡 ZMQ MEMPOOL LISTENER (zmqpubrawtx + zmqpubsequence)-----------------------------------------
+# ================================================================================================================================= #
+#
+# Event-getriebene Mempool-Aufnahme statt getrawmempool-Polling:
+#
+#   rawtx      [topic, raw tx, seq u32]            → Raw-Cache txid → bytes (begrenzt, älteste fliegen raus)
+#   sequence   [topic, hash 32 B | label, seq u32] → A = in Mempool, R = entfernt, C/D = Block connect/disconnect
+#
+# Der Listener-Thread sammelt nur; der Worker holt pro Zyklus mit drain() das Delta ab.
+# Block-Events (Confirmations erzeugen kein R) und Sequenz-Lücken melden dem Worker,
+# dass er mit getrawmempool false abgleichen muss.
+#
+# pyzmq ist optional → ohne Paket bleibt btc_top im Poll-Modus.
+#
+# Lokaler Stand-in für bitcoind (Tests ohne Node):
+#   python -m core.zmq_mempool stub [--rawtx tcp://127.0.0.1:28333] [--sequence tcp://127.0.0.1:28332] [--rate N]
+# ================================================================================================================================= #
+
+import os
+import sys
+import time
+import struct
+import threading
+from collections import OrderedDict
+
+try:
+    import zmq
+except ImportError:  # optional → Poll-Modus
+    zmq = None
+
+from core import rawtx
+
+TOPIC_RAWTX = b"rawtx"
+TOPIC_SEQUENCE = b"sequence"
+
+_SEQ = struct.Struct("<I")
+_MEMPOOL_SEQ = struct.Struct("<Q")
+
+
+def available() -> bool:
+    return zmq is not None
+
+
+class MempoolZmqListener(threading.Thread):
+    """
+    SUB auf rawtx + sequence (dürfen derselbe Endpoint sein). Thread-sicher über drain().
+    """
+
+    def __init__(self, rawtx_endpoint: str, sequence_endpoint: str, raw_cache_max: int = 50_000):
+        super().__init__(name="btc_top_zmq", daemon=True)
+
+        if zmq is None:
+            raise RuntimeError("[ZMQ] pyzmq nicht installiert")
+
+        self.rawtx_endpoint = rawtx_endpoint
+        self.sequence_endpoint = sequence_endpoint
+        self.raw_cache_max = int(raw_cache_max)
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self._raw = OrderedDict()     # txid → raw bytes
+        self._late = OrderedDict()    # txids, deren A ohne Raw gedraint wurde → später ankommende rawtx verwerfen
+        self._added = []              # txids in Ankunftsreihenfolge
+        self._removed = set()
+        self._blocks = 0
+        self._gap = False
+        self._last_seq = {}           # topic → letzte Nachrichten-Sequenz
+
+        self.stats = {"rawtx": 0, "sequence": 0, "gaps": 0, "decode_errors": 0}
+
+    # -------------------------
+    # Thread
+    # -------------------------
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        ctx = zmq.Context.instance()
+        sockets = []
+
+        endpoints = {self.rawtx_endpoint: [TOPIC_RAWTX]}
+        endpoints.setdefault(self.sequence_endpoint, []).append(TOPIC_SEQUENCE)
+
+        poller = zmq.Poller()
+        for endpoint, topics in endpoints.items():
+            sock = ctx.socket(zmq.SUB)
+            sock.setsockopt(zmq.RCVHWM, 0)     # keine stillen Drops bei Bursts (Block mit tausenden TXs)
+            for topic in topics:
+                sock.setsockopt(zmq.SUBSCRIBE, topic)
+            sock.connect(endpoint)
+            poller.register(sock, zmq.POLLIN)
+            sockets.append(sock)
+
+        print(f"[ZMQ] subscribed rawtx={self.rawtx_endpoint} sequence={self.sequence_endpoint}")
+
+        try:
+            while not self._stop_event.is_set():
+                for sock, _ in poller.poll(500):
+                    while True:
+                        try:
+                            parts = sock.recv_multipart(zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        if len(parts) == 3:
+                            self._on_message(parts[0], parts[1], parts[2])
+        finally:
+            for sock in sockets:
+                sock.close(linger=0)
+
+    # -------------------------
+    # Nachrichten
+    # -------------------------
+    def _check_seq(self, topic: bytes, seq_raw: bytes) -> None:
+        if len(seq_raw) != 4:
+            return
+        seq = _SEQ.unpack(seq_raw)[0]
+        last = self._last_seq.get(topic)
+        if last is not None and seq != (last + 1) & 0xFFFFFFFF:
+            self._gap = True
+            self.stats["gaps"] += 1
+        self._last_seq[topic] = seq
+
+    def _on_message(self, topic: bytes, body: bytes, seq_raw: bytes) -> None:
+        with self._lock:
+            self._check_seq(topic, seq_raw)
+
+            if topic == TOPIC_RAWTX:
+                self.stats["rawtx"] += 1
+                try:
+                    txid = rawtx.parse(body, with_script_types=False, with_txid=True)["txid"]
+                except rawtx.RawTxError:
+                    self.stats["decode_errors"] += 1
+                    return
+                if self._late.pop(txid, None) is not None:
+                    return          # Worker holt die TX schon per getrawtransaction
+                self._raw[txid] = body
+                self._raw.move_to_end(txid)
+                while len(self._raw) > self.raw_cache_max:
+                    self._raw.popitem(last=False)
+
+            elif topic == TOPIC_SEQUENCE:
+                self.stats["sequence"] += 1
+                if len(body) < 33:
+                    return
+                txid = body[:32].hex()          # bitcoind sendet Anzeige-Reihenfolge
+                label = body[32:33]
+                if label == b"A":
+                    self._added.append(txid)
+                    self._removed.discard(txid)
+                elif label == b"R":
+                    self._removed.add(txid)
+                    self._raw.pop(txid, None)
+                    self._late.pop(txid, None)
+                elif label in (b"C", b"D"):
+                    self._blocks += 1
+
+    # -------------------------
+    # Worker-Seite
+    # -------------------------
+    def drain(self) -> dict:
+        """
+        Delta seit dem letzten Aufruf:
+          added   [txid]          neu im Mempool (Reihenfolge wie angekommen, ohne Duplikate,
+                                  ohne TXs, die im selben Zyklus schon wieder entfernt wurden)
+          removed {txid}          verdrängt / ersetzt (nicht: bestätigt → blocks)
+          raw     {txid: bytes}   Raw-TX für added, soweit schon angekommen
+          blocks  int             Block connect/disconnect seit letztem drain
+          gap     bool            Nachrichten verloren → Abgleich nötig
+        """
+        with self._lock:
+            removed = self._removed
+            added = [txid for txid in dict.fromkeys(self._added) if txid not in removed]
+            blocks = self._blocks
+            gap = self._gap
+
+            raw = {}
+            for txid in added:
+                body = self._raw.pop(txid, None)
+                if body is not None:
+                    raw[txid] = body
+                else:
+                    self._late[txid] = True
+            while len(self._late) > self.raw_cache_max:
+                self._late.popitem(last=False)
+
+            self._added = []
+            self._removed = set()
+            self._blocks = 0
+            self._gap = False
+
+        return {"added": added, "removed": removed, "raw": raw, "blocks": blocks, "gap": gap}
+
+
+# =========================
+# Stand-in Publisher (Tests)
+# =========================
+class StubPublisher:
+    """
+    Publiziert synthetische TXs im bitcoind-Format: rawtx + sequence A,
+    gelegentlich R (Verdrängung) und C (Block). rawtx/sequence auf eigenen oder gemeinsamem Endpoint.
+    """
+
+    def __init__(self, rawtx_endpoint: str, sequence_endpoint: str):
+        if zmq is None:
+            raise RuntimeError("[ZMQ] pyzmq nicht installiert")
+
+        ctx = zmq.Context.instance()
+        self._socks = {}
+        for endpoint in dict.fromkeys((rawtx_endpoint, sequence_endpoint)):
+            sock = ctx.socket(zmq.PUB)
+            sock.setsockopt(zmq.SNDHWM, 0)
+            sock.bind(endpoint)
+            self._socks[endpoint] = sock
+
+        self._rawtx_sock = self._socks[rawtx_endpoint]
+        self._sequence_sock = self._socks[sequence_endpoint]
+        self._seq = {TOPIC_RAWTX: 0, TOPIC_SEQUENCE: 0}
+        self._mempool_seq = 0
+        self._n = 0
+
+    def _send(self, sock, topic: bytes, body: bytes) -> None:
+        seq = self._seq[topic]
+        sock.send_multipart([topic, body, _SEQ.pack(seq)])
+        self._seq[topic] = (seq + 1) & 0xFFFFFFFF
+
+    def make_tx(self, value_sat: int = None) -> bytes:
+        """1-in / 2-out P2WPKH, eindeutig über den Prevout."""
+        self._n += 1
+        prevout = os.urandom(32)
+        if value_sat is None:
+            value_sat = int.from_bytes(os.urandom(4), "little") * 10
+        return (
+            struct.pack("<i", 2) + b"\x00\x01" + b"\x01"
+            + prevout + struct.pack("<I", 0) + b"\x00" + struct.pack("<I", 0xFFFFFFFD)
+            + b"\x02"
+            + struct.pack("<Q", value_sat) + b"\x16\x00\x14" + os.urandom(20)
+            + struct.pack("<Q", 1000) + b"\x16\x00\x14" + os.urandom(20)
+            + b"\x02" + b"\x47" + os.urandom(71) + b"\x21" + b"\x02" + os.urandom(32)
+            + struct.pack("<I", 0)
+        )
+
+    def publish_tx(self, raw: bytes = None) -> str:
+        raw = raw or self.make_tx()
+        txid = rawtx.parse(raw, with_script_types=False, with_txid=True)["txid"]
+        self._mempool_seq += 1
+        self._send(self._rawtx_sock, TOPIC_RAWTX, raw)
+        self._send(self._sequence_sock, TOPIC_SEQUENCE,
+                   bytes.fromhex(txid) + b"A" + _MEMPOOL_SEQ.pack(self._mempool_seq))
+        return txid
+
+    def publish_removed(self, txid: str) -> None:
+        self._mempool_seq += 1
+        self._send(self._sequence_sock, TOPIC_SEQUENCE,
+                   bytes.fromhex(txid) + b"R" + _MEMPOOL_SEQ.pack(self._mempool_seq))
+
+    def publish_block(self) -> None:
+        self._send(self._sequence_sock, TOPIC_SEQUENCE, os.urandom(32) + b"C")
+
+    def close(self) -> None:
+        for sock in self._socks.values():
+            sock.close(linger=0)
+
+
+def _run_stub(argv) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ZMQ stand-in for bitcoind rawtx/sequence")
+    parser.add_argument("--rawtx", default="tcp://127.0.0.1:28333")
+    parser.add_argument("--sequence", default="tcp://127.0.0.1:28332")
+    parser.add_argument("--rate", type=float, default=50.0, help="TXs pro Sekunde")
+    parser.add_argument("--block-every", type=int, default=3000, help="C-Event alle N TXs (0 = nie)")
+    args = parser.parse_args(argv)
+
+    pub = StubPublisher(args.rawtx, args.sequence)
+    print(f"[ZMQ STUB] rawtx={args.rawtx} sequence={args.sequence} rate={args.rate}/s")
+
+    sent = 0
+    last = None
+    try:
+        while True:
+            txid = pub.publish_tx()
+            sent += 1
+            if last and sent % 10 == 0:
+                pub.publish_removed(last)
+            if args.block_every and sent % args.block_every == 0:
+                pub.publish_block()
+            last = txid
+            time.sleep(1.0 / args.rate if args.rate > 0 else 0)
+    except KeyboardInterrupt:
+        print(f"[ZMQ STUB] stopped after {sent} TXs")
+    finally:
+        pub.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "stub":
+        print("usage: python -m core.zmq_mempool stub [--rawtx EP] [--sequence EP] [--rate N] [--block-every N]")
+        sys.exit(1)
+    _run_stub(sys.argv[2:])
@@ -20,6 +20,9 @@ def make_node_config(name: str, pruned: bool):
         "rpc_user": os.getenv("RPC_USER"),
         "rpc_password": os.getenv("RPC_PASSWORD"),
         "pruned": pruned,
+        # optional: bitcoind -zmqpubrawtx / -zmqpubsequence (btc_top ZMQ-Ingest)
+        "zmq_rawtx": os.getenv("ZMQ_PUBRAWTX"),
+        "zmq_sequence": os.getenv("ZMQ_PUBSEQUENCE"),
     }
 
 NODE_CONFIG = {
@@ -28,7 +28,8 @@ class BitcoinRPC:
         self.auth = HTTPBasicAuth(self.user, self.password)
         self.headers = {"Content-Type": "application/json"}
 
-    def call(self, method: str, params=None):
+    def call(self, method: str, params=None, timeout: float = 30):
+        """timeout = HTTP-Timeout (s); blockierende Calls (waitfornewblock) brauchen mehr."""
         if params is None:
             params = []
 
@@ -45,7 +46,7 @@ class BitcoinRPC:
                 json=payload,
                 headers=self.headers,
                 auth=self.auth,
-                timeout=30,
+                timeout=timeout,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -62,6 +63,66 @@ class BitcoinRPC:
                 f"[RPC:{self.name}] RPC call failed ({method}): {e}"
             )
 
+    def call_batch(self, calls, chunk_size: int = 200):
+        """
+        JSON-RPC-Batch: [(method, params), ...] → [{"result": ..., "error": ...}, ...]
+        in Aufrufreihenfolge. Fehler einzelner Items werden zurückgegeben (kein raise),
+        Transport-/HTTP-Fehler → RuntimeError. Große Batches → Chunks à chunk_size.
+        """
+        calls = list(calls)
+        results = []
+
+        for start in range(0, len(calls), max(1, int(chunk_size))):
+            chunk = calls[start:start + chunk_size]
+
+            payload = [
+                {
+                    "jsonrpc": "1.0",
+                    "id": i,
+                    "method": method,
+                    "params": params if params is not None else [],
+                }
+                for i, (method, params) in enumerate(chunk)
+            ]
+
+            try:
+                resp = requests.post(
+                    self.url,
+                    json=payload,
+                    headers=self.headers,
+                    auth=self.auth,
+                    timeout=30,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                raise RuntimeError(
+                    f"[RPC:{self.name}] RPC batch failed ({len(chunk)} calls): {e}"
+                )
+
+            if not isinstance(data, list):
+                raise RuntimeError(
+                    f"[RPC:{self.name}] RPC batch: unexpected response {str(data)[:200]}"
+                )
+
+            # Reihenfolge der Antworten ist nicht garantiert → über id zuordnen
+            by_id = {item.get("id"): item for item in data if isinstance(item, dict)}
+
+            for i in range(len(chunk)):
+                item = by_id.get(i)
+                if item is None:
+                    results.append({
+                        "result": None,
+                        "error": {"code": -32603, "message": "missing batch response"},
+                    })
+                else:
+                    results.append({
+                        "result": item.get("result"),
+                        "error": item.get("error"),
+                    })
+
+        return results
+
     # -------------------------
     # Guards
     # -------------------------
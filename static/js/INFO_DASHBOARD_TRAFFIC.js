@@ -264,11 +264,15 @@ async function loadInfoDashboardTrafficCore(canvasId) {
     // -------------------------
     // Live Update
     // -------------------------
+    // nur neue Buckets seit dem letzten abgeschlossenen + offener Bucket (chart_delta.js)
+    const poller = window.ChartDelta.createPoller(apiUrl, data, timeframe);
+
     window.__infoDashboardTrafficUpdater = setInterval(async () => {
-        const r = await fetch(apiUrl);
-        if (!r.ok) return;
+        const merged = await poller.poll(chart.data.datasets[0].data);
+        if (!merged) return;
+
+        const fresh = merged.data;
 
-        const fresh = (await r.json()).history || [];
         chart.data.datasets[0].data = fresh;
 
         const nextWindowSize = Math.max(2, Math.round(fresh.length * SMA_RATIO));
@@ -334,15 +334,17 @@ async function loadMetricsTxVolumeCore(canvasId) {
     // -------------------------
     // Live Update
     // -------------------------
+    // nur neue Buckets seit dem letzten abgeschlossenen + offener Bucket (chart_delta.js)
+    const poller = window.ChartDelta.createPoller(apiUrl, data, timeframe);
+
     window.__MetricsTxVolumeUpdater = setInterval(async () => {
-        const res = await fetch(apiUrl);
-        if (!res.ok) return;
+        const merged = await poller.poll(chart.data.datasets[0].data);
+        if (!merged) return;
 
-        const json = await res.json();
-        const fresh = json.history || [];
+        const fresh = merged.data;
 
         window.__MetricsTxVolumeDataCache[apiUrl] = {
-            data: fresh,
+            data: fresh.filter(p => p.x <= merged.lastClosedX),
             ts: Date.now()
         };
 
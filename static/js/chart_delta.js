@@ -0,0 +1,52 @@
+// ==================================================
+// chart_delta.js – ?since= Delta-Updates für Live-Charts
+// ==================================================
+// - Chart lädt die volle Historie einmal, danach nur neue Buckets
+// - Antwort: { history: [neue abgeschlossene Buckets], open: {x, y} | null }
+// - genutzt von METRICS_BTC_TX_VOLUME.js und INFO_DASHBOARD_TRAFFIC.js
+// ==================================================
+
+(() => {
+
+// data = abgeschlossene Buckets (+ ggf. offener Bucket am Ende)
+function mergeChartDelta(data, lastClosedX, delta, timeframeMs) {
+    const cutoff = Date.now() - timeframeMs;
+    const closed = data.filter(p => p.x <= lastClosedX && p.x >= cutoff);
+
+    for (const p of delta.history || []) {
+        if (p.x > lastClosedX) {
+            closed.push(p);
+            lastClosedX = p.x;
+        }
+    }
+
+    const merged = closed.slice();
+    if (delta.open && delta.open.x > lastClosedX) merged.push(delta.open);
+
+    return { data: merged, lastClosedX };
+}
+
+// Poller pro Chart: merkt sich den letzten abgeschlossenen Bucket
+// poll(currentData) → { data, lastClosedX } oder null (HTTP-Fehler)
+function createChartDeltaPoller(apiUrl, initialData, timeframeMs) {
+    let lastClosedX = initialData.length ? initialData[initialData.length - 1].x : 0;
+
+    return {
+        get lastClosedX() {
+            return lastClosedX;
+        },
+
+        async poll(currentData) {
+            const res = await fetch(`${apiUrl}?since=${lastClosedX}`);
+            if (!res.ok) return null;
+
+            const merged = mergeChartDelta(currentData, lastClosedX, await res.json(), timeframeMs);
+            lastClosedX = merged.lastClosedX;
+            return merged;
+        }
+    };
+}
+
+window.ChartDelta = { merge: mergeChartDelta, createPoller: createChartDeltaPoller };
+
+})();
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Projekt-Root ins PYTHONPATH (wie electrumx/tests)
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
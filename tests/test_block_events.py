@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.block_events import NewBlockListener, last_block_event
+from core.redis_keys import BLOCKCHAIN_LAST_BLOCK_EVENT_KEY
+
+TIP = "00" * 31 + "01"
+NEW = "00" * 31 + "02"
+
+
+class FakeRpc:
+    """Antworten der Reihe nach (Exception-Instanz = raise); danach stop() am Listener."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+        self.listener = None
+
+    def call(self, method, params=None, timeout=30):
+        self.calls.append(method)
+        if not self.responses:
+            self.listener.stop()
+            return {}
+        method_expected, value = self.responses.pop(0)
+        assert method == method_expected
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def _run(r, responses):
+    rpc = FakeRpc(responses)
+    events = []
+    listener = NewBlockListener(rpc, r, timeout_ms=10, on_block=events.append, backoff_s=0)
+    rpc.listener = listener
+    listener.run()
+    return listener, rpc, events
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis()
+
+
+def test_first_timeout_does_not_republish_current_tip(r):
+    listener, _, events = _run(r, [
+        ("getbestblockhash", TIP),
+        ("waitfornewblock", {"hash": TIP, "height": 100}),     # Timeout → aktueller Tip
+        ("waitfornewblock", {"hash": NEW, "height": 101}),
+    ])
+
+    assert [e["hash"] for e in events] == [NEW]
+    assert last_block_event(r)["height"] == 101
+    assert listener.last_hash == NEW
+
+
+def test_seed_retries_with_backoff(r):
+    listener, rpc, events = _run(r, [
+        ("getbestblockhash", ConnectionError("node down")),
+        ("getbestblockhash", TIP),
+        ("waitfornewblock", {"hash": TIP, "height": 100}),
+    ])
+
+    assert rpc.calls[:2] == ["getbestblockhash", "getbestblockhash"]
+    assert events == []
+    assert listener.last_hash == TIP
+
+
+def test_stored_event_skips_seed(r):
+    r.set(BLOCKCHAIN_LAST_BLOCK_EVENT_KEY, json.dumps({"hash": TIP, "height": 100, "seen_ts": 1.0}))
+
+    _, rpc, events = _run(r, [
+        ("waitfornewblock", {"hash": TIP, "height": 100}),
+    ])
+
+    assert "getbestblockhash" not in rpc.calls
+    assert events == []
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core import chart_payload, chart_series
+from core.bucket_aggregator import (
+    BucketAggregator,
+    CountReducer,
+    RingSeries,
+    SumReducer,
+    WeightedAvgReducer,
+)
+
+T0 = 1_700_000_000_000 // 3_600_000 * 3_600_000   # volle Stunde
+S10 = 10_000
+
+
+def _buckets(window_ms=3_600_000):
+    return {
+        "1h": {"bucket_ms": S10, "window_ms": window_ms, "redis_key": "TEST_1H"},
+        "1d": {"bucket_ms": 60_000, "window_ms": window_ms * 24, "redis_key": "TEST_1D"},
+    }
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis()
+
+
+def test_rollover_closes_bucket_into_history(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="json")
+
+    agg.add(T0 + 1_000, 1.0)
+    agg.add(T0 + 9_999, 2.0)
+    assert agg.history("1h") == []
+    assert agg.open_value("1h") == 3.0
+
+    agg.add(T0 + S10, 5.0)     # nächster Bucket → vorheriger abgeschlossen + publiziert
+    assert agg.history("1h") == [{"x": T0, "y": 3.0}]
+    assert agg.open_value("1h") == 5.0
+    assert json.loads(r.get("TEST_1H")) == {"history": [{"x": T0, "y": 3.0}]}
+
+    # 1d-Auflösung (60 s) ist noch offen
+    assert agg.history("1d") == []
+    assert agg.open_value("1d") == 8.0
+
+
+def test_gaps_are_not_filled_with_empty_buckets(r):
+    agg = BucketAggregator(r, _buckets(), CountReducer(), mode="json")
+
+    agg.add(T0, 1)
+    agg.add(T0 + 5 * S10, 2)    # 4 Buckets ohne Events dazwischen
+    agg.add(T0 + 6 * S10, 3)
+
+    assert agg.history("1h") == [{"x": T0, "y": 1}, {"x": T0 + 5 * S10, "y": 2}]
+
+
+def test_late_event_counts_into_open_bucket(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="json")
+
+    agg.add(T0, 1.0)
+    agg.add(T0 + S10, 1.0)
+    agg.add(T0 + 5_000, 4.0)    # gehört zum bereits abgeschlossenen Bucket
+
+    assert agg.history("1h") == [{"x": T0, "y": 1.0}]
+    assert agg.open_value("1h") == 5.0
+
+
+def test_weighted_avg_reducer(r):
+    agg = BucketAggregator(r, _buckets(), WeightedAvgReducer(), mode="json")
+
+    agg.add(T0, 1_000, 100)
+    agg.add(T0 + 1, 3_000, 100)
+    agg.add(T0 + S10, 1, 1)
+
+    assert agg.history("1h") == [{"x": T0, "y": 20.0}]
+    assert agg.open_buckets()["1h"] == {"cur_bucket": T0 + S10, "sum_fee": 1, "sum_vbytes": 1}
+
+
+def test_snapshot_restore_roundtrip(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="json")
+    for i in range(5):
+        agg.add(T0 + i * S10, float(i + 1))
+    snap = json.loads(json.dumps(agg.snapshot()))
+
+    restored = BucketAggregator(r, _buckets(), SumReducer(), mode="json")
+    restored.restore(snap)
+
+    assert restored.history("1h") == agg.history("1h")
+    assert restored.open_buckets() == agg.open_buckets()
+
+    # offener Bucket läuft nach dem Restore weiter
+    restored.add(T0 + 4 * S10 + 1, 10.0)
+    assert restored.open_value("1h") == 15.0
+
+
+def test_restore_skips_unsorted_points_and_corrupt_open_bucket(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="json")
+    agg.restore({
+        "buckets": {"1h": {"history": [{"x": T0 + S10, "y": 1}, {"x": T0, "y": 2}, {"x": "bad"}]}},
+        "open_buckets": {"1h": {"cur_bucket": "bad"}, "unknown": {"cur_bucket": T0}},
+    })
+
+    assert agg.history("1h") == [{"x": T0 + S10, "y": 1.0}]
+    assert agg.open_buckets() == {}
+
+
+def test_window_prune_on_publish(r):
+    agg = BucketAggregator(r, _buckets(window_ms=3 * S10), SumReducer(), mode="json")
+    for i in range(6):
+        agg.add(T0 + i * S10, 1.0)
+
+    agg.republish(T0 + 6 * S10)
+    xs = [p["x"] for p in json.loads(r.get("TEST_1H"))["history"]]
+    assert xs == [T0 + 3 * S10, T0 + 4 * S10]
+
+
+def test_republish_restores_flushed_keys(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="both")
+    agg.add(T0, 1.0)
+    agg.add(T0 + S10, 2.0)
+    agg.republish(T0 + 2 * S10)
+    encodes = agg.encode_count
+
+    r.flushall()
+    agg.republish(T0 + 2 * S10)
+
+    assert json.loads(r.get("TEST_1H")) == {"history": [{"x": T0, "y": 1.0}]}
+    assert chart_payload.read_etag(r, "TEST_1H")
+    assert chart_series.read_range(r, "TEST_1H") == [{"x": T0, "y": 1.0}]
+    assert agg.encode_count == encodes   # unverändert → gecachte Bytes
+
+
+def test_zset_mode_appends_closed_buckets(r):
+    agg = BucketAggregator(r, _buckets(), SumReducer(), mode="zset")
+    agg.republish(T0)                    # ZSET einmal komplett (leer) → danach ZADD pro Abschluss
+    agg.add(T0, 1.0)
+    agg.add(T0 + S10, 2.0)
+    agg.add(T0 + 2 * S10, 3.0)
+
+    assert not r.exists("TEST_1H")
+    assert chart_series.read_range(r, "TEST_1H") == [{"x": T0, "y": 1.0}, {"x": T0 + S10, "y": 2.0}]
+
+
+def test_ring_series_capacity_and_same_ts_replace():
+    ser = RingSeries(3)
+    for t in range(5):
+        ser.append(t, float(t))
+    ser.append(4, 40.0)
+
+    assert list(ser.items()) == [(2, 2.0), (3, 3.0), (4, 40.0)]
+    assert ser.prune(3) == 1
+    assert list(ser.items()) == [(3, 3.0), (4, 40.0)]
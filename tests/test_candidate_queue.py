@@ -0,0 +1,51 @@
+from core.candidate_queue import CandidateQueue, priority, percentiles
+
+NOW = 1_700_000_000.0
+
+
+def _info(vsize, entered, depends=()):
+    return {"vsize": vsize, "time": entered, "depends": list(depends)}
+
+
+def test_mempool_age_does_not_outrank_whales():
+    # 1 h alte Klein-TX vs. frische Wal-TX: ohne Queue-Historie zählt nur die Größe
+    small_old = ("small", _info(150, NOW - 3600))
+    whale = ("whale", _info(20_000, NOW - 1))
+
+    queue = CandidateQueue([small_old, whale], now=NOW, aging_vb_per_s=50, aging_max_vb=2_000)
+
+    assert [txid for txid, _ in queue.pop_chunk(2)] == ["whale", "small"]
+
+
+def test_aging_counts_from_first_queued_and_is_capped():
+    queued_at = {"small": NOW - 30}
+    assert priority(_info(150, NOW - 3600), NOW, 50, queued_at=queued_at["small"]) == 150 + 1500
+    assert priority(_info(150, NOW - 3600), NOW, 50, queued_at=NOW - 3600, aging_max_vb=2_000) == 150 + 2000
+    assert priority(_info(150, NOW), NOW, 50) == 150
+
+
+def test_long_waiting_small_tx_overtakes_medium_tx():
+    candidates = [("medium", _info(1_000, NOW)), ("small", _info(150, NOW))]
+    queue = CandidateQueue(candidates, now=NOW, aging_vb_per_s=50,
+                           queued_at={"small": NOW - 60}, aging_max_vb=2_000)
+
+    assert queue.pop_chunk(1)[0][0] == "small"
+
+
+def test_zmq_candidates_without_info_age_by_size_hint():
+    queue = CandidateQueue([("a", None), ("b", None)], now=NOW, aging_vb_per_s=50,
+                           size_hints={"a": 500, "b": 400}, queued_at={"b": NOW - 10})
+
+    assert [txid for txid, _ in queue.pop_chunk(2)] == ["b", "a"]
+    assert len(queue) == 0
+
+
+def test_drain_returns_remaining():
+    queue = CandidateQueue([(f"t{i}", _info(100 + i, NOW)) for i in range(5)], now=NOW)
+    assert [t for t, _ in queue.pop_chunk(2)] == ["t4", "t3"]
+    assert sorted(queue.drain()) == ["t0", "t1", "t2"]
+
+
+def test_percentiles_nearest_rank():
+    assert percentiles(list(range(1, 101))) == {50: 50, 90: 90, 99: 99}
+    assert percentiles([]) == {}
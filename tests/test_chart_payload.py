@@ -0,0 +1,38 @@
+import gzip
+
+import pytest
+
+from core import chart_payload
+
+
+def test_variant_etags_differ_per_encoding():
+    etag = chart_payload.compute_etag(b'{"history":[]}')
+    tags = {enc: chart_payload.variant_etag(etag, enc) for enc in ("br", "gzip", "identity")}
+
+    assert tags["identity"] == etag
+    assert len(set(tags.values())) == 3
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("", "identity"),
+])
+def test_pick_encoding(header, expected):
+    assert chart_payload.pick_encoding(header) == expected
+
+
+def test_publish_and_read_variants():
+    fakeredis = pytest.importorskip("fakeredis")
+    r = fakeredis.FakeRedis()
+    data = b'{"history":[{"x":1,"y":2}]}'
+
+    etag = chart_payload.publish(r, "K", data)
+
+    got_etag, body, enc = chart_payload.read(r, "K", "gzip")
+    assert (got_etag, enc) == (etag, "gzip")
+    assert gzip.decompress(body) == data
+    assert chart_payload.read(r, "K", "identity") == (etag, data, "identity")
+    assert chart_payload.read(r, "MISSING", "br") == (None, None, None)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core import chart_series
+from core.redis_keys import BTC_TX_VOLUME_1H, BTC_TX_VOLUME_24H
+from workers.services.storage import storage_worker
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis()
+
+
+def _zset(r, key, points):
+    pipe = r.pipeline()
+    chart_series.replace_series(pipe, key, points)
+    pipe.execute()
+
+
+def test_read_range_bounds_inclusive(r):
+    _zset(r, "K", [(1000, 1.0), (2000, 2.5), (3000, 3.0)])
+
+    assert chart_series.read_range(r, "K", 2000, None) == [{"x": 2000, "y": 2.5}, {"x": 3000, "y": 3.0}]
+    assert chart_series.read_range(r, "K", None, 2000, limit=1) == [{"x": 1000, "y": 1.0}]
+
+
+def test_append_point_replaces_same_ts_and_trims(r):
+    pipe = r.pipeline()
+    chart_series.append_point(pipe, "K", 1000, 1.0, 0)
+    chart_series.append_point(pipe, "K", 1000, 9.0, 0)
+    chart_series.append_point(pipe, "K", 2000, 2.0, 1500)
+    pipe.execute()
+
+    assert chart_series.read_range(r, "K") == [{"x": 2000, "y": 2.0}]
+
+
+def test_read_history_prefers_json_then_zset(r):
+    _zset(r, "K", [(1000, 1.0)])
+    assert chart_series.read_history(r, "K") == [{"x": 1000, "y": 1.0}]
+
+    r.set("K", json.dumps({"history": [{"x": 5, "y": 6}]}))
+    assert chart_series.read_history(r, "K") == [{"x": 5, "y": 6}]
+
+
+def test_storage_snapshot_in_zset_mode(r, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_worker, "BASE_DST_DIR", str(tmp_path))
+    monkeypatch.setattr(storage_worker.redis, "Redis", lambda **kw: r)
+
+    # zset-Modus: kein JSON-Blob, nur Sorted Sets
+    _zset(r, BTC_TX_VOLUME_1H, [(1000, 1.5), (11000, 2.0)])
+    _zset(r, BTC_TX_VOLUME_24H, [(0, 3.5)])
+
+    storage_worker.persist_btc_tx_volume()
+
+    (path,) = (tmp_path / "metrics_history" / "btc_tx_volume_history").glob("btc_tx_volume_*.json")
+    snap = json.loads(path.read_text())
+    assert snap["buckets"]["1h"]["history"] == [{"x": 1000, "y": 1.5}, {"x": 11000, "y": 2.0}]
+    assert snap["last_ts_ms"] == 11000
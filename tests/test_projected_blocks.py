@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from core import projected_blocks
+from core.projected_blocks import BLOCK_WEIGHT, BLOCK_TIME_SECONDS, SATS_PER_BTC, project
+
+_VOLATILE = ("computed_at", "compute_ms", "engine")
+
+
+def _entry(vsize, fee_sat, anc_fee_sat=None, anc_size=None, weight=None):
+    """getrawmempool-true-Eintrag (Fees in BTC wie bitcoind)."""
+    info = {
+        "vsize": vsize,
+        "weight": weight if weight is not None else vsize * 4,
+        "fees": {"base": fee_sat / SATS_PER_BTC, "modified": fee_sat / SATS_PER_BTC},
+    }
+    if anc_fee_sat is not None:
+        info["fees"]["ancestor"] = anc_fee_sat / SATS_PER_BTC
+        info["ancestorsize"] = anc_size
+    return info
+
+
+def _random_mempool(n, seed=7):
+    rng = random.Random(seed)
+    mempool = {}
+    for i in range(n):
+        vsize = rng.randint(110, 20_000)
+        fee_sat = vsize * rng.choice((1, 1, 2, 3, 5, 8, 13, 21, 55)) + rng.randint(0, 500)
+        if rng.random() < 0.2:      # CPFP-Kind: Eltern im Ancestor-Paket
+            anc_size = vsize + rng.randint(100, 5_000)
+            mempool[f"{i:064x}"] = _entry(vsize, fee_sat, fee_sat + rng.randint(0, 50_000), anc_size)
+        else:
+            mempool[f"{i:064x}"] = _entry(vsize, fee_sat)
+    return mempool
+
+
+def _stable(result):
+    return {k: v for k, v in result.items() if k not in _VOLATILE}
+
+
+def test_numpy_and_python_engines_agree():
+    pytest.importorskip("numpy")
+    mempool = _random_mempool(20_000)
+
+    fast = project(mempool, max_blocks=8, use_numpy=True)
+    slow = project(mempool, max_blocks=8, use_numpy=False)
+
+    assert (fast["engine"], slow["engine"]) == ("numpy", "python")
+    assert _stable(fast) == _stable(slow)
+    assert fast["total_blocks"] > 8                  # Rest-Bucket ist belegt
+    assert fast["rest"]["tx_count"] > 0
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_empty_mempool(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    result = project({}, fee_tiers=(1, 10), use_numpy=use_numpy)
+
+    assert result["blocks"] == []
+    assert result["total_blocks"] == 0
+    assert result["mempool_tx"] == result["mempool_weight"] == 0
+    assert result["rest"] == {"blocks": 0, "tx_count": 0, "weight": 0, "total_fee_sat": 0}
+    assert result["eta"] == [
+        {"feerate": 1, "block": 0, "eta_s": BLOCK_TIME_SECONDS},
+        {"feerate": 10, "block": 0, "eta_s": BLOCK_TIME_SECONDS},
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_block_fill_boundary(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    # 4 TXs füllen W (4 MWU − Coinbase-Reserve) exakt → ein Block
+    quarter = BLOCK_WEIGHT // 4
+    assert quarter * 4 == BLOCK_WEIGHT
+    mempool = {f"t{i}": _entry(quarter // 4, 10_000 * (10 - i), weight=quarter) for i in range(4)}
+
+    result = project(mempool, use_numpy=use_numpy)
+    assert result["total_blocks"] == 1
+    assert result["blocks"][0]["weight"] == BLOCK_WEIGHT
+    assert result["blocks"][0]["tx_count"] == 4
+
+    # eine Weight-Einheit mehr → Block 2
+    mempool["tail"] = _entry(1, 1, weight=4)
+    result = project(mempool, use_numpy=use_numpy)
+    assert result["total_blocks"] == 2
+    assert [b["tx_count"] for b in result["blocks"]] == [4, 1]
+    assert result["blocks"][1]["eta_s"] == 2 * BLOCK_TIME_SECONDS
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_max_blocks_folds_into_rest(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    mempool = {f"t{i}": _entry(BLOCK_WEIGHT // 4, 1_000 * (i + 1), weight=BLOCK_WEIGHT) for i in range(5)}
+
+    result = project(mempool, max_blocks=2, use_numpy=use_numpy)
+
+    assert len(result["blocks"]) == 2
+    assert result["total_blocks"] == 5
+    assert result["rest"]["blocks"] == 3
+    assert result["rest"]["tx_count"] == 3
+    assert result["rest"]["weight"] == 3 * BLOCK_WEIGHT
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_eta_tiers(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    # je ein voller Block bei 50, 20, 5 sat/vB
+    vsize = BLOCK_WEIGHT // 4
+    mempool = {
+        "hi": _entry(vsize, 50 * vsize),
+        "mid": _entry(vsize, 20 * vsize),
+        "lo": _entry(vsize, 5 * vsize),
+    }
+
+    result = project(mempool, fee_tiers=(100, 50, 20, 10, 5, 1), use_numpy=use_numpy)
+
+    # Tier landet hinter allen TXs mit strikt höherer Feerate
+    assert [(e["feerate"], e["block"]) for e in result["eta"]] == [
+        (100, 0), (50, 0), (20, 1), (10, 2), (5, 2), (1, 3),
+    ]
+    assert result["eta"][-1]["eta_s"] == 4 * BLOCK_TIME_SECONDS
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_ancestor_feerate_ordering(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    # je eine TX pro Block → Blockreihenfolge = Sortierung
+    vsize = BLOCK_WEIGHT // 4
+    mempool = {
+        # eigene Feerate hoch, aber an einem 1-sat/vB-Elternteil → Paketrate ~2
+        "child_of_cheap": _entry(vsize, 30 * vsize, anc_fee_sat=31 * vsize, anc_size=16 * vsize),
+        # eigene Feerate 1, Elternteil zahlt 79 sat/vB → Paketrate 40
+        "child_of_rich": _entry(vsize, 1 * vsize, anc_fee_sat=80 * vsize, anc_size=2 * vsize),
+        "plain": _entry(vsize, 10 * vsize),
+    }
+
+    rates, _, _ = projected_blocks._extract(mempool)
+    assert rates == pytest.approx([31 / 16, 40.0, 10.0])
+
+    result = project(mempool, use_numpy=use_numpy)
+    assert [b["max_feerate"] for b in result["blocks"]] == [40.0, 10.0, round(31 / 16, 2)]
+    # Fees zählen mit der eigenen (modified) Gebühr, nicht der Paket-Gebühr
+    assert [b["total_fee_sat"] for b in result["blocks"]] == [vsize, 10 * vsize, 30 * vsize]
@@ -0,0 +1,114 @@
+import hashlib
+
+import pytest
+
+from core import rawtx
+
+# Genesis-Coinbase (Block 0), 50 BTC an P2PK
+GENESIS_TX_HEX = (
+    "01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff4d04ffff001d0104"
+    "455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206f6e206272696e6b206f66207365"
+    "636f6e64206261696c6f757420666f722062616e6b73ffffffff0100f2052a01000000434104678afdb0fe5548271967f1"
+    "a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c702b"
+    "6bf11d5fac00000000"
+)
+GENESIS_TXID = "4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b"
+
+# BIP143 "Native P2WPKH": Input 0 P2PK (scriptSig), Input 1 P2WPKH (Witness), 2 × P2PKH-Output, nLockTime 17
+BIP143_VERSION = "01000000"
+BIP143_INPUTS = (
+    "02"
+    "fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f00000000"
+    "494830450221008b9d1dc26ba6a9cb62127b02742fa9d754cd3bebf337f7a55d114c8e5cdd30be022040529b194ba3f9"
+    "281a99f2b1c0a19c0489bc22ede944ccf4ecbab4cc618ef3ed01eeffffff"
+    "ef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a0100000000ffffffff"
+)
+BIP143_OUTPUTS = (
+    "02"
+    "202cb206000000001976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac"
+    "9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac"
+)
+BIP143_WITNESS = (
+    "00"
+    "02"
+    "47304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a0220573a954c4518331561"
+    "406f90300e8f3358f51928d43c212a8caed02de67eebee01"
+    "21025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357"
+)
+BIP143_LOCKTIME = "11000000"
+
+BIP143_SIGNED_HEX = BIP143_VERSION + "0001" + BIP143_INPUTS + BIP143_OUTPUTS + BIP143_WITNESS + BIP143_LOCKTIME
+BIP143_LEGACY_HEX = BIP143_VERSION + BIP143_INPUTS + BIP143_OUTPUTS + BIP143_LOCKTIME
+
+# BIP143 "Native P2WPKH", unsignierte TX (leere scriptSigs, ohne Witness)
+BIP143_UNSIGNED_HEX = (
+    "0100000002fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f0000000000eeffffff"
+    "ef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a0100000000ffffffff02202cb206000000"
+    "001976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac9093510d000000001976a9143bde42dbee7e4dbe6a21"
+    "b2d50ce2f0167faa815988ac11000000"
+)
+
+
+def _txid(raw_hex):
+    return hashlib.sha256(hashlib.sha256(bytes.fromhex(raw_hex)).digest()).digest()[::-1].hex()
+
+
+def test_genesis_coinbase():
+    info = rawtx.parse(GENESIS_TX_HEX, with_txid=True)
+
+    assert info["txid"] == GENESIS_TXID
+    assert info["value_sat"] == 50 * rawtx.SATS_PER_BTC
+    assert info["segwit"] is False
+    assert (info["vin_count"], info["vout_count"]) == (1, 1)
+    assert info["size"] == info["base_size"] == 204
+    assert info["weight"] == 4 * 204
+    assert info["vsize"] == 204
+    assert info["script_types"] == {"pubkey": 1}
+
+
+def test_bip143_p2wpkh_signed():
+    info = rawtx.parse(bytes.fromhex(BIP143_SIGNED_HEX), with_txid=True)
+
+    # txid = sha256d ohne Marker/Flag/Witness
+    assert info["txid"] == _txid(BIP143_LEGACY_HEX)
+    assert info["segwit"] is True
+    assert info["version"] == 1
+    assert info["locktime"] == 17
+    assert (info["vin_count"], info["vout_count"]) == (2, 2)
+    assert info["value_sat"] == 112_340_000 + 223_450_000
+    assert info["script_types"] == {"pubkeyhash": 2}
+
+    size = len(BIP143_SIGNED_HEX) // 2
+    base_size = len(BIP143_LEGACY_HEX) // 2
+    assert (info["size"], info["base_size"]) == (size, base_size)
+    assert info["weight"] == 3 * base_size + size
+    assert info["vsize"] == (info["weight"] + 3) // 4
+
+
+def test_bip143_p2wpkh_unsigned_is_legacy():
+    info = rawtx.parse(memoryview(bytes.fromhex(BIP143_UNSIGNED_HEX)), with_txid=True)
+
+    assert info["txid"] == _txid(BIP143_UNSIGNED_HEX)
+    assert info["segwit"] is False
+    assert info["value_sat"] == 335_790_000
+    assert info["weight"] == 4 * info["size"]
+
+
+def test_fast_path_skips_script_types():
+    info = rawtx.parse(BIP143_SIGNED_HEX, with_script_types=False)
+
+    assert info["script_types"] == {}
+    assert "txid" not in info
+    assert info["value_sat"] == 335_790_000
+
+
+@pytest.mark.parametrize("raw", [
+    GENESIS_TX_HEX[:-2],                    # Locktime abgeschnitten
+    BIP143_SIGNED_HEX[:200],                # mitten in den Outputs
+    BIP143_SIGNED_HEX + "00",               # Trailing Byte
+    "zz" + GENESIS_TX_HEX[2:],              # kein Hex
+    "0100000000",                           # zu kurz
+])
+def test_broken_serialization_raises(raw):
+    with pytest.raises(rawtx.RawTxError):
+        rawtx.parse(raw)
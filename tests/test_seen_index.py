@@ -0,0 +1,70 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")     # fakeredis braucht lupa für EVALSHA
+
+from core import seen_index, seen_totals
+
+TX = [f"{i:064x}" for i in range(4)]
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis()
+
+
+def test_add_remove_keep_totals_in_sync(r):
+    seen_index.add(r, {TX[0]: (150_000_000, 1), TX[1]: (50_000_000, 2), TX[2]: (0, 3)})
+    assert seen_totals.read(r) == (3, 2.0)
+
+    # doppeltes Add / Remove unbekannter txid → keine Änderung
+    seen_index.add(r, {TX[0]: (999, 9)})
+    seen_index.remove(r, [TX[3]])
+    assert seen_totals.read_raw(r) == (3, 200_000_000)
+
+    # 0-sat-Eintrag entfernen (kein "-0" an HINCRBY)
+    seen_index.remove(r, [TX[2], TX[1]])
+    assert seen_totals.read_raw(r) == (1, 150_000_000)
+    assert seen_index.txids(r) == {TX[0]}
+    assert seen_index.get(r, TX[0]) == (1.5, 1)
+
+
+def test_reconcile_fixes_drift(r):
+    seen_index.add(r, {TX[0]: (100, 1), TX[1]: (200, 2)})
+    seen_totals.store(r, 7, 1)
+
+    rec = seen_index.reconcile(r)
+
+    assert (rec["count"], rec["sum_sat"]) == (2, 300)
+    assert (rec["drift_count"], rec["drift_sat"]) == (-5, 299)
+    assert seen_totals.read_raw(r) == (2, 300)
+
+
+def test_snapshot_roundtrip_filters_mempool(r, tmp_path):
+    seen_index.add(r, {t: (100 * (i + 1), i) for i, t in enumerate(TX)})
+    path = str(tmp_path / "seen.bin")
+    assert seen_index.dump(r, path) == 4
+
+    r.flushall()
+    assert seen_index.restore(r, path, mempool_txids={TX[1], TX[3]}) == 2
+    assert seen_index.txids(r) == {TX[1], TX[3]}
+    assert seen_totals.read_raw(r) == (2, 600)
+
+
+def test_read_without_writer_is_zero(r):
+    assert seen_totals.read(r) == (0, 0.0)
+
+
+def test_scripts_are_registered_once(r, monkeypatch):
+    def register_script(script):
+        raise AssertionError("register_script per call")
+
+    monkeypatch.setattr(r, "register_script", register_script)
+
+    pipe = r.pipeline(transaction=True)
+    seen_index.add(r, {TX[0]: (100, 1)}, client=pipe)
+    seen_index.remove(r, [TX[1]], client=pipe)
+    pipe.execute()
+    seen_index.remove(r, [TX[0]])
+
+    assert seen_totals.read_raw(r) == (0, 0)
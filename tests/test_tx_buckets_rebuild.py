@@ -0,0 +1,114 @@
+import os
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core import chart_payload, chart_series, txid_archive
+from core import txid_history_binary as txb
+from core.redis_keys import CHART_SERIES_MODE
+from workers.services.rebuild import tx_buckets_rebuild as rebuild
+
+DAY = "20240101"
+T0 = 1_704_067_200_000     # 2024-01-01 00:00 UTC
+
+
+@pytest.fixture
+def ram_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(rebuild, "RAM_DIR", str(tmp_path))
+    monkeypatch.setattr(rebuild, "ARCHIVE_DIR", str(tmp_path / "archive"))
+
+    rows = [{"txid": f"a{i}", "timestamp_ms": T0 + 5_000, "btc_value": 1.0, "fee_sat": 1000, "weight": 400}
+            for i in range(100)]
+    rows += rows[:10]                                            # Duplikate (Neustart / Overlap)
+    rows.append({"txid": "b0", "timestamp_ms": T0 + 70_000, "btc_value": 2.0, "fee_sat": 0, "weight": 0})
+
+    with open(txid_archive.raw_path(str(tmp_path), DAY), "w") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in rows))
+
+
+def test_aggregate_day_uses_live_dedupe_rule(ram_day):
+    p = rebuild.aggregate_day(DAY, {"24h": 60_000}, {"24h": 60_000})
+
+    assert p["events"] == 101
+    assert p["volume"]["24h"] == {T0: 100.0, T0 + 60_000: 2.0}
+    assert p["fees"]["24h"] == {T0: [100_000, 10_000.0]}
+    assert p["last_ts_ms"] == T0 + 70_000
+
+
+def test_write_redis_publishes_variants_and_zset(monkeypatch):
+    r = fakeredis.FakeRedis()
+    agg = rebuild.volume_worker.AGG
+    key = agg.buckets["24h"]["redis_key"]
+
+    # alter Stand inkl. Sidecars / ZSET
+    chart_payload.publish(r, key, b'{"history":[]}')
+    pipe = r.pipeline()
+    chart_series.replace_series(pipe, key, [(1, 1.0)])
+    pipe.execute()
+    old_etag = chart_payload.read_etag(r, key)
+
+    now_ms = T0 + 3_600_000
+    buckets = {n: {"history": []} for n in agg.buckets}
+    buckets["24h"] = {"history": [{"x": T0, "y": 100.0}, {"x": T0 + 60_000, "y": 2.0}]}
+
+    rebuild.write_redis(r, agg, buckets, "OPEN", {}, "TAIL", now_ms)
+
+    if CHART_SERIES_MODE in ("json", "both"):
+        assert json.loads(r.get(key))["history"][0] == {"x": T0, "y": 100.0}
+        assert chart_payload.read_etag(r, key) != old_etag
+        assert r.exists(chart_payload.gzip_key(key))
+    if CHART_SERIES_MODE in ("zset", "both"):
+        assert chart_series.read_range(r, key) == [{"x": T0, "y": 100.0}, {"x": T0 + 60_000, "y": 2.0}]
+    assert r.get("OPEN") == b"{}"
+
+
+def test_aggregate_day_from_bin_matches_jsonl(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+
+    monkeypatch.setattr(rebuild, "RAM_DIR", str(tmp_path))
+    monkeypatch.setattr(rebuild, "ARCHIVE_DIR", str(tmp_path / "archive"))
+
+    rows = []
+    for i in range(300):
+        ts = T0 + (i // 3) * 1_700                                 # je 3 TXs pro ms
+        rows.append({"txid": f"{i:064x}", "timestamp_ms": ts, "btc_value": 0.01 * (i % 7),
+                     "fee_sat": 150 * (i % 5), "weight": 560 + i, "mempool_size": 1})
+    rows += rows[40:50]                                             # Overlap nach Neustart
+    rows.insert(120, dict(rows[10]))                                # verspätet → hinter dem Cursor
+
+    jsonl = txid_archive.raw_path(str(tmp_path), DAY)
+    with open(jsonl, "w") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in rows))
+
+    buckets = ({"1h": 10_000, "24h": 60_000}, {"24h": 300_000})
+    from_jsonl = rebuild.aggregate_day(DAY, *buckets)
+
+    txb.append_entries(txb.day_path(str(tmp_path), DAY), rows)
+    assert rebuild._load_day_records(DAY) is not None
+    from_bin = rebuild.aggregate_day(DAY, *buckets)
+
+    assert (from_bin["events"], from_bin["last_ts_ms"]) == (from_jsonl["events"], from_jsonl["last_ts_ms"])
+    for name in buckets[0]:
+        assert from_bin["volume"][name] == pytest.approx(from_jsonl["volume"][name])
+    assert from_bin["fees"] == {
+        name: {b: [fee, pytest.approx(vb)] for b, (fee, vb) in sums.items()}
+        for name, sums in from_jsonl["fees"].items()
+    }
+
+    # JSONL abgeräumt → .bin allein reicht, gleiche Tagesliste
+    os.remove(jsonl)
+    assert rebuild.aggregate_day(DAY, *buckets)["events"] == from_jsonl["events"]
+
+
+def test_partial_bin_falls_back_to_jsonl(ram_day, tmp_path):
+    pytest.importorskip("numpy")
+
+    # Deploy-Tag: .bin beginnt erst mitten am Tag
+    txb.append_entries(txb.day_path(str(tmp_path), DAY), [
+        {"txid": "00" * 32, "timestamp_ms": T0 + 70_000, "btc_value": 2.0, "fee_sat": 0, "weight": 0},
+    ])
+
+    assert rebuild._load_day_records(DAY) is None
+    assert rebuild.aggregate_day(DAY, {"24h": 60_000}, {"24h": 60_000})["events"] == 101
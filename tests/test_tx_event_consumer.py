@@ -0,0 +1,89 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.tx_event_stream import TxEventConsumer
+
+KEY = "test:events"
+SLACK = TxEventConsumer.SETID_SLACK_MS
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis()
+
+
+def _consumer(r):
+    return TxEventConsumer(r, "test:group", stream_key=KEY, name="TEST")
+
+
+def _add(r, ts_ms, txid):
+    r.xadd(KEY, {"txid": txid, "timestamp_ms": str(ts_ms), "btc_value": "1.0"}, id=f"{ts_ms}-0")
+
+
+def _txids(batch):
+    return [entry["txid"] for _, entry in batch]
+
+
+def test_new_group_needs_jsonl_then_starts_after_slack(r):
+    base = 10 * SLACK
+    for i in range(4):
+        _add(r, base + i * SLACK // 2, f"t{i}")
+
+    stream = _consumer(r)
+    assert stream.resume(base + SLACK) is None
+
+    # Worker hat aus der JSONL bis base + SLACK aufgeholt → Offset auf ts − Slack
+    stream.start_after(base + SLACK)
+    assert _txids(stream.read(block_ms=1)) == ["t1", "t2", "t3"]
+
+
+def test_restart_replays_gap_then_pending_then_new(r):
+    for i in range(6):
+        _add(r, 1_000_000 + i * 1000, f"t{i}")
+
+    first = _consumer(r)
+    first.start_after(1)                                    # ab Stream-Anfang
+    first.ack([msg_id for msg_id, _ in first.read(block_ms=1, count=4)])
+    pending = first.read(block_ms=1, count=1)               # t4 zugestellt, nicht quittiert
+    assert _txids(pending) == ["t4"]
+
+    # Neustart mit Snapshot-Stand t1 (Slack reicht weiter zurück → Cursor filtert)
+    _add(r, 2_000_000, "t6")
+    second = _consumer(r)
+    replay = second.resume(1_001_000)
+    assert replay is not None
+    assert _txids(replay) == ["t0", "t1", "t2", "t3", "t4"]     # bis last-delivered-id, Gruppe unverändert
+
+    assert _txids(second.read(block_ms=1)) == ["t4"]            # eigene PEL
+    assert _txids(second.read(block_ms=1)) == ["t5", "t6"]      # dann neue Events
+    assert second.read(block_ms=1) == []
+
+
+def test_pending_is_read_in_pages(r):
+    for i in range(5):
+        _add(r, 1_000 + i, f"t{i}")
+
+    stream = _consumer(r)
+    stream.start_after(1)
+    stream.read(block_ms=1)                                  # alles zugestellt, nichts quittiert
+
+    restarted = _consumer(r)
+    assert _txids(restarted.read(block_ms=1, count=2)) == ["t0", "t1"]
+    assert _txids(restarted.read(block_ms=1, count=2)) == ["t2", "t3"]
+    assert _txids(restarted.read(block_ms=1, count=2)) == ["t4"]
+    assert restarted.read(block_ms=1, count=2) == []
+
+
+def test_trimmed_stream_falls_back_to_jsonl(r):
+    for i in range(6):
+        _add(r, 1_000_000 + i * 1000, f"t{i}")
+
+    stream = _consumer(r)
+    stream.start_after(1)
+    stream.read(block_ms=1)
+
+    r.xtrim(KEY, maxlen=2, approximate=False)               # t0..t3 weg
+    assert _consumer(r).resume(1_000_000 + SLACK + 1000) is None
+    # Snapshot jünger als alles Getrimmte → Stream reicht
+    assert _consumer(r).resume(1_004_000 + SLACK) is not None
@@ -0,0 +1,57 @@
+# Regression: btc_top schreibt einen Fetch-Batch mit gleichem timestamp_ms →
+# die Metrics-Worker dürfen nur echte Duplikate verwerfen, nicht den Rest des Batches.
+
+from core.tx_event_stream import TxEventCursor
+
+
+def _batch(ts_ms, n, prefix="tx"):
+    return [{"txid": f"{prefix}{i}", "timestamp_ms": ts_ms, "btc_value": 1.0} for i in range(n)]
+
+
+def test_same_ms_batch_is_counted_completely():
+    cursor = TxEventCursor()
+    batch = _batch(1_700_000_000_000, 500)
+
+    assert sum(cursor.accept(e) for e in batch) == 500
+    assert cursor.last_ts_ms == 1_700_000_000_000
+
+
+def test_replay_of_jsonl_and_stream_overlap_is_dropped():
+    cursor = TxEventCursor()
+    first = _batch(1000, 50, "a") + _batch(1001, 50, "b")
+    assert sum(cursor.accept(e) for e in first) == 100
+
+    # Stream startet mit Slack vor dem JSONL-Stand → alles schon gesehen
+    assert sum(cursor.accept(e) for e in first) == 0
+
+    # danach neue Events im selben ms wie der letzte Batch
+    assert sum(cursor.accept(e) for e in _batch(1001, 60, "b")) == 10
+
+
+def test_older_events_are_dropped():
+    cursor = TxEventCursor()
+    assert cursor.accept({"txid": "x", "timestamp_ms": 2000})
+    assert not cursor.accept({"txid": "y", "timestamp_ms": 1999})
+
+
+def test_seek_without_txids_treats_boundary_ms_as_seen():
+    cursor = TxEventCursor()
+    cursor.seek(5000)
+
+    assert not cursor.accept({"txid": "x", "timestamp_ms": 5000})
+    assert cursor.accept({"txid": "x", "timestamp_ms": 5001})
+    assert cursor.accept({"txid": "y", "timestamp_ms": 5001})
+
+
+def test_volume_worker_counts_whole_batch():
+    import workers.metrics.btc_tx_volume.btc_tx_volume_worker as w
+
+    w.CURSOR.seek(0)
+    w.last_ts_ms = 0
+    w.AGG.reset()
+
+    handled = [w._handle_event(e) for e in _batch(1_700_000_000_000, 200)]
+
+    assert sum(handled) == 200
+    assert w.last_ts_ms == 1_700_000_000_000
+    assert w.AGG.open_value("1h") == 200.0
@@ -0,0 +1,143 @@
+import os
+import json
+
+import pytest
+
+zstd = pytest.importorskip("zstandard")
+
+from core import txid_archive, txid_history_binary
+from workers.services.storage import storage_worker
+
+
+def _write(path, rows):
+    with open(path, "w") as f:
+        for ts, txid in rows:
+            f.write(json.dumps({"txid": txid, "timestamp_ms": ts, "btc_value": 1.0}) + "\n")
+
+
+def test_finalize_day_merges_and_dedupes_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(txid_archive, "FRAME_LINES", 4)
+
+    ram = tmp_path / "ram.jsonl"
+    nvme = tmp_path / "nvme.jsonl"
+    rows = [(1000, f"a{i}") for i in range(5)] + [(1001, "b0"), (1002, "c0")]
+    _write(ram, rows)
+    _write(nvme, rows[:3] + [(1003, "d0")])      # älterer Stand + Segment-Rest
+
+    lines = txid_archive.finalize_day([str(ram), str(nvme), str(tmp_path / "missing")], str(tmp_path), "20240101")
+
+    assert lines == 8
+    assert txid_archive.verify_day(str(tmp_path), "20240101", lines)
+
+    events = list(txid_archive.iter_day(str(tmp_path), "20240101"))
+    assert [e["txid"] for e in events] == ["a0", "a1", "a2", "a3", "a4", "b0", "c0", "d0"]
+
+    idx = txid_archive.load_index(str(tmp_path), "20240101")
+    assert [fr[4] for fr in idx["frames"]] == [4, 4]
+    assert idx["frames"][1][2:4] == [1000, 1003]
+
+
+@pytest.fixture
+def archive_dirs(tmp_path, monkeypatch):
+    src = tmp_path / "ram"
+    dst = tmp_path / "nvme"
+    src.mkdir()
+    dst.mkdir()
+    monkeypatch.setattr(storage_worker, "TXID_SRC_DIR", str(src))
+    monkeypatch.setattr(storage_worker, "TXID_DST_DIR", str(dst))
+    monkeypatch.setattr(storage_worker, "_ARCHIVE_RETRY", {})
+    for day in ("20240101", "20240102", "20240103"):
+        _write(txid_archive.raw_path(str(dst), day), [(1000, "x"), (1001, "y")])
+    return dst
+
+
+def test_archive_is_capped_per_run(archive_dirs):
+    storage_worker.archive_txid_history(max_days=2)
+
+    assert txid_archive.is_finalized(str(archive_dirs), "20240101")
+    assert txid_archive.is_finalized(str(archive_dirs), "20240102")
+    assert not txid_archive.is_finalized(str(archive_dirs), "20240103")
+
+    storage_worker.archive_txid_history(max_days=2)
+    assert txid_archive.is_finalized(str(archive_dirs), "20240103")
+
+
+def test_failed_day_backs_off_and_does_not_block_others(archive_dirs, monkeypatch):
+    real_verify = txid_archive.verify_day
+    calls = []
+
+    def verify(archive_dir, day, lines):
+        calls.append(day)
+        return day != "20240101" and real_verify(archive_dir, day, lines)
+
+    monkeypatch.setattr(txid_archive, "verify_day", verify)
+
+    storage_worker.archive_txid_history(max_days=3)
+    assert calls == ["20240101", "20240102", "20240103"]
+    assert not txid_archive.is_finalized(str(archive_dirs), "20240101")
+    assert txid_archive.is_finalized(str(archive_dirs), "20240103")
+
+    # Backoff → kein erneutes Komprimieren im nächsten Lauf
+    storage_worker.archive_txid_history(max_days=3)
+    assert calls == ["20240101", "20240102", "20240103"]
+    assert storage_worker._ARCHIVE_RETRY["20240101"][0] == 1
+
+
+def test_day_waits_for_grace_after_midnight(archive_dirs, monkeypatch):
+    src = storage_worker.TXID_SRC_DIR
+    midnight = 1704326400.0                     # 2024-01-04 00:00 UTC → 20240103 endet hier
+    grace = storage_worker.TXID_ARCHIVE_GRACE_S
+
+    # btc_top hängt kurz nach Mitternacht noch an die RAM-Datei von gestern an
+    ram = txid_archive.raw_path(src, "20240103")
+    _write(ram, [(1002, "z")])
+    os.utime(ram, (midnight + 5, midnight + 5))
+
+    monkeypatch.setattr(storage_worker.time, "time", lambda: midnight + 60)
+    storage_worker.archive_txid_history(max_days=3)
+    assert txid_archive.is_finalized(str(archive_dirs), "20240102")
+    assert not txid_archive.is_finalized(str(archive_dirs), "20240103")
+
+    # Grace vorbei, RAM-Datei ruht → finalisiert inkl. des späten Appends
+    monkeypatch.setattr(storage_worker.time, "time", lambda: midnight + 5 + grace)
+    storage_worker.archive_txid_history(max_days=3)
+    assert [e["txid"] for e in txid_archive.iter_day(str(archive_dirs), "20240103")] == ["x", "y", "z"]
+
+
+def test_run_once_continues_after_failing_job(monkeypatch):
+    ran = []
+
+    def boom():
+        raise RuntimeError("disk full")
+
+    names = ("persist_txid_history", "archive_txid_history", "trim_ram_txid_jsonl", "persist_btc_volume",
+             "persist_btc_tx_volume", "persist_btc_tx_amount", "persist_btc_tx_fees",
+             "persist_dashboard_traffic")
+    for name in names:
+        monkeypatch.setattr(storage_worker, name, lambda name=name: ran.append(name))
+    monkeypatch.setattr(storage_worker, "archive_txid_history", boom)
+
+    storage_worker.run_once()
+
+    assert ran == [n for n in names if n != "archive_txid_history"]
+
+
+def test_trim_ram_jsonl_keeps_unarchived_and_partial_bin_days(archive_dirs):
+    src = storage_worker.TXID_SRC_DIR
+    rows = [(1000, "aa"), (1001, "bb")]
+    entries = [{"txid": txid, "timestamp_ms": ts, "btc_value": 1.0} for ts, txid in rows]
+
+    for day in ("20240101", "20240102", "20240103"):
+        _write(txid_archive.raw_path(src, day), rows)
+        os.utime(txid_archive.raw_path(src, day), (0, 0))             # btc_top schreibt dort nicht mehr
+    txid_history_binary.append_entries(txid_history_binary.day_path(src, "20240101"), entries)
+    txid_history_binary.append_entries(txid_history_binary.day_path(src, "20240102"), entries[:1])
+    txid_history_binary.append_entries(txid_history_binary.day_path(src, "20240103"), entries)
+
+    storage_worker.archive_txid_history(max_days=2)      # 20240103 noch nicht archiviert
+    storage_worker.trim_ram_txid_jsonl()
+
+    assert not os.path.exists(txid_archive.raw_path(src, "20240101"))   # archiviert + .bin vollständig
+    assert os.path.exists(txid_archive.raw_path(src, "20240102"))       # .bin unvollständig
+    assert os.path.exists(txid_archive.raw_path(src, "20240103"))       # noch nicht archiviert
+    assert os.path.exists(txid_history_binary.day_path(src, "20240101"))
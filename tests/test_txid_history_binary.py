@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from core import txid_history_binary as txb
+from core.tx_event_stream import TxEventCursor
+
+
+def _entry(i, ts=1_700_000_000_000):
+    return {
+        "txid": f"{i:064x}",
+        "timestamp_ms": ts + i,
+        "btc_value": 0.5 + i,
+        "weight": 400 + i,
+        "fee_sat": 1000 + i,
+        "mempool_size": 5000,
+    }
+
+
+def test_roundtrip(tmp_path):
+    path = str(tmp_path / "day.bin")
+    entries = [_entry(i) for i in range(3)]
+
+    assert txb.append_entries(path, entries) == 3
+    assert list(txb.iter_entries(path)) == entries
+
+
+def test_append_after_torn_record_stays_aligned(tmp_path):
+    path = str(tmp_path / "day.bin")
+    txb.append_entries(path, [_entry(0), _entry(1)])
+
+    # abgebrochener write(): halbes Record am Dateiende
+    with open(path, "ab") as f:
+        f.write(txb.pack_entry(_entry(99))[:23])
+
+    txb.append_entries(path, [_entry(2)])
+
+    assert txb.record_count(path) == 3
+    assert [e["txid"] for e in txb.iter_entries(path)] == [_entry(i)["txid"] for i in range(3)]
+
+
+def test_append_after_torn_header_rewrites_header(tmp_path):
+    path = str(tmp_path / "day.bin")
+    with open(path, "wb") as f:
+        f.write(b"TXH")
+
+    txb.append_entries(path, [_entry(0)])
+
+    assert list(txb.iter_entries(path)) == [_entry(0)]
+
+
+def test_accepted_indices_matches_cursor(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "day.bin")
+
+    ts = 1_700_000_000_000
+    rows = [_entry(i, ts) for i in range(4)]               # ts+0 .. ts+3
+    rows += [dict(rows[1])]                                 # Duplikat, liegt hinter dem Cursor
+    rows += [dict(_entry(9, ts), timestamp_ms=ts + 3)]      # gleiche ms, neue txid
+    rows += [dict(rows[3])]                                 # gleiche ms, schon gesehen
+    rows += [dict(_entry(7, ts), timestamp_ms=0)]           # kaputter Timestamp
+    rows += [_entry(5, ts)]
+    txb.append_entries(path, rows)
+
+    cursor = TxEventCursor()
+    expected = [i for i, e in enumerate(rows) if cursor.accept(e)]
+
+    assert txb.accepted_indices(txb.load_day(path)).tolist() == expected
+    assert txb.accepted_indices(np.empty(0, dtype=txb.RECORD_DTYPE)).tolist() == []
+
+
+def test_covers_jsonl(tmp_path):
+    bin_path = str(tmp_path / "day.bin")
+    jsonl = tmp_path / "day.jsonl"
+    entries = [_entry(i) for i in range(3)]
+    jsonl.write_text("".join(json.dumps(e) + "\n" for e in entries))
+
+    assert not txb.covers_jsonl(bin_path, str(jsonl))       # .bin fehlt
+    txb.append_entries(bin_path, entries[:2])
+    assert not txb.covers_jsonl(bin_path, str(jsonl))       # Deploy-Tag: .bin beginnt später
+    txb.append_entries(bin_path, entries[2:])
+    assert txb.covers_jsonl(bin_path, str(jsonl))
+    assert txb.covers_jsonl(bin_path, str(tmp_path / "gone.jsonl"))
@@ -0,0 +1,178 @@
+import itertools
+import time
+
+import pytest
+
+pytest.importorskip("zmq")
+
+from core import rawtx
+from core.zmq_mempool import MempoolZmqListener, StubPublisher, TOPIC_RAWTX, TOPIC_SEQUENCE
+
+_ENDPOINT_IDS = itertools.count()
+
+
+def _endpoint(name):
+    return f"inproc://zmq_mempool_test_{name}_{next(_ENDPOINT_IDS)}"
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _settle(listener, before, rawtx=0, sequence=0, timeout=5.0):
+    """
+    Warten, bis seit before (Kopie von stats) rawtx/sequence weitere Nachrichten angekommen sind, dann drain().
+    Getrennte Endpoints haben keine gemeinsame Reihenfolge → erst zählen, dann abholen.
+    """
+    assert _wait_for(lambda: listener.stats["rawtx"] >= before["rawtx"] + rawtx
+                     and listener.stats["sequence"] >= before["sequence"] + sequence, timeout), listener.stats
+    return listener.drain()
+
+
+@pytest.fixture(params=["shared", "split"])
+def pair(request):
+    # shared = rawtx + sequence auf einem Endpoint, split = eigene Endpoints (wie bitcoind-Default)
+    rawtx_ep = _endpoint("rawtx")
+    sequence_ep = rawtx_ep if request.param == "shared" else _endpoint("sequence")
+
+    pub = StubPublisher(rawtx_ep, sequence_ep)
+    listener = MempoolZmqListener(rawtx_ep, sequence_ep)
+    listener.start()
+
+    # Slow joiner: PUB verwirft alles vor der Subscription → publizieren, bis eine TX auf beiden Topics ankommt
+    # (pro Socket gilt Reihenfolge → danach ist nichts mehr unterwegs)
+    def synced():
+        txid = pub.publish_tx()
+        return _wait_for(lambda: txid in listener._raw and txid in listener._added, timeout=0.2)
+
+    assert _wait_for(synced)
+    listener.drain()
+
+    yield pub, listener
+
+    listener.stop()
+    listener.join(timeout=2)
+    pub.close()
+
+
+def test_drain_added_removed_blocks(pair):
+    pub, listener = pair
+
+    before = dict(listener.stats)
+    txids = [pub.publish_tx() for _ in range(5)]
+    pub.publish_removed(txids[1])
+    pub.publish_block()
+
+    acc = _settle(listener, before, rawtx=5, sequence=7)
+
+    # A + R im selben Zyklus → nur in removed, Raw-Cache-Eintrag verworfen
+    assert acc["added"] == txids[:1] + txids[2:]
+    assert acc["removed"] == {txids[1]}
+    assert set(acc["raw"]) == set(acc["added"])
+    assert acc["gap"] is False
+    assert listener.stats["decode_errors"] == 0
+
+
+def test_drain_is_a_delta(pair):
+    pub, listener = pair
+
+    before = dict(listener.stats)
+    first = pub.publish_tx()
+    assert _settle(listener, before, rawtx=1, sequence=1)["added"] == [first]
+
+    before = dict(listener.stats)
+    second = pub.publish_tx()
+    acc = _settle(listener, before, rawtx=1, sequence=1)
+
+    assert acc["added"] == [second]
+    assert listener.drain() == {"added": [], "removed": set(), "raw": {}, "blocks": 0, "gap": False}
+
+
+def test_sequence_gap_is_reported_once(pair):
+    pub, listener = pair
+
+    before = dict(listener.stats)
+    pub.publish_tx()
+    pub._seq[TOPIC_SEQUENCE] += 3       # drei verlorene sequence-Nachrichten
+    pub.publish_tx()
+
+    acc = _settle(listener, before, rawtx=2, sequence=2)
+
+    assert acc["gap"] is True
+    assert listener.stats["gaps"] == 1
+
+    before = dict(listener.stats)
+    pub.publish_tx()
+    assert _settle(listener, before, rawtx=1, sequence=1)["gap"] is False
+
+
+# -------------------------
+# Reihenfolge-Fälle direkt über _on_message (ohne Sockets)
+# -------------------------
+@pytest.fixture
+def offline():
+    pub = StubPublisher(_endpoint("offline"), _endpoint("offline_seq"))
+    listener = MempoolZmqListener("inproc://unused", "inproc://unused")
+    seq = {TOPIC_RAWTX: itertools.count(), TOPIC_SEQUENCE: itertools.count()}
+
+    def send(topic, body):
+        listener._on_message(topic, body, next(seq[topic]).to_bytes(4, "little"))
+
+    yield pub, listener, send
+    pub.close()
+
+
+def _txid(raw):
+    return rawtx.parse(raw, with_script_types=False, with_txid=True)["txid"]
+
+
+def test_added_then_removed_in_one_cycle_is_not_added(offline):
+    pub, listener, send = offline
+    raw = pub.make_tx()
+    txid = _txid(raw)
+
+    send(TOPIC_RAWTX, raw)
+    send(TOPIC_SEQUENCE, bytes.fromhex(txid) + b"A")
+    send(TOPIC_SEQUENCE, bytes.fromhex(txid) + b"R")
+    delta = listener.drain()
+
+    assert delta["added"] == []
+    assert delta["removed"] == {txid}
+    assert delta["raw"] == {}
+
+
+def test_removed_then_readded_stays_added(offline):
+    pub, listener, send = offline
+    txid = _txid(pub.make_tx())
+
+    send(TOPIC_SEQUENCE, bytes.fromhex(txid) + b"R")
+    send(TOPIC_SEQUENCE, bytes.fromhex(txid) + b"A")
+    delta = listener.drain()
+
+    assert delta["added"] == [txid]
+    assert delta["removed"] == set()
+
+
+def test_raw_after_drained_add_is_dropped(offline):
+    pub, listener, send = offline
+    raw = pub.make_tx()
+    txid = _txid(raw)
+
+    send(TOPIC_SEQUENCE, bytes.fromhex(txid) + b"A")
+    assert listener.drain()["raw"] == {}        # Worker holt per getrawtransaction
+
+    send(TOPIC_RAWTX, raw)
+    assert txid not in listener._raw
+    assert txid not in listener._late
+
+    # Raw vor A (getrennte Endpoints) bleibt bis zum A im Cache
+    early = pub.make_tx()
+    send(TOPIC_RAWTX, early)
+    send(TOPIC_SEQUENCE, bytes.fromhex(_txid(early)) + b"A")
+    assert listener.drain()["raw"] == {_txid(early): early}
+    assert listener.stats["gaps"] == 0
@@ -7,7 +7,6 @@
 import os
 import json
 import time
-from collections import deque
 from glob import glob
 import redis
 
@@ -26,6 +25,7 @@ from core.redis_keys import (
     DASHBOARD_TRAFFIC_STATS,
     DASHBOARD_TRAFFIC_RAW_PREFIX,
 )
+from core.bucket_aggregator import BucketAggregator, CountReducer
 
 # =========================
 # Snapshot Source
@@ -74,35 +74,15 @@ BUCKETS = {
 }
 
 # =========================
-# State
+# State (Ringpuffer pro Auflösung)
 # =========================
-state = {
-    name: {
-        "cur_bucket": None,
-        "bucket_sum": 0,
-        "history": deque(),
-    }
-    for name in BUCKETS
-}
+AGG = BucketAggregator(r, BUCKETS, CountReducer(), name="DASHBOARD_TRAFFIC")
 
 last_ts_ms = 0
 
 # =========================
 # Helpers
 # =========================
-def _bucket_start(ts_ms: int, bucket_ms: int) -> int:
-    return (ts_ms // bucket_ms) * bucket_ms
-
-
-def _prune_history(deq: deque, cutoff_ms: int) -> None:
-    while deq and deq[0][0] < cutoff_ms:
-        deq.popleft()
-
-
-def _set_json(key: str, obj: dict) -> None:
-    r.set(key, json.dumps(obj, separators=(",", ":")))
-
-
 def _set_int(key: str, v: int) -> None:
     r.set(key, str(int(v)))
 
@@ -121,45 +101,6 @@ def _utc_day_str_from_ms(ts_ms: int) -> str:
     return time.strftime("%Y-%m-%d", time.gmtime(ts_ms / 1000))
 
 
-def _publish(name: str, flush_ts_ms: int) -> None:
-    cfg = BUCKETS[name]
-    s = state[name]
-
-    cutoff = flush_ts_ms - cfg["window_ms"]
-    _prune_history(s["history"], cutoff)
-
-    payload = {"history": [{"x": t, "y": v} for t, v in s["history"]]}
-    _set_json(cfg["redis_key"], payload)
-
-
-def _flush_current_bucket(name: str, flush_ts_ms: int) -> None:
-    s = state[name]
-    if s["cur_bucket"] is None or s["bucket_sum"] <= 0:
-        return
-
-    # 🔒 kein doppelter Bucket
-    if s["history"] and s["history"][-1][0] == s["cur_bucket"]:
-        s["history"][-1] = (s["cur_bucket"], s["bucket_sum"])
-    else:
-        s["history"].append((s["cur_bucket"], s["bucket_sum"]))
-
-    _publish(name, flush_ts_ms)
-
-
-def republish_history(now_ms: int) -> None:
-    """
-    Spiegel den kompletten RAM-State nach Redis (flush-resistent).
-    """
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-
-        cutoff = now_ms - cfg["window_ms"]
-        _prune_history(s["history"], cutoff)
-
-        payload = {"history": [{"x": t, "y": v} for t, v in s["history"]]}
-        _set_json(cfg["redis_key"], payload)
-
-
 # =========================
 # Event Processing
 # =========================
@@ -192,22 +133,10 @@ def _process_request_event(ts_ms: int, count: int) -> None:
         )
 
     # Buckets
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        b = _bucket_start(ts_ms, cfg["bucket_ms"])
-
-        if s["cur_bucket"] is None:
-            s["cur_bucket"] = b
-
-        if b == s["cur_bucket"]:
-            s["bucket_sum"] += count
-        else:
-            _flush_current_bucket(name, ts_ms)
-            s["cur_bucket"] = b
-            s["bucket_sum"] = count
+    AGG.add(ts_ms, count)
 
     # Live 10s = aktueller 1h Bucket
-    _set_int(DASHBOARD_TRAFFIC_LIVE_10S, state["1h"]["bucket_sum"])
+    _set_int(DASHBOARD_TRAFFIC_LIVE_10S, AGG.open_value("1h"))
 
 
 # =========================
@@ -234,7 +163,7 @@ def warmstart_from_snapshot():
     snap = _load_latest_snapshot()
     if not snap:
         print("[DASHBOARD_TRAFFIC][WARMSTART] no snapshot → cold start")
-        republish_history(int(time.time() * 1000))
+        AGG.republish(int(time.time() * 1000))
         return
 
     last_ts_ms = int(snap.get("last_ts_ms", 0))
@@ -250,37 +179,10 @@ def warmstart_from_snapshot():
     if "day_utc" in snap:
         r.set(DASHBOARD_TRAFFIC_DAY, snap["day_utc"])
 
-    # Finished buckets
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        s["history"].clear()
-        s["cur_bucket"] = None
-        s["bucket_sum"] = 0
-
-        bucket = snap.get("buckets", {}).get(name)
-        if not bucket:
-            _set_json(cfg["redis_key"], {"history": []})
-            continue
-
-        for p in bucket.get("history", []):
-            s["history"].append((int(p["x"]), int(p["y"])))
-
-        _set_json(cfg["redis_key"], {"history": bucket["history"]})
-
-    # Open buckets
-    open_buckets = snap.get("open_buckets", {})
-    for name, ob in open_buckets.items():
-        if name not in state:
-            continue
-        try:
-            state[name]["cur_bucket"] = int(ob.get("cur_bucket"))
-            state[name]["bucket_sum"] = int(ob.get("bucket_sum", 0))
-        except Exception:
-            state[name]["cur_bucket"] = None
-            state[name]["bucket_sum"] = 0
-
-
-    republish_history(int(time.time() * 1000))  # 🔥 sofort sichtbar nach Restart
+    # Finished + open buckets
+    AGG.restore(snap)
+
+    AGG.republish(int(time.time() * 1000))  # 🔥 sofort sichtbar nach Restart
     print(f"[DASHBOARD_TRAFFIC][WARMSTART] snapshot restored (last_ts_ms={last_ts_ms})")
 
 
@@ -337,17 +239,7 @@ def dashboard_traffic_worker_loop():
         # Persist open buckets (for snapshot safety)
         r.set(
             "DASHBOARD_TRAFFIC_OPEN_BUCKETS",
-            json.dumps(
-                {
-                    name: {
-                        "cur_bucket": s["cur_bucket"],
-                        "bucket_sum": s["bucket_sum"],
-                    }
-                    for name, s in state.items()
-                    if s["cur_bucket"] is not None
-                },
-                separators=(",", ":"),
-            ),
+            json.dumps(AGG.open_buckets(), separators=(",", ":")),
         )
 
         # Stats / Health
@@ -369,7 +261,7 @@ def dashboard_traffic_worker_loop():
         )
 
         # 🔥 History immer spiegeln (flush-resistent)
-        republish_history(int(time.time() * 1000))
+        AGG.republish(int(time.time() * 1000))
 
         time.sleep(POLL_SECONDS)
 
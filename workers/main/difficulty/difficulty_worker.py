@@ -16,6 +16,8 @@ from core.redis_keys import (
     RETRY_INTERVAL_SECONDS,
 )
 
+from core import chart_payload  # JSON + gzip/brotli + ETag
+
 # RPC Hauptnode
 from nodes.config import NODE_CONFIG
 from nodes.rpc import BitcoinRPC
@@ -109,16 +111,16 @@ def debug_state(today, last):
 def write_redis_from_jsonl():
     print("[DIFFICULTY] Updating Redis")
 
-    r.set("CHART_BTC_DIFFICULTY_1y", json.dumps({
+    chart_payload.publish(r, "CHART_BTC_DIFFICULTY_1y", json.dumps({
         "history": tail_jsonl(DIFF_FILE, 365)
     }))
-    r.set("CHART_BTC_DIFFICULTY_5y", json.dumps({
+    chart_payload.publish(r, "CHART_BTC_DIFFICULTY_5y", json.dumps({
         "history": tail_jsonl(DIFF_FILE, 365 * 5)
     }))
-    r.set("CHART_BTC_DIFFICULTY_10y", json.dumps({
+    chart_payload.publish(r, "CHART_BTC_DIFFICULTY_10y", json.dumps({
         "history": tail_jsonl(DIFF_FILE, 365 * 10)
     }))
-    r.set("CHART_BTC_DIFFICULTY_ever", json.dumps({
+    chart_payload.publish(r, "CHART_BTC_DIFFICULTY_ever", json.dumps({
         "history": tail_jsonl(DIFF_FILE, 365 * 50)
     }))
 
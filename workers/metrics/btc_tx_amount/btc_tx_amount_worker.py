@@ -8,6 +8,8 @@ import json
 import redis
 from datetime import datetime, timezone
 
+from core.top_n import TopN
+
 from core.redis_keys import (
     BTC_TOP_TXS_KEY,
     BTC_TX_AMOUNT_HISTORY_KEY,
@@ -72,6 +74,16 @@ top_event_store = {
 }
 seen_txids = set()
 
+# Top-N pro Zeitfenster (Min-Heap); Rebuild aus dem Event-Store nur, wenn ein Eintrag aus dem Fenster fällt
+window_tops = {}
+
+
+def store_event(event):
+    """Event in den Store + in alle Fenster-Heaps (zu alte fliegen beim nächsten build_top per expire raus)."""
+    top_event_store["events"].append(event)
+    for top in window_tops.values():
+        top.push(event)
+
 # =====================
 # Restore from snapshot
 # =====================
@@ -116,7 +128,7 @@ def restore_from_snapshot():
                 continue
 
             seen_txids.add(txid)
-            top_event_store["events"].append(e)
+            store_event(e)
             restored += 1
 
     print(
@@ -139,16 +151,15 @@ def window_cutoff(window: str, now_ms: int, now_utc: datetime) -> int:
 def build_top(window: str, limit: int, now_ms: int, now_utc: datetime):
     cutoff = window_cutoff(window, now_ms, now_utc)
 
-    candidates = [
-        e for e in top_event_store["events"]
-        if e["timestamp_ms"] >= cutoff
-    ]
+    top = window_tops.get(window)
+    if top is None or top.limit != limit:
+        top = window_tops[window] = TopN(limit)
+        top.extend(e for e in top_event_store["events"] if e["timestamp_ms"] >= cutoff)
+    elif top.expire(cutoff):
+        # Eintrag aus dem Fenster gefallen → verdrängte, jüngere Events können nachrücken
+        top.reset(e for e in top_event_store["events"] if e["timestamp_ms"] >= cutoff)
 
-    return sorted(
-        candidates,
-        key=lambda x: x["btc_value"],
-        reverse=True
-    )[:limit]
+    return top.items()
 
 # ==================
 # Ingest current top
@@ -166,7 +177,7 @@ def ingest_now_top(now_top, now_ms: int):
         }
 
         seen_txids.add(txid)
-        top_event_store["events"].append(event)
+        store_event(event)
 
 # ===========
 # Aggregation
@@ -209,7 +220,7 @@ def build_tx_amount():
         # 👇 wichtig: nur hier ingestieren
         if txid not in seen_txids:
             seen_txids.add(txid)
-            top_event_store["events"].append(event)
+            store_event(event)
 
     return {
         "now":     now_bucket,  # ✅ korrekt
@@ -5,8 +5,6 @@
 import os
 import json
 import time
-from collections import deque
-from glob import glob
 import redis
 
 from core.redis_keys import (
@@ -17,7 +15,13 @@ from core.redis_keys import (
     BTC_TX_FEES_STATS,
     POLL_SECONDS,
     BTC_TX_FEES_OPEN_BUCKETS,
+    BTC_TX_FEES_TAIL_STATE,
+    BTC_TX_FEES_STREAM_GROUP,
+    TX_EVENT_SOURCE,
 )
+from core.jsonl_tail import JsonlTailReader
+from core.tx_event_stream import TxEventConsumer, TxEventCursor
+from core.bucket_aggregator import BucketAggregator, WeightedAvgReducer
 
 
 # =======================================
@@ -33,6 +37,10 @@ FEE_SNAPSHOT_DIR = ("/raid/data/bitcoin_dashboard/metrics_history/btc_tx_fees_hi
 
 r = redis.Redis(host="localhost", port=6379, db=0)
 
+# Stream = live (sub-second), JSONL = Catch-up nach Restart / Fallback
+TAIL = JsonlTailReader(r, TXID_HISTORY_DIR, BTC_TX_FEES_TAIL_STATE, name="BTC_TX_FEES][TAIL")
+STREAM = TxEventConsumer(r, BTC_TX_FEES_STREAM_GROUP, name="BTC_TX_FEES][STREAM")
+
 # =========================
 # Buckets
 # =========================
@@ -40,99 +48,44 @@ BUCKETS = {
     "24h": {
         "bucket_ms": 1000 * 60 * 5,
         "window_ms": 1000 * 60 * 60 * 24,
-        "key": BTC_TX_FEES_24H,
+        "redis_key": BTC_TX_FEES_24H,
     },
     "1w": {
         "bucket_ms": 1000 * 60 * 30,
         "window_ms": 1000 * 60 * 60 * 24 * 7,
-        "key": BTC_TX_FEES_1W,
+        "redis_key": BTC_TX_FEES_1W,
     },
     "1m": {
         "bucket_ms": 1000 * 60 * 60 * 2,
         "window_ms": 1000 * 60 * 60 * 24 * 30,
-        "key": BTC_TX_FEES_1M,
+        "redis_key": BTC_TX_FEES_1M,
     },
     "1y": {
         "bucket_ms": 1000 * 60 * 60 * 12,
         "window_ms": 1000 * 60 * 60 * 24 * 365,
-        "key": BTC_TX_FEES_1Y,
+        "redis_key": BTC_TX_FEES_1Y,
     },
 }
 
 # =========================
-# State
+# State (Ringpuffer pro Auflösung)
 # =========================
-state = {
-    name: {
-        "cur_bucket": None,
-        "sum_fee": 0,
-        "sum_vbytes": 0,
-        "history": deque(),
-    }
-    for name in BUCKETS
-}
+# Bucket-Wert = SUM(fee_sat) / SUM(vbytes) → sat/vB (2 Nachkommastellen)
+AGG = BucketAggregator(r, BUCKETS, WeightedAvgReducer(), name="BTC_TX_FEES")
 
 last_ts_ms = 0
+CURSOR = TxEventCursor()   # Dedupe über (timestamp_ms, txid), last_ts_ms spiegelt den Cursor
+
 
 # =========================
 # Helpers
 # =========================
-def bucket_start(ts, size):
-    return (ts // size) * size
-
-
-def flush_bucket(name, now_ms):
-    s = state[name]
-    if s["sum_vbytes"] <= 0:
-        return
-
-    avg = s["sum_fee"] / s["sum_vbytes"]
-    s["history"].append((s["cur_bucket"], avg))
-
-    cutoff = now_ms - BUCKETS[name]["window_ms"]
-    while s["history"] and s["history"][0][0] < cutoff:
-        s["history"].popleft()
-
-    payload = {
-        "history": [{"x": t, "y": round(v, 2)} for t, v in s["history"]]
-    }
-
-    r.set(BUCKETS[name]["key"], json.dumps(payload, separators=(",", ":")))
-
-
 def process_tx(ts_ms, fee_sat, weight):
     if fee_sat <= 0 or weight <= 0:
         return
 
-    vbytes = weight / 4
+    AGG.add(ts_ms, fee_sat, weight / 4)
 
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        b = bucket_start(ts_ms, cfg["bucket_ms"])
-
-        if s["cur_bucket"] is None:
-            s["cur_bucket"] = b
-
-        if b != s["cur_bucket"]:
-            flush_bucket(name, ts_ms)
-            s["cur_bucket"] = b
-            s["sum_fee"] = 0
-            s["sum_vbytes"] = 0
-
-        s["sum_fee"] += fee_sat
-        s["sum_vbytes"] += vbytes
-
-
-def republish_history():
-    for name in BUCKETS:
-        s = state[name]
-        r.set(
-            BUCKETS[name]["key"],
-            json.dumps(
-                {"history": [{"x": t, "y": round(v, 2)} for t, v in s["history"]]},
-                separators=(",", ":"),
-            ),
-        )
 
 # =====================================================
 # 🧊 Snapshot Loader (WARMSTART)
@@ -179,52 +132,71 @@ def warmstart():
         return
 
     last_ts_ms = int(snapshot.get("last_ts_ms", 0))
+    CURSOR.seek(last_ts_ms)
 
-    # -------------------------
-    # Restore finished buckets
-    # -------------------------
-    for name in BUCKETS:
-        s = state[name]
-        s["history"].clear()
-        s["cur_bucket"] = None
-        s["sum_fee"] = 0
-        s["sum_vbytes"] = 0
-
-        bucket = snapshot.get("buckets", {}).get(name)
-        if not bucket:
-            continue
+    # abgeschlossene + offene Buckets
+    AGG.restore(snapshot)
 
-        for p in bucket.get("history", []):
-            if "x" in p and "y" in p:
-                s["history"].append((int(p["x"]), float(p["y"])))
+    print(f"[BTC_TX_FEES][WARMSTART] snapshot restored (last_ts_ms={last_ts_ms})")
 
-        r.set(
-            BUCKETS[name]["key"],
-            json.dumps({"history": bucket["history"]}, separators=(",", ":"))
-        )
 
-    # -------------------------
-    # Restore open buckets
-    # -------------------------
-    open_buckets = snapshot.get("open_buckets", {})
 
-    for name, ob in open_buckets.items():
-        if name not in state:
-            continue
+# =========================
+# Event Sources
+# =========================
+def _handle_event(e: dict) -> bool:
+    """Ein TX-Event (JSONL-Zeile oder Stream-Eintrag) verarbeiten. True = gezählt."""
+    global last_ts_ms
 
-        try:
-            state[name]["cur_bucket"] = int(ob.get("cur_bucket"))
-            state[name]["sum_fee"] = float(ob.get("sum_fee", 0))
-            state[name]["sum_vbytes"] = float(ob.get("sum_vbytes", 0))
-        except Exception:
-            # Safety fallback
-            state[name]["cur_bucket"] = None
-            state[name]["sum_fee"] = 0
-            state[name]["sum_vbytes"] = 0
+    if not CURSOR.accept(e):
+        return False
+    last_ts_ms = CURSOR.last_ts_ms
 
-    print(f"[BTC_TX_FEES][WARMSTART] snapshot restored (last_ts_ms={last_ts_ms})")
+    process_tx(
+        last_ts_ms,
+        int(e.get("fee_sat", 0)),
+        int(e.get("weight", 0)),
+    )
+    return True
 
 
+def _consume_jsonl() -> int:
+    """Nur neu angehängte Zeilen (auch Rest vom Vortag nach Mitternacht)."""
+    processed = 0
+    for e in TAIL.read_new():
+        if _handle_event(e):
+            processed += 1
+
+    TAIL.save(last_ts_ms)
+    return processed
+
+
+def _consume_stream(deadline: float):
+    """
+    Liest den Event-Stream bis zur Deadline (blockierend, kein Polling-Sleep).
+    Returns (processed, busy_ms).
+    """
+    processed = 0
+    busy_s = 0.0
+
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+
+        batch = STREAM.read(block_ms=int(remaining * 1000))
+        if not batch:
+            continue
+
+        t0 = time.time()
+        for _, e in batch:
+            if _handle_event(e):
+                processed += 1
+        STREAM.ack([msg_id for msg_id, _ in batch])
+        busy_s += time.time() - t0
+
+    return processed, int(busy_s * 1000)
+
 
 # =========================
 # Main Loop
@@ -233,37 +205,35 @@ def btc_tx_fees_worker_loop():
     global last_ts_ms
 
     warmstart()
-    republish_history()   # 🔥 SOFORT sichtbar nach Restart
+    AGG.republish(int(time.time() * 1000))   # 🔥 SOFORT sichtbar nach Restart
 
     print("[BTC_TX_FEES] Worker started")
 
+    # 📜 JSONL-Position passend zum Snapshot wiederherstellen
+    TAIL.resume(last_ts_ms)
+
+    use_stream = TX_EVENT_SOURCE == "stream"
+    if use_stream:
+        # Snapshot → Gruppen-Offset: Lücke aus dem Stream nachspielen, PEL + neue Events liest read()
+        replay = STREAM.resume(last_ts_ms)
+        if replay is not None:
+            replayed = sum(1 for _, entry in replay if _handle_event(entry))
+            print(f"[BTC_TX_FEES] replay from stream: {replayed} events → stream mode")
+        else:
+            # Gruppe neu / Stream getrimmt → Catch-up aus der Tagesdatei, dann Offset setzen
+            caught_up = _consume_jsonl()
+            STREAM.start_after(last_ts_ms)
+            print(f"[BTC_TX_FEES] catch-up from JSONL: {caught_up} events → stream mode")
+
     while True:
         loop_t0 = time.time()
-        processed = 0
 
-        files = sorted(
-            glob(os.path.join(TXID_HISTORY_DIR, "all_mempool_seen_*.jsonl"))
-        )
+        if use_stream:
+            processed, elapsed_ms = _consume_stream(loop_t0 + POLL_SECONDS)
+        else:
+            processed = _consume_jsonl()
+            elapsed_ms = int((time.time() - loop_t0) * 1000)
 
-        if files:
-            with open(files[-1]) as f:
-                for line in f:
-                    e = json.loads(line)
-
-                    ts = int(e.get("timestamp_ms", 0))
-                    if ts <= last_ts_ms:
-                        continue
-
-                    process_tx(
-                        ts,
-                        int(e.get("fee_sat", 0)),
-                        int(e.get("weight", 0)),
-                    )
-
-                    last_ts_ms = ts
-                    processed += 1
-
-        elapsed_ms = int((time.time() - loop_t0) * 1000)
         sleep_ms = max(0, POLL_SECONDS * 1000 - elapsed_ms)
 
         # -------------------------
@@ -273,15 +243,19 @@ def btc_tx_fees_worker_loop():
             BTC_TX_FEES_STATS,
             mapping={
                 "status": "ok",
+                "source": TX_EVENT_SOURCE,
                 "processed": str(processed),
                 "elapsed_ms": str(elapsed_ms),
                 "sleep_ms": str(sleep_ms),
                 "last_ts_ms": str(last_ts_ms),
+                "tail_day": str(TAIL.day),
+                "tail_offset": str(TAIL.offset),
             },
         )
 
         print(
             "[BTC_TX_FEES WORKER] "
+            f"source={TX_EVENT_SOURCE} | "
             f"processed={processed} | "
             f"scan={elapsed_ms}ms | "
             f"sleep={sleep_ms}ms | "
@@ -293,22 +267,12 @@ def btc_tx_fees_worker_loop():
         # -------------------------
         r.set(
             BTC_TX_FEES_OPEN_BUCKETS,
-            json.dumps(
-                {
-                    name: {
-                        "cur_bucket": s["cur_bucket"],
-                        "sum_fee": s["sum_fee"],
-                        "sum_vbytes": s["sum_vbytes"],
-                    }
-                    for name, s in state.items()
-                    if s["cur_bucket"] is not None
-                },
-                separators=(",", ":"),
-            ),
+            json.dumps(AGG.open_buckets(), separators=(",", ":")),
         )
 
         # 🔥 History immer spiegeln
-        republish_history()
-
-        time.sleep(POLL_SECONDS)
+        AGG.republish(int(time.time() * 1000))
 
+        # Stream-Modus blockiert bereits bis zum nächsten Takt
+        if not use_stream:
+            time.sleep(POLL_SECONDS)
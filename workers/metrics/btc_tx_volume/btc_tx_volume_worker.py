@@ -6,7 +6,6 @@
 import os
 import json
 import time
-from collections import deque
 from glob import glob
 import redis
 
@@ -18,7 +17,13 @@ from core.redis_keys import (
     BTC_TX_VOLUME_1Y,
     BTC_TX_VOLUME_STATS,
     BTC_TX_VOLUME_OPEN_BUCKETS,
+    BTC_TX_VOLUME_TAIL_STATE,
+    BTC_TX_VOLUME_STREAM_GROUP,
+    TX_EVENT_SOURCE,
 )
+from core.jsonl_tail import JsonlTailReader
+from core.tx_event_stream import TxEventConsumer, TxEventCursor
+from core.bucket_aggregator import BucketAggregator, SumReducer
 
 # =========================
 # Paths
@@ -36,6 +41,13 @@ POLL_SECONDS = 10  # aligned to smallest bucket (10s)
 # =========================
 r = redis.Redis(host="localhost", port=6379, db=0, decode_responses=False)
 
+# =========================
+# Live TX Source
+# =========================
+# Stream = live (sub-second), JSONL = Catch-up nach Restart / Fallback
+TAIL = JsonlTailReader(r, TXID_HISTORY_DIR, BTC_TX_VOLUME_TAIL_STATE, name="BTC_TX_VOLUME][TAIL")
+STREAM = TxEventConsumer(r, BTC_TX_VOLUME_STREAM_GROUP, name="BTC_TX_VOLUME][STREAM")
+
 # =========================
 # Bucket model
 # =========================
@@ -77,124 +89,13 @@ BUCKETS = {
 }
 
 # =========================
-# In-memory state per stream
+# In-memory state (Ringpuffer pro Auflösung)
 # =========================
-state = {
-    name: {
-        "cur_bucket": None,   # current bucket start ts_ms
-        "bucket_sum": 0.0,    # SUM(BTC) within current bucket
-        "history": deque(),   # deque[(bucket_start_ts_ms, bucket_sum)]
-    }
-    for name in BUCKETS
-}
+# Semantics: bucket value = SUM(btc_value) within that bucket
+AGG = BucketAggregator(r, BUCKETS, SumReducer(), name="BTC_TX_VOLUME")
 
 last_ts_ms = 0
-
-# =========================
-# Helpers
-# =========================
-def _prune_history(deq: deque, cutoff_ms: int) -> None:
-    while deq and deq[0][0] < cutoff_ms:
-        deq.popleft()
-
-def _set_json(key: str, obj: dict) -> None:
-    # compact JSON for speed & bandwidth
-    r.set(key, json.dumps(obj, separators=(",", ":")))
-
-def _publish(name: str, flush_ts_ms: int) -> None:
-    """Publish history payload for stream name to Redis (pruned to window)."""
-    cfg = BUCKETS[name]
-    s = state[name]
-
-    cutoff = flush_ts_ms - cfg["window_ms"]
-    _prune_history(s["history"], cutoff)
-
-    payload = {"history": [{"x": t, "y": v} for t, v in s["history"]]}
-    _set_json(cfg["redis_key"], payload)
-
-def _flush_current_bucket(name: str, flush_ts_ms: int) -> bool:
-    """
-    Finalize current bucket by appending it to history if it has data,
-    then publish. Returns True if a publish happened.
-    """
-    s = state[name]
-    if s["cur_bucket"] is None:
-        return False
-
-    # Do not create empty buckets
-    if s["bucket_sum"] <= 0:
-        return False
-
-    s["history"].append((s["cur_bucket"], s["bucket_sum"]))
-    _publish(name, flush_ts_ms)
-    return True
-
-def _bucket_start(ts_ms: int, bucket_ms: int) -> int:
-    return (ts_ms // bucket_ms) * bucket_ms
-
-def _process_tx_event(ts_ms: int, val: float) -> None:
-    """
-    Process one tx-event (timestamp_ms, btc_value) into all streams.
-    Semantics: bucket value = SUM(btc_value) within that bucket.
-    """
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        b = _bucket_start(ts_ms, cfg["bucket_ms"])
-
-        if s["cur_bucket"] is None:
-            s["cur_bucket"] = b
-
-        if b == s["cur_bucket"]:
-            s["bucket_sum"] += val
-        else:
-            # finalize previous bucket if it has data (publish only then)
-            _flush_current_bucket(name, ts_ms)
-
-            # start new bucket
-            s["cur_bucket"] = b
-            s["bucket_sum"] = val
-
-def _maybe_flush_on_idle(now_ms: int) -> None:
-    """
-    If time advanced beyond current bucket boundary, finalize bucket (only if it has data),
-    advance cur_bucket to current boundary. This avoids constant redis churn.
-    """
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        if s["cur_bucket"] is None:
-            continue
-
-        # if bucket has ended
-        if now_ms >= s["cur_bucket"] + cfg["bucket_ms"]:
-            _flush_current_bucket(name, now_ms)
-
-            # advance bucket to current boundary, keep sum reset
-            s["cur_bucket"] = _bucket_start(now_ms, cfg["bucket_ms"])
-            s["bucket_sum"] = 0.0
-
-def _initial_publish_if_empty(now_ms: int) -> None:
-    """
-    Optional: ensure keys exist even if there's no data yet (so API returns valid JSON).
-    Runs once after warmstart.
-    """
-    for name, cfg in BUCKETS.items():
-        if not state[name]["history"]:
-            _set_json(cfg["redis_key"], {"history": []})
-
-
-def republish_history(now_ms: int) -> None:
-    """
-    Spiegel den kompletten RAM-State nach Redis (flush-resistent).
-    Optional: trimmen auf window_ms wie bei publish.
-    """
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-
-        cutoff = now_ms - cfg["window_ms"]
-        _prune_history(s["history"], cutoff)
-
-        payload = {"history": [{"x": t, "y": v} for t, v in s["history"]]}
-        _set_json(cfg["redis_key"], payload)
+CURSOR = TxEventCursor()   # Dedupe über (timestamp_ms, txid), last_ts_ms spiegelt den Cursor
 
 
 # =====================================================
@@ -223,52 +124,78 @@ def warmstart_from_snapshot():
     snap = load_latest_tx_volume_snapshot()
     if not snap:
         print("[BTC_TX_VOLUME][WARMSTART] no snapshot → cold start")
-        _initial_publish_if_empty(int(time.time() * 1000))
+        AGG.republish(int(time.time() * 1000))
         return
 
     last_ts_ms = int(snap.get("last_ts_ms", 0))
+    CURSOR.seek(last_ts_ms)
 
-    # ----------------------------
-    # Restore finished buckets
-    # ----------------------------
-    for name, cfg in BUCKETS.items():
-        s = state[name]
-        s["history"].clear()
-        s["cur_bucket"] = None
-        s["bucket_sum"] = 0.0
-
-        bucket = snap.get("buckets", {}).get(name)
-        if not bucket:
-            continue
+    # abgeschlossene + offene Buckets
+    AGG.restore(snap)
 
-        for p in bucket.get("history", []):
-            s["history"].append((int(p["x"]), float(p["y"])))
+    AGG.republish(int(time.time() * 1000))  # 🔥 sofort sichtbar nach Restart
 
-        _set_json(cfg["redis_key"], {"history": bucket["history"]})
+    print(
+        f"[BTC_TX_VOLUME][WARMSTART] snapshot restored "
+        f"(last_ts_ms={last_ts_ms})"
+    )
 
-    # ----------------------------
-    # Restore open (unfinished) buckets
-    # ----------------------------
-    open_buckets = snap.get("open_buckets", {})
 
-    for name, ob in open_buckets.items():
-        if name not in state:
-            continue
+# =========================
+# Event Sources
+# =========================
+def _handle_event(entry: dict) -> bool:
+    """Ein TX-Event (JSONL-Zeile oder Stream-Eintrag) verarbeiten. True = gezählt."""
+    global last_ts_ms
 
-        try:
-            state[name]["cur_bucket"] = int(ob.get("cur_bucket"))
-            state[name]["bucket_sum"] = float(ob.get("bucket_sum", 0.0))
-        except Exception:
-            # Safety: ignore corrupted open bucket
-            state[name]["cur_bucket"] = None
-            state[name]["bucket_sum"] = 0.0
+    if not CURSOR.accept(entry):
+        return False
+    last_ts_ms = CURSOR.last_ts_ms
 
-    republish_history(int(time.time() * 1000))  # 🔥 sofort sichtbar nach Restart
+    val = float(entry.get("btc_value", 0.0))
+    if val <= 0:
+        return False
 
-    print(
-        f"[BTC_TX_VOLUME][WARMSTART] snapshot restored "
-        f"(last_ts_ms={last_ts_ms})"
-    )
+    AGG.add(last_ts_ms, val)
+    return True
+
+
+def _consume_jsonl() -> int:
+    """Nur neu angehängte Zeilen (auch Rest vom Vortag nach Mitternacht)."""
+    processed = 0
+    for entry in TAIL.read_new():
+        if _handle_event(entry):
+            processed += 1
+
+    TAIL.save(last_ts_ms)
+    return processed
+
+
+def _consume_stream(deadline: float):
+    """
+    Liest den Event-Stream bis zur Deadline (blockierend, kein Polling-Sleep).
+    Returns (processed, busy_ms).
+    """
+    processed = 0
+    busy_s = 0.0
+
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+
+        batch = STREAM.read(block_ms=int(remaining * 1000))
+        if not batch:
+            continue
+
+        t0 = time.time()
+        for _, entry in batch:
+            if _handle_event(entry):
+                processed += 1
+        STREAM.ack([msg_id for msg_id, _ in batch])
+        busy_s += time.time() - t0
+
+    return processed, int(busy_s * 1000)
 
 
 # =========================
@@ -282,34 +209,31 @@ def btc_tx_volume_worker_loop():
     # 🔥 Snapshot-Warmstart
     warmstart_from_snapshot()
 
-    while True:
-        loop_t0 = time.time()
-        processed = 0
-
-        files = sorted(
-            glob(os.path.join(TXID_HISTORY_DIR, "all_mempool_seen_*.jsonl"))
-        )
-
-        if files:
-            with open(files[-1], "r") as f:
-                for line in f:
-                    entry = json.loads(line)
+    # 📜 JSONL-Position passend zum Snapshot wiederherstellen
+    TAIL.resume(last_ts_ms)
 
-                    ts_ms = int(entry.get("timestamp_ms", 0))
-                    if ts_ms <= last_ts_ms:
-                        continue
-
-                    val = float(entry.get("btc_value", 0.0))
-                    if val <= 0:
-                        last_ts_ms = ts_ms
-                        continue
+    use_stream = TX_EVENT_SOURCE == "stream"
+    if use_stream:
+        # Snapshot → Gruppen-Offset: Lücke aus dem Stream nachspielen, PEL + neue Events liest read()
+        replay = STREAM.resume(last_ts_ms)
+        if replay is not None:
+            replayed = sum(1 for _, entry in replay if _handle_event(entry))
+            print(f"[BTC_TX_VOLUME] replay from stream: {replayed} events → stream mode")
+        else:
+            # Gruppe neu / Stream getrimmt → Catch-up aus der Tagesdatei, dann Offset setzen
+            caught_up = _consume_jsonl()
+            STREAM.start_after(last_ts_ms)
+            print(f"[BTC_TX_VOLUME] catch-up from JSONL: {caught_up} events → stream mode")
 
-                    _process_tx_event(ts_ms, val)
+    while True:
+        loop_t0 = time.time()
 
-                    last_ts_ms = ts_ms
-                    processed += 1
+        if use_stream:
+            processed, elapsed_ms = _consume_stream(loop_t0 + POLL_SECONDS)
+        else:
+            processed = _consume_jsonl()
+            elapsed_ms = int((time.time() - loop_t0) * 1000)
 
-        elapsed_ms = int((time.time() - loop_t0) * 1000)
         sleep_ms = max(0, POLL_SECONDS * 1000 - elapsed_ms)
 
         # -------------------------
@@ -317,17 +241,7 @@ def btc_tx_volume_worker_loop():
         # -------------------------
         r.set(
             BTC_TX_VOLUME_OPEN_BUCKETS,
-            json.dumps(
-                {
-                    name: {
-                        "cur_bucket": s["cur_bucket"],
-                        "bucket_sum": s["bucket_sum"],
-                    }
-                    for name, s in state.items()
-                    if s["cur_bucket"] is not None
-                },
-                separators=(",", ":"),
-            ),
+            json.dumps(AGG.open_buckets(), separators=(",", ":")),
         )
 
         # -------------------------
@@ -337,15 +251,19 @@ def btc_tx_volume_worker_loop():
             BTC_TX_VOLUME_STATS,
             mapping={
                 "status": "ok",
+                "source": TX_EVENT_SOURCE,
                 "processed": str(processed),
                 "elapsed_ms": str(elapsed_ms),
                 "sleep_ms": str(sleep_ms),
                 "last_ts_ms": str(last_ts_ms),
+                "tail_day": str(TAIL.day),
+                "tail_offset": str(TAIL.offset),
             },
         )
 
         print(
             "[BTC_TX_VOLUME WORKER] "
+            f"source={TX_EVENT_SOURCE} | "
             f"processed={processed} | "
             f"scan={elapsed_ms}ms | "
             f"sleep={sleep_ms}ms | "
@@ -353,6 +271,8 @@ def btc_tx_volume_worker_loop():
         )
 
         # 🔥 History immer spiegeln (flush-resistent)
-        republish_history(int(time.time() * 1000))
+        AGG.republish(int(time.time() * 1000))
 
-        time.sleep(POLL_SECONDS)
+        # Stream-Modus blockiert bereits bis zum nächsten Takt
+        if not use_stream:
+            time.sleep(POLL_SECONDS)
@@ -7,10 +7,10 @@ import json
 import time
 import redis
 
+from core import seen_totals
 from core.redis_keys import (
     BTC_VOL_DYNAMIC_CACHE,
     BTC_VOL_LOCK_KEY,
-    BTC_TOP_SEEN_VALUE_KEY,
     BTC_VOL_STATS_KEY,
     BTC_VOL_UPDATE_INTERVAL,
     BTC_VOL_LOCK_TTL,
@@ -106,17 +106,8 @@ def update_btc_volume():
         # ===================
         # Live mempool volume
         # ===================
-        raw = r.hgetall(BTC_TOP_SEEN_VALUE_KEY)
-        mempool_volume = 0.0
-        mempool_tx_count = 0
-
-        if raw:
-            for v in raw.values():
-                if isinstance(v, bytes):
-                    v = v.decode()
-                entry = json.loads(v)
-                mempool_volume += float(entry.get("btc_value", 0.0))
-            mempool_tx_count = len(raw)
+        # laufende Summen von btc_top (O(1) statt HGETALL über den ganzen Mempool)
+        mempool_tx_count, mempool_volume = seen_totals.read(r)
 
         # =========================
         # Rolling volumes (metrics)
@@ -37,6 +37,7 @@ from core.redis_keys import (
 
     BLOCKCHAIN_GETBLOCKCHAININFO_KEY,
     BLOCKCHAIN_LATEST_BLOCK_KEY,
+    BLOCKCHAIN_LATEST_BLOCK_TXIDS_KEY,
     BLOCKCHAIN_STATIC_KEY,
     BLOCKCHAIN_LOCK_KEY,
 
@@ -55,7 +56,11 @@ from core.redis_keys import (
     BLOCKCHAIN_DYNAMIC_UPDATE_INTERVAL,
     BLOCKCHAIN_STATIC_UPDATE_INTERVAL,
     BLOCKCHAIN_LOCK_TTL_SECONDS,
+    BLOCKCHAIN_BLOCK_WAIT_TIMEOUT_MS,
+    BLOCKCHAIN_INPUT_FALLBACK_INTERVAL,
 )
+from core.block_events import NewBlockListener, last_block_event
+from core.composite_publish import publish_composite
 
 # ================================
 # 🧰 Helpers
@@ -117,11 +122,26 @@ def release_lock() -> None:
 _LAST_BLOCK_HASH = None
 _BLOCK_SEEN_TS = int(time.time())
 
+# 🔄 STATE (New-Block-Listener): weckt die Main-Loop sofort, Block-Alter ab Ankunft
+_NEW_BLOCK = threading.Event()
+_BLOCK_LISTENER = None
+
+# 🔄 STATE (Block-Ingest): zuletzt nach Redis geschriebener Block
+_INGESTED_BLOCK_HASH = None
+
+# 🔄 STATE (In-Memory-Input): Dynamic-Teile werden daraus berechnet, nicht aus Redis zurückgelesen
+_CHAIN_INFO = None
+_LATEST_BLOCK = None
+
+# getblockstats: nur die Felder für die Block-Summary
+BLOCKSTATS_FIELDS = ["totalfee", "avgfeerate", "medianfee", "feerate_percentiles", "subsidy", "total_out"]
+
 
 # =================================================
 # 🛑 INPUT UPDATE (RPC → Redis)
 # =================================================
 def update_blockchain_input():
+    global _CHAIN_INFO
     t_start = time.time()
 
     # ---------------------------------------------
@@ -129,51 +149,109 @@ def update_blockchain_input():
     # ---------------------------------------------
     chain_info = RPC.call("getblockchaininfo") or {}
     r.set(BLOCKCHAIN_GETBLOCKCHAININFO_KEY, json.dumps(chain_info))
+    _CHAIN_INFO = chain_info
 
     # ---------------------------------------------
-    # 📦 Letzten Block vollständig speichern
-    #     (IMMER derselbe Key!)
+    # 📦 Letzten Block nur bei neuem bestblockhash holen
+    #     (~alle 600 s statt jede Sekunde)
     # ---------------------------------------------
     bestblockhash = chain_info.get("bestblockhash")
-    if bestblockhash:
+    block_fetched = False
+    if bestblockhash and bestblockhash != _ingested_block_hash():
         try:
-            block_data = RPC.call("getblock", [bestblockhash]) or {}
-            r.set(
-                BLOCKCHAIN_LATEST_BLOCK_KEY,
-                json.dumps({
-                    "hash": bestblockhash,
-                    "height": chain_info.get("blocks", 0),
-                    "tx": block_data.get("tx", [])
-                })
-            )
+            ingest_block(bestblockhash)
+            block_fetched = True
         except Exception as e:
-            print(f"[BLOCKCHAIN INPUT ERROR] getblock failed: {e}")
+            print(f"[BLOCKCHAIN INPUT ERROR] block ingest failed: {e}")
 
     elapsed_ms = int((time.time() - t_start) * 1000)
 
     return {
         "scan_time_ms": elapsed_ms,
         "block_height": chain_info.get("blocks", 0),
+        "block_fetched": block_fetched,
     }
 
 
+def _ingested_block_hash():
+    """Hash des zuletzt geschriebenen Blocks; nach Neustart aus dem Summary-Key, nach Redis-Flush None."""
+    global _INGESTED_BLOCK_HASH
+    if _INGESTED_BLOCK_HASH is None or not r.exists(BLOCKCHAIN_LATEST_BLOCK_KEY):
+        _INGESTED_BLOCK_HASH = _json_loads_safe(r.get(BLOCKCHAIN_LATEST_BLOCK_KEY), default={}).get("hash")
+    return _INGESTED_BLOCK_HASH
+
+
+def ingest_block(blockhash: str) -> dict:
+    """
+    getblock (verbosity 1) + getblockstats in einem JSON-RPC-Batch →
+    kompakte Summary (BLOCKCHAIN_LATEST_BLOCK_KEY) + txid-Liste (BLOCKCHAIN_LATEST_BLOCK_TXIDS_KEY).
+    """
+    global _INGESTED_BLOCK_HASH, _LATEST_BLOCK
+
+    block_reply, stats_reply = RPC.call_batch([
+        ("getblock", [blockhash, 1]),
+        ("getblockstats", [blockhash, BLOCKSTATS_FIELDS]),
+    ])
+    if block_reply["error"] or not block_reply["result"]:
+        raise RuntimeError(f"getblock {blockhash}: {block_reply['error']}")
+
+    block = block_reply["result"]
+    stats = stats_reply["result"] or {}
+    if stats_reply["error"]:
+        # z. B. gepruned / ältere Node → Summary ohne Fee-Felder
+        print(f"[BLOCKCHAIN INPUT] getblockstats failed: {stats_reply['error']}")
+
+    txids = block.get("tx", [])
+    summary = {
+        "hash": blockhash,
+        "height": block.get("height", 0),
+        "time": block.get("time", 0),
+        "mediantime": block.get("mediantime", 0),
+        "nTx": block.get("nTx", len(txids)),
+        "size": block.get("size", 0),
+        "weight": block.get("weight", 0),
+        "totalfee": stats.get("totalfee"),
+        "avgfeerate": stats.get("avgfeerate"),
+        "medianfee": stats.get("medianfee"),
+        "feerate_percentiles": stats.get("feerate_percentiles"),
+        "subsidy": stats.get("subsidy"),
+        "total_out": stats.get("total_out"),
+        "ingested_at": int(time.time()),
+    }
+
+    pipe = r.pipeline(transaction=True)
+    pipe.set(BLOCKCHAIN_LATEST_BLOCK_TXIDS_KEY, json.dumps({
+        "hash": blockhash,
+        "height": summary["height"],
+        "tx": txids,
+    }, separators=(",", ":")))
+    pipe.set(BLOCKCHAIN_LATEST_BLOCK_KEY, json.dumps(summary))
+    pipe.execute()
+
+    _INGESTED_BLOCK_HASH = blockhash
+    _LATEST_BLOCK = summary
+    print(f"[BLOCKCHAIN INPUT] Block {summary['height']} ingested (nTx={summary['nTx']})")
+    return summary
+
+
 
 # =================================================
 # 📦 STATIC UPDATE (aus Redis-Input, fallback RPC)
 # =================================================
-def update_blockchain_static():
+def update_blockchain_static(chain_info=None):
     """
     Erstellt und persistiert statische Blockchain-Metadaten.
     - Kein TTL (State ≠ Cache)
-    - Fallback auf RPC, falls Redis leer ist
+    - Input: In-Memory (Main-Loop), sonst Redis, fallback RPC
     - Robust gegen fehlerhafte / leere Daten
     """
 
     # -------------------------------------------------
-    # 🔎 Input: bevorzugt Redis, fallback RPC
+    # 🔎 Input: bevorzugt In-Memory / Redis, fallback RPC
     # -------------------------------------------------
-    chain_info_raw = r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY)
-    chain_info = _json_loads_safe(chain_info_raw, default={})
+    if not chain_info:
+        chain_info_raw = r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY)
+        chain_info = _json_loads_safe(chain_info_raw, default={})
 
     if not chain_info:
         try:
@@ -219,17 +297,25 @@ def update_blockchain_static():
         print(f"[BLOCKCHAIN STATIC ERROR] Redis write failed: {e}")
 
 
+# =================================================
+# 🔸 INPUT (In-Memory, Redis nur nach Neustart)
+# =================================================
+def current_inputs():
+    """(chain_info, latest_block) aus dem Speicher; nach Neustart einmalig aus Redis."""
+    global _CHAIN_INFO, _LATEST_BLOCK
+    if _CHAIN_INFO is None:
+        _CHAIN_INFO = _json_loads_safe(r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY), default={}) or None
+    if _LATEST_BLOCK is None:
+        _LATEST_BLOCK = _json_loads_safe(r.get(BLOCKCHAIN_LATEST_BLOCK_KEY), default={}) or None
+    return _CHAIN_INFO or {}, _LATEST_BLOCK or {}
+
+
 # =================================================
 # 🔸 DYNAMIC 1: Block Info + Age
 # =================================================
-def update_block_info():
+def build_block_info(chain_info: dict, block: dict) -> dict:
     global _LAST_BLOCK_HASH, _BLOCK_SEEN_TS
 
-    chain_info = _json_loads_safe(
-        r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY),
-        default={}
-    )
-
     current_block_height = chain_info.get("blocks", 0)
     bestblockhash = chain_info.get("bestblockhash")
 
@@ -239,96 +325,102 @@ def update_block_info():
         print("[BLOCK_AGE] Neuer Block erkannt → Timer reset")
 
     # ---------------------------------------------
-    # 📦 TX-Count aus dem *einen* Block-Key
+    # 📦 TX-Count aus der Block-Summary (nTx)
     # ---------------------------------------------
     tx_count = 0
-    block = _json_loads_safe(
-        r.get(BLOCKCHAIN_LATEST_BLOCK_KEY),
-        default={}
-    )
-
     if block.get("hash") == bestblockhash:
-        tx_count = len(block.get("tx", []))
+        tx_count = block.get("nTx", 0)
 
     elapsed = int(time.time()) - _BLOCK_SEEN_TS
     minutes, seconds = divmod(max(0, elapsed), 60)
     block_age_str = f"{minutes} minutes, {seconds} seconds"
 
-    r.set(
-        BLOCKCHAIN_DYNAMIC_BLOCKINFO_KEY,
-        json.dumps({
-            "current_block_height": current_block_height,
-            "tx_count": tx_count,
-            "block_age_str": block_age_str,
-        })
-    )
+    return {
+        "current_block_height": current_block_height,
+        "tx_count": tx_count,
+        "block_age_str": block_age_str,
+    }
 
 
 # =================================================
 # 🔸 DYNAMIC 2: Hashrate
 # =================================================
-def update_hashrate():
-    chain_info = _json_loads_safe(r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY), default={})
-
+def build_hashrate(chain_info: dict) -> dict:
     difficulty = chain_info.get("difficulty", 0) or 0
     hash_rate = (difficulty * (2 ** 32)) / BLOCK_TIME_SECONDS if difficulty else 0
 
     average_hash_rate = f"{hash_rate / 1e18:.2f} EH/s" if hash_rate else "No data"
 
-    r.set(BLOCKCHAIN_DYNAMIC_HASHRATE_KEY, json.dumps({
-        "average_hash_rate": average_hash_rate
-    }))
+    return {"average_hash_rate": average_hash_rate}
 
 
 # =================================================
 # 🔸 DYNAMIC 3: Halving Countdown
 # =================================================
-def update_halving():
-    chain_info = _json_loads_safe(r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY), default={})
-
+def build_halving(chain_info: dict) -> dict:
     current_block_height = chain_info.get("blocks", 0)
     remaining_blocks = max(0, HALVING_INTERVAL - (current_block_height - LAST_HALVING_BLOCK))
     remaining_seconds = remaining_blocks * BLOCK_TIME_SECONDS
 
-    r.set(BLOCKCHAIN_DYNAMIC_HALVING_KEY, json.dumps({
+    return {
         "remaining_blocks": remaining_blocks,
         "remaining_seconds": remaining_seconds
-    }))
+    }
 
 
 # =================================================
 # 🔸 DYNAMIC 4: Winner Hash
 # =================================================
-def update_winnerhash():
-    chain_info = _json_loads_safe(r.get(BLOCKCHAIN_GETBLOCKCHAININFO_KEY), default={})
-
-    winner_hash = chain_info.get("bestblockhash", "—")
-    block_height = chain_info.get("blocks", 0)
-
-    r.set(BLOCKCHAIN_DYNAMIC_WINNERHASH_KEY, json.dumps({
-        "winner_hash": winner_hash,
-        "block_height": block_height
-    }))
+def build_winnerhash(chain_info: dict) -> dict:
+    return {
+        "winner_hash": chain_info.get("bestblockhash", "—"),
+        "block_height": chain_info.get("blocks", 0)
+    }
 
 
 # =================================================
-# 🔸 AGGREGATOR
+# 🔸 PUBLISH (Subkeys + DYNAMIC_CACHE, ein MULTI)
 # =================================================
-def aggregate_blockchain_dynamic():
-    combined = {}
+def update_blockchain_dynamic() -> dict:
+    chain_info, block = current_inputs()
+    if not chain_info:
+        return {}
+
+    return publish_composite(r, {
+        BLOCKCHAIN_DYNAMIC_BLOCKINFO_KEY: build_block_info(chain_info, block),
+        BLOCKCHAIN_DYNAMIC_HASHRATE_KEY: build_hashrate(chain_info),
+        BLOCKCHAIN_DYNAMIC_HALVING_KEY: build_halving(chain_info),
+        BLOCKCHAIN_DYNAMIC_WINNERHASH_KEY: build_winnerhash(chain_info),
+    }, combined_key=BLOCKCHAIN_DYNAMIC_CACHE)
 
-    for key in (
-        BLOCKCHAIN_DYNAMIC_BLOCKINFO_KEY,
-        BLOCKCHAIN_DYNAMIC_HASHRATE_KEY,
-        BLOCKCHAIN_DYNAMIC_HALVING_KEY,
-        BLOCKCHAIN_DYNAMIC_WINNERHASH_KEY,
-    ):
-        raw = r.get(key)
-        if raw:
-            combined.update(_json_loads_safe(raw, default={}))
 
-    if combined:
-        r.set(BLOCKCHAIN_DYNAMIC_CACHE, json.dumps(combined))
+# =================================================
+# ⛓️ NEW-BLOCK-LISTENER (waitfornewblock → Pub/Sub)
+# =================================================
+def _on_new_block(event: dict) -> None:
+    """Listener-Thread: Block-Alter ab Ankunft setzen, Main-Loop wecken."""
+    global _LAST_BLOCK_HASH, _BLOCK_SEEN_TS
+    _LAST_BLOCK_HASH = event.get("hash")
+    _BLOCK_SEEN_TS = int(event.get("seen_ts") or time.time())
+    _NEW_BLOCK.set()
+
+
+def ensure_block_listener() -> bool:
+    """Listener starten / nach Absturz neu starten. Returns True, wenn er gesund ist (→ kein 1 s-Polling)."""
+    global _BLOCK_LISTENER, _LAST_BLOCK_HASH, _BLOCK_SEEN_TS
+    if _BLOCK_LISTENER is None:
+        # Neustart: Block-Alter ab dem letzten Event weiterzählen statt ab Prozessstart
+        event = last_block_event(r)
+        if event.get("hash"):
+            _LAST_BLOCK_HASH = event["hash"]
+            _BLOCK_SEEN_TS = int(event.get("seen_ts") or _BLOCK_SEEN_TS)
+
+    if _BLOCK_LISTENER is None or not _BLOCK_LISTENER.is_alive():
+        _BLOCK_LISTENER = NewBlockListener(
+            RPC, r, timeout_ms=BLOCKCHAIN_BLOCK_WAIT_TIMEOUT_MS, on_block=_on_new_block
+        )
+        _BLOCK_LISTENER.start()
+    return _BLOCK_LISTENER.healthy
 
 
 # =================================================
@@ -348,17 +440,25 @@ def blockchain_worker_loop():
     print("[BLOCKCHAIN WORKER] Lock erhalten")
 
     next_static_ts = 0.0
+    next_input_ts = 0.0
 
     while True:
         loop_start = time.time()
+        input_stats = {}
 
         try:
             renew_lock()
 
             # -----------------------------------------
             # 🔎 INPUT (RPC → Redis)
+            #     Listener gesund → nur bei neuem Block (+ Fallback-Intervall),
+            #     sonst wie bisher jede Sekunde
             # -----------------------------------------
-            input_stats = update_blockchain_input()
+            listener_ok = ensure_block_listener()
+            if _NEW_BLOCK.is_set() or not listener_ok or loop_start >= next_input_ts:
+                _NEW_BLOCK.clear()
+                input_stats = update_blockchain_input()
+                next_input_ts = loop_start + BLOCKCHAIN_INPUT_FALLBACK_INTERVAL
             # erwartet:
             # {
             #   "scan_time_ms": int,
@@ -368,23 +468,18 @@ def blockchain_worker_loop():
             # -----------------------------------------
             # ⚙️ DYNAMIC UPDATES
             # -----------------------------------------
-            update_block_info()
-            update_hashrate()
-            update_halving()
-            update_winnerhash()
-            aggregate_blockchain_dynamic()
+            update_blockchain_dynamic()
 
             # -----------------------------------------
             # 📦 STATIC (periodisch)
             # -----------------------------------------
             now = time.time()
             if now >= next_static_ts:
-                update_blockchain_static()
+                update_blockchain_static(_CHAIN_INFO)
                 next_static_ts = now + BLOCKCHAIN_STATIC_UPDATE_INTERVAL
 
         except Exception as e:
             print(f"[BLOCKCHAIN WORKER ERROR] {e}")
-            input_stats = {}
 
         # -----------------------------------------
         # 🧮 TIMING
@@ -398,16 +493,19 @@ def blockchain_worker_loop():
         # -----------------------------------------
         # 📊 MONITORING (BTC_TOP-Style)
         # -----------------------------------------
-        scan_ms = input_stats.get("scan_time_ms", "?")
-        height = input_stats.get("block_height", "?")
+        scan_ms = input_stats.get("scan_time_ms", "-")
+        height = input_stats.get("block_height", "-")
+        block = "new" if input_stats.get("block_fetched") else "cached"
 
         print(
             f"[BLOCKCHAIN WORKER] "
             f"rpc={RPC.info()} | "
             f"height={height} | "
+            f"block={block} | "
             f"scan={scan_ms}ms | "
             f"sleep={sleep_time:.3f}s"
         )
 
-        time.sleep(sleep_time)
+        # Neuer Block → sofort weiter (Block-Alter, Input)
+        _NEW_BLOCK.wait(sleep_time)
 
@@ -9,6 +9,9 @@ import redis
 from nodes.config import NODE_CONFIG
 from nodes.rpc import BitcoinRPC
 
+from core import seen_totals
+from core.block_events import BlockSubscriber
+from core.composite_publish import publish_composite
 from core.redis_keys import (
     # Core
     MEMPOOL_GETMEMPOOLINFO,
@@ -21,8 +24,9 @@ from core.redis_keys import (
     MEMPOOL_DYNAMIC_AVGTX_KEY,
     MEMPOOL_DYNAMIC_WAITTIME_KEY,
 
-    # External dependency
-    BTC_TOP_SEEN_VALUE_KEY,
+    # Projected Blocks (btc_top)
+    MEMPOOL_PROJECTED_BLOCKS_KEY,
+    MEMPOOL_PROJECTED_BLOCKS_MAX_AGE,
 
     # Intervals
     MEMPOOL_DYNAMIC_UPDATE_INTERVAL,
@@ -45,6 +49,9 @@ r = redis.Redis(
     decode_responses=False
 )
 
+# Neuer Block → Mempool sofort neu lesen statt bis zum nächsten Intervall zu warten
+BLOCKS = BlockSubscriber(r)
+
 # ============================================
 # 🧰 Helpers
 # ============================================
@@ -59,17 +66,17 @@ def _json_load(raw, default=None):
         return default or {}
 
 # ============================================
-# 🔸 INPUT (RPC → Redis)
+# 🔸 INPUT (RPC → In-Memory)
 # ============================================
-def update_mempool_input():
+def fetch_mempool_input():
+    """getmempoolinfo → (info, stats). Geschrieben wird erst in update_mempool_dynamic()."""
     t_start = time.time()
 
     info = RPC.call("getmempoolinfo") or {}
-    r.set(MEMPOOL_GETMEMPOOLINFO, json.dumps(info))
 
     elapsed_ms = int((time.time() - t_start) * 1000)
 
-    return {
+    return info, {
         "scan_time_ms": elapsed_ms,
         "mempool_size": info.get("size", 0),
     }
@@ -77,8 +84,9 @@ def update_mempool_input():
 # ============================================
 # 🔸 STATIC
 # ============================================
-def update_mempool_static():
-    info = _json_load(r.get(MEMPOOL_GETMEMPOOLINFO))
+def update_mempool_static(info=None):
+    if not info:
+        info = _json_load(r.get(MEMPOOL_GETMEMPOOLINFO))
 
     # mempoolminfee kommt als BTC / kvB → umrechnen auf sat / vByte
     min_fee_sat = info.get("mempoolminfee", 0) * 100_000_000 / 1000
@@ -94,9 +102,7 @@ def update_mempool_static():
 # ============================================
 # 🔸 SIZE + FEE
 # ============================================
-def update_mempool_size_fee():
-    info = _json_load(r.get(MEMPOOL_GETMEMPOOLINFO))
-
+def build_size_fee(info: dict) -> dict:
     size = info.get("size", 0)
     total_fee_btc = info.get("total_fee", 0)
     total_bytes = max(info.get("bytes", 1), 1)
@@ -104,73 +110,73 @@ def update_mempool_size_fee():
     # Ø Fee Rate im Mempool: sat / vByte (≈ sat / Byte auf Aggregatebene)
     avg_fee_sat = (total_fee_btc * 100_000_000) / total_bytes
 
-    r.set(
-        MEMPOOL_DYNAMIC_SIZEFEE_KEY,
-        json.dumps({
-            "timestamp_ms": int(time.time() * 1000),
-            "mempool_size": size,
-            "avg_fee_sat": avg_fee_sat,   # jetzt sat/vB
-            "total_fee": total_fee_btc,
-        })
-    )
+    return {
+        "timestamp_ms": int(time.time() * 1000),
+        "mempool_size": size,
+        "avg_fee_sat": avg_fee_sat,   # jetzt sat/vB
+        "total_fee": total_fee_btc,
+    }
 
 
 # ============================================
 # 🔸 AVG TX VALUE
 # ============================================
-def update_mempool_avg_tx():
-    seen_values = r.hvals(BTC_TOP_SEEN_VALUE_KEY)
-    total_volume = 0.0
-
-    for v in seen_values:
-        if isinstance(v, bytes):
-            v = v.decode()
-        total_volume += float(json.loads(v).get("btc_value", 0.0))
+def build_avg_tx(info: dict) -> dict:
+    # laufende Summe von btc_top (BTC_TOP_SEEN_TOTALS_KEY) statt HVALS über den ganzen Mempool
+    _, total_volume = seen_totals.read(r)
 
-    info = _json_load(r.get(MEMPOOL_GETMEMPOOLINFO))
     size = info.get("size", 0)
-
     avg_tx = total_volume / size if size > 0 else 0.0
 
-    r.set(
-        MEMPOOL_DYNAMIC_AVGTX_KEY,
-        json.dumps({"mempool_avg_tx": avg_tx})
-    )
+    return {"mempool_avg_tx": avg_tx}
 
 # ============================================
 # 🔸 WAIT TIME
 # ============================================
-def update_mempool_waittime():
-    info = _json_load(r.get(MEMPOOL_GETMEMPOOLINFO))
+def load_projection() -> dict:
+    """Projected Blocks von btc_top, {} wenn fehlend / älter als MEMPOOL_PROJECTED_BLOCKS_MAX_AGE."""
+    proj = _json_load(r.get(MEMPOOL_PROJECTED_BLOCKS_KEY))
+    if not proj or time.time() - proj.get("computed_at", 0) > MEMPOOL_PROJECTED_BLOCKS_MAX_AGE:
+        return {}
+    return proj
+
+
+def build_waittime(info: dict, projection: dict = None) -> dict:
     size = info.get("size", 0)
 
-    estimated_blocks = size / 3000
+    if projection:
+        # Blöcke bis der aktuelle Mempool abgearbeitet ist (nach Weight, nicht TX-Anzahl)
+        estimated_blocks = projection.get("total_blocks", 0)
+        next_block = (projection.get("blocks") or [{}])[0]
+        source = "projected"
+    else:
+        estimated_blocks = size / 3000
+        next_block = {}
+        source = "estimate"
+
     total_seconds = int(estimated_blocks * 600)
     minutes, seconds = divmod(total_seconds, 60)
 
-    r.set(
-        MEMPOOL_DYNAMIC_WAITTIME_KEY,
-        json.dumps({
-            "average_wait_time": f"{minutes} minutes and {seconds} seconds",
-            "mempool_size": size,
-        })
-    )
+    return {
+        "average_wait_time": f"{minutes} minutes and {seconds} seconds",
+        "mempool_size": size,
+        "wait_source": source,
+        "projected_blocks": estimated_blocks if projection else None,
+        "next_block_median_feerate": next_block.get("median_feerate"),
+        "next_block_min_feerate": next_block.get("min_feerate"),
+    }
 
 # ============================================
-# 🔸 AGGREGATOR
+# 🔸 PUBLISH (Input + Subkeys + DYNAMIC_CACHE, ein MULTI)
 # ============================================
-def aggregate_mempool_dynamic():
-    combined = {}
-
-    for key in (
-        MEMPOOL_DYNAMIC_SIZEFEE_KEY,
-        MEMPOOL_DYNAMIC_AVGTX_KEY,
-        MEMPOOL_DYNAMIC_WAITTIME_KEY,
-    ):
-        combined.update(_json_load(r.get(key)))
-
-    if combined:
-        r.set(MEMPOOL_DYNAMIC_CACHE, json.dumps(combined))
+def update_mempool_dynamic(info: dict) -> dict:
+    return publish_composite(r, {
+        MEMPOOL_DYNAMIC_SIZEFEE_KEY: build_size_fee(info),
+        MEMPOOL_DYNAMIC_AVGTX_KEY: build_avg_tx(info),
+        MEMPOOL_DYNAMIC_WAITTIME_KEY: build_waittime(info, load_projection()),
+    }, combined_key=MEMPOOL_DYNAMIC_CACHE, extra={
+        MEMPOOL_GETMEMPOOLINFO: json.dumps(info),
+    })
 
 # ============================================
 # 🔁 MAIN LOOP (PROCESS)
@@ -185,16 +191,12 @@ def mempool_worker_loop():
         loop_start = time.time()
 
         try:
-            input_stats = update_mempool_input()
-
-            update_mempool_size_fee()
-            update_mempool_avg_tx()
-            update_mempool_waittime()
-            aggregate_mempool_dynamic()
+            info, input_stats = fetch_mempool_input()
+            update_mempool_dynamic(info)
 
             now = time.time()
             if now >= next_static_ts:
-                update_mempool_static()
+                update_mempool_static(info)
                 next_static_ts = now + MEMPOOL_STATIC_UPDATE_INTERVAL
 
         except Exception as e:
@@ -225,7 +227,7 @@ def mempool_worker_loop():
             f"sleep={sleep_time:.3f}s"
         )
 
-        time.sleep(sleep_time)
+        BLOCKS.wait(sleep_time)
 
 # ============================================
 # ▶️ PROCESS ENTRYPOINT
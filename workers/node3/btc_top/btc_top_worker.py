@@ -3,17 +3,40 @@ import json
 import time
 import threading
 import redis
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from core.redis_keys import (
-    BTC_TOP_SEEN_KEY,
     BTC_TOP_TXS_KEY,
     BTC_TOP_STATS_KEY,
     BTC_TOP_LOCK_KEY,
-    BTC_TOP_SEEN_VALUE_KEY,
     BTC_TOP_UPDATE_INTERVAL,
     BTC_TOP_TOP_N,
     BTC_TOP_LOCK_TTL,
+    BTC_TOP_RPC_BATCH_SIZE,
+    BTC_TOP_FETCH_WORKERS,
+    BTC_TOP_FETCH_BUDGET,
+    BTC_TOP_SEEN_TOTALS_RECONCILE_INTERVAL,
+    BTC_TOP_INGEST_MODE,
+    BTC_TOP_ZMQ_RECONCILE_INTERVAL,
+    BTC_TOP_ZMQ_RAW_CACHE_MAX,
+    BTC_TOP_SEEN_INDEX_SNAPSHOT_PATH,
+    BTC_TOP_SEEN_SNAPSHOT_INTERVAL,
+    BTC_TOP_BOOTSTRAP_FETCH_WORKERS,
+    BTC_TOP_BOOTSTRAP_BUDGET,
+    BTC_TOP_PRIORITY_AGING_VB_PER_S,
+    BTC_TOP_PRIORITY_AGING_MAX_VB,
+    MEMPOOL_PROJECTED_BLOCKS_KEY,
+    MEMPOOL_PROJECTED_BLOCKS_COUNT,
 )
+from core.tx_event_stream import xadd_event
+from core import txid_history_binary
+from core.top_n import TopN
+from core import seen_index
+from core import rawtx
+from core import zmq_mempool
+from core.candidate_queue import CandidateQueue, percentiles
+from core.block_events import BlockSubscriber
+from core import projected_blocks
 
 
 r = redis.Redis(
@@ -23,6 +46,9 @@ r = redis.Redis(
     decode_responses=False
 )
 
+# Neuer Block → sofort neu scannen (bestätigte TXs raus, Top-Liste aktualisieren)
+BLOCKS = BlockSubscriber(r)
+
 # ================================
 # 🛡️ HARD GUARD: NODE3 ONLY
 # ================================
@@ -38,6 +64,7 @@ print(f"[BTC_TOP] Module imported, RPC={RPC.url}")
 # ================================
 
 # 🔥 RAM-Disk: TXID-History (nur temporär, wird von Storage gesichert)
+#    JSONL + .bin (core/txid_history_binary.py); ältere JSONL räumt der Storage-Worker ab
 TXID_HISTORY_DIR = "/raid/data/ramdisk_bitcoin_dashboard/txid_history"
 
 # 💾 Persistente History: BTC Top 50 Ever
@@ -58,12 +85,36 @@ os.makedirs(os.path.dirname(BTC_TOP_50_EVER_PATH), exist_ok=True)
 
 
 _LAST_PRUNE_TS = 0
+
+# max. txids pro Seen-Index-Scriptaufruf in den Pipelines
+SEEN_PIPE_CHUNK = 5000
+
+_LAST_TOTALS_RECONCILE_TS = 0
+
+# Fetch-Stage: fester Thread-Pool für getrawtransaction-Batches
+_FETCH_POOL = ThreadPoolExecutor(
+    max_workers=max(BTC_TOP_FETCH_WORKERS, BTC_TOP_BOOTSTRAP_FETCH_WORKERS),
+    thread_name_prefix="btc_top_fetch",
+)
+
+# Kandidaten, die im letzten Zyklus nicht mehr ins Zeitbudget gepasst haben (ZMQ: erneut in die Queue)
+# txid → ts des ersten Einreihens (Basis für das Aging in der Candidate-Queue)
+_CARRY_OVER = {}
+
+# ZMQ-Ingest: Listener-Thread + Mempool-Sicht aus Events (+ periodischer Abgleich)
+_ZMQ_LISTENER = None
+_ZMQ_MEMPOOL = set()
+_ZMQ_LAST_RECONCILE_TS = 0
+
+# Kaltstart (Seen-Index leer): Restore von Disk + Delta-Fetch über mehrere Zyklen, Fortschritt in BTC_TOP_STATS_KEY
+_BOOTSTRAP = None
+_LAST_SEEN_SNAPSHOT_TS = time.time()   # erster Snapshot erst nach einem Intervall (nicht den alten überschreiben)
 # =========================
 # 🧹 RAM-Disk Pruning
 # =========================
 def prune_ramdisk_history(max_age_days: int = 10):
     """
-    Löscht JSONL-Dateien in der RAM-Disk (TXID_HISTORY_DIR),
+    Löscht JSONL- und Binär-Dateien in der RAM-Disk (TXID_HISTORY_DIR),
     die älter sind als max_age_days.
 
     Ziel: RAM-Disk dauerhaft klein halten (nur letzte X Tage),
@@ -74,7 +125,7 @@ def prune_ramdisk_history(max_age_days: int = 10):
 
     try:
         for fname in os.listdir(TXID_HISTORY_DIR):
-            if not fname.endswith(".jsonl"):
+            if not fname.endswith((".jsonl", ".bin")):
                 continue
 
             fpath = os.path.join(TXID_HISTORY_DIR, fname)
@@ -98,26 +149,223 @@ def prune_ramdisk_history(max_age_days: int = 10):
 # =========================
 # 🛑 Top-BTC Worker – Logik
 # =========================
+# Top50-Ever lebt im Prozess (einmal von Disk geladen), Redis (BTC_TOP_TXS_KEY) ist die Quelle für die API
+_TOP50_EVER = None
+_TOP50_EVER_PERSISTED = None   # zuletzt auf Disk geschriebener Stand
+
+
+def load_top50_ever():
+    """Top50-Ever einmalig von Disk laden (Worker-Start)."""
+    global _TOP50_EVER, _TOP50_EVER_PERSISTED
+
+    try:
+        with open(BTC_TOP_50_EVER_PATH, "r") as f:
+            data = json.load(f)
+    except Exception:
+        data = []
+
+    _TOP50_EVER = TopN(BTC_TOP_TOP_N)
+    _TOP50_EVER.extend(sorted(data, key=lambda x: x["btc_value"], reverse=True))
+    _TOP50_EVER_PERSISTED = _TOP50_EVER.items()
+    print(f"[BTC_TOP] Top50-Ever geladen ({len(_TOP50_EVER)} Einträge)")
+    return _TOP50_EVER
+
+
 def save_top50_ever_if_changed(top50_ever):
-    existing_data = []
-    if os.path.exists(BTC_TOP_50_EVER_PATH):
-        try:
-            with open(BTC_TOP_50_EVER_PATH, "r") as f:
-                existing_data = json.load(f)
-        except Exception:
-            existing_data = []
+    """Nur bei Änderung schreiben, atomar per tmp + os.replace."""
+    global _TOP50_EVER_PERSISTED
 
-    if existing_data != top50_ever:
-        try:
-            with open(BTC_TOP_50_EVER_PATH, "w") as f:
-                json.dump(top50_ever, f, indent=4)
-            print(f"[INFO] {BTC_TOP_50_EVER_PATH} aktualisiert ({len(top50_ever)} Einträge)")
-        except Exception as e:
-            print(f"[ERROR] Fehler beim Schreiben von {BTC_TOP_50_EVER_PATH}: {e}")
+    if top50_ever == _TOP50_EVER_PERSISTED:
+        return
+
+    tmp_path = f"{BTC_TOP_50_EVER_PATH}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(top50_ever, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, BTC_TOP_50_EVER_PATH)
+        _TOP50_EVER_PERSISTED = top50_ever
+        print(f"[INFO] {BTC_TOP_50_EVER_PATH} aktualisiert ({len(top50_ever)} Einträge)")
+    except Exception as e:
+        print(f"[ERROR] Fehler beim Schreiben von {BTC_TOP_50_EVER_PATH}: {e}")
+
+
+def _fetch_chunk_poll(chunk):
+    """Poll-Modus: info kommt aus getrawmempool true → nur getrawtransaction (raw hex → core.rawtx)."""
+    replies = RPC.call_batch(
+        [("getrawtransaction", [txid, False]) for txid, _ in chunk],
+        BTC_TOP_RPC_BATCH_SIZE,
+    )
+    return [(txid, info, reply) for (txid, info), reply in zip(chunk, replies)]
+
+
+def _fetch_chunk_zmq(raw_cache, chunk):
+    """
+    ZMQ-Modus: getmempoolentry (Fees) für alle, getrawtransaction nur für TXs,
+    deren rawtx-Event (noch) fehlt – alles in einem Batch.
+    """
+    calls = [("getmempoolentry", [txid]) for txid, _ in chunk]
+    missing = [txid for txid, _ in chunk if txid not in raw_cache]
+    calls += [("getrawtransaction", [txid, False]) for txid in missing]
+
+    replies = RPC.call_batch(calls, len(calls))
+    entries = replies[:len(chunk)]
+    raw_replies = dict(zip(missing, replies[len(chunk):]))
+
+    out = []
+    for (txid, _), entry in zip(chunk, entries):
+        if entry["error"] or not entry["result"]:
+            out.append((txid, None, entry))          # nicht mehr im Mempool
+            continue
+        reply = raw_replies.get(txid) or {"result": raw_cache[txid], "error": None}
+        out.append((txid, entry["result"], reply))
+    return out
+
+
+def fetch_candidates(queue, deadline, carry, fetch_chunk=_fetch_chunk_poll,
+                     workers=BTC_TOP_FETCH_WORKERS, heartbeat=None):
+    """
+    Holt Kandidaten aus queue (CandidateQueue, höchster Score zuerst) in JSON-RPC-Batches
+    über fetch_chunk, bis zu workers Batches parallel. Yields (txid, info, reply) im Haupt-Thread.
+
+    Nach deadline (time.time()) werden keine neuen Batches mehr gestartet; laufende
+    werden noch eingesammelt. Nicht geholte / fehlgeschlagene Kandidaten landen in carry.
+    heartbeat() wird nach jedem fertigen Batch aufgerufen (Lock verlängern).
+    """
+    in_flight = {}
+
+    while len(queue) or in_flight:
+        while len(queue) and len(in_flight) < workers and time.time() < deadline:
+            chunk = queue.pop_chunk(BTC_TOP_RPC_BATCH_SIZE)
+            in_flight[_FETCH_POOL.submit(fetch_chunk, chunk)] = chunk
+
+        if not in_flight:
+            break
+
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        if heartbeat is not None:
+            heartbeat()
+        for fut in done:
+            chunk = in_flight.pop(fut)
+            try:
+                results = fut.result()
+            except Exception as e:
+                print(f"[BTC_TOP] batch fetch failed ({len(chunk)} TXs): {e}")
+                carry.extend(txid for txid, _ in chunk)
+                continue
+
+            yield from results
+
+    carry.extend(queue.drain())
+
+
+# =========================
+# 📡 ZMQ-Ingest
+# =========================
+def ingest_mode() -> str:
+    """BTC_TOP_INGEST_MODE, fällt ohne pyzmq / ZMQ-Endpoints auf "poll" zurück."""
+    if BTC_TOP_INGEST_MODE != "zmq":
+        return "poll"
+    if not zmq_mempool.available():
+        return "poll"
+    cfg = NODE_CONFIG["node3"]
+    if not cfg.get("zmq_rawtx") or not cfg.get("zmq_sequence"):
+        return "poll"
+    return "zmq"
+
+
+def zmq_ingest():
+    """
+    Mempool-Delta aus dem ZMQ-Listener.
+    Returns (mempool_txids, added, raw_cache, full_scan):
+      full_scan = True nach Abgleich per getrawmempool false (Start, Block, Sequenz-Lücke, Intervall)
+      → Aufrufer prüft dann den ganzen Mempool auf ungesehene TXs, sonst nur added.
+    """
+    global _ZMQ_LISTENER, _ZMQ_MEMPOOL, _ZMQ_LAST_RECONCILE_TS
+
+    if _ZMQ_LISTENER is None or not _ZMQ_LISTENER.is_alive():
+        cfg = NODE_CONFIG["node3"]
+        _ZMQ_LISTENER = zmq_mempool.MempoolZmqListener(
+            cfg["zmq_rawtx"], cfg["zmq_sequence"], raw_cache_max=BTC_TOP_ZMQ_RAW_CACHE_MAX
+        )
+        _ZMQ_LISTENER.start()
+        _ZMQ_LAST_RECONCILE_TS = 0   # neuer Listener → Events davor fehlen
+
+    delta = _ZMQ_LISTENER.drain()
+    _ZMQ_MEMPOOL.update(delta["added"])
+    _ZMQ_MEMPOOL.difference_update(delta["removed"])
+
+    full_scan = (
+        delta["blocks"] > 0
+        or delta["gap"]
+        or time.time() - _ZMQ_LAST_RECONCILE_TS >= BTC_TOP_ZMQ_RECONCILE_INTERVAL
+    )
+    if full_scan:
+        # günstig: nur txids, kein verbose JSON
+        _ZMQ_MEMPOOL = set(RPC.call("getrawmempool", [False]) or [])
+        _ZMQ_LAST_RECONCILE_TS = time.time()
+
+    return _ZMQ_MEMPOOL, delta["added"], delta["raw"], full_scan
+
+
+# =========================
+# 🧊 Kaltstart
+# =========================
+def renew_lock(worker_pid) -> bool:
+    """Lock-TTL verlängern, solange er noch diesem Prozess gehört."""
+    cur = r.get(BTC_TOP_LOCK_KEY)
+    if cur and (cur.decode() if isinstance(cur, bytes) else cur) == str(worker_pid):
+        r.expire(BTC_TOP_LOCK_KEY, BTC_TOP_LOCK_TTL)
+        return True
+    return False
+
+
+def start_bootstrap(mempool_txids) -> dict:
+    """Seen-Index leer (Redis-Flush / Erststart): Snapshot von Disk zurückspielen, nur noch im Mempool liegende TXs."""
+    t0 = time.time()
+    try:
+        restored = seen_index.restore(r, BTC_TOP_SEEN_INDEX_SNAPSHOT_PATH, mempool_txids)
+    except Exception as e:
+        print(f"[BTC_TOP BOOTSTRAP] restore failed: {e}")
+        restored = 0
+
+    print(
+        f"[BTC_TOP BOOTSTRAP] Seen-Index leer → {restored} TXs aus Snapshot "
+        f"wiederhergestellt ({int((time.time() - t0) * 1000)}ms), Rest wird nachgeladen"
+    )
+    return {"started": t0, "restored": restored, "total": 0, "fetched": 0, "pending": 0}
+
+
+def save_seen_snapshot(force: bool = False) -> None:
+    global _LAST_SEEN_SNAPSHOT_TS
+    if not force and time.time() - _LAST_SEEN_SNAPSHOT_TS < BTC_TOP_SEEN_SNAPSHOT_INTERVAL:
+        return
+    try:
+        t0 = time.time()
+        count = seen_index.dump(r, BTC_TOP_SEEN_INDEX_SNAPSHOT_PATH)
+        print(f"[BTC_TOP] Seen-Index Snapshot: {count} TXs ({int((time.time() - t0) * 1000)}ms)")
+    except Exception as e:
+        print(f"[BTC_TOP] Seen-Index Snapshot failed: {e}")
+    _LAST_SEEN_SNAPSHOT_TS = time.time()
+
+
+# =========================
+# 🧱 Projected Blocks
+# =========================
+def publish_projected_blocks(mempool: dict):
+    """Projektion aus dem ohnehin geholten getrawmempool-true-Snapshot. Returns compute_ms oder None."""
+    try:
+        proj = projected_blocks.project(mempool, max_blocks=MEMPOOL_PROJECTED_BLOCKS_COUNT)
+        r.set(MEMPOOL_PROJECTED_BLOCKS_KEY, json.dumps(proj, separators=(",", ":")))
+        return proj["compute_ms"]
+    except Exception as e:
+        print(f"[BTC_TOP] projected blocks failed: {e}")
+        return None
 
 
 def update_btc_top():
-    """Scannt den Mempool und aktualisiert die Top-Liste inkl. SEEN_VALUE"""
+    """Scannt den Mempool und aktualisiert die Top-Liste inkl. Seen-Index"""
     worker_pid = os.getpid()
     
     # Lock setzen
@@ -138,49 +386,83 @@ def update_btc_top():
 
 
     try:
-        # Mempool abfragen
-        mempool = RPC.call("getrawmempool", [True])
-        if not mempool:
-            return
-
-        mempool_items = list(mempool.items())
-        mempool_txids = set(txid for txid, _ in mempool_items)
-
-        # Seen-Set aus Redis
-        seen_raw = r.smembers(BTC_TOP_SEEN_KEY) or set()
-        seen = set(x.decode() if isinstance(x, bytes) else x for x in seen_raw)
-
-        # Entferne TXs, die nicht mehr im Mempool sind
-        for tx in list(seen):
-            if tx not in mempool_txids:
-                r.srem(BTC_TOP_SEEN_KEY, tx)
-                r.hdel(BTC_TOP_SEEN_VALUE_KEY, tx)
-                seen.remove(tx)
+        mode = ingest_mode()
+
+        if mode == "zmq":
+            # Mempool aus Events; getrawmempool false nur beim Abgleich
+            mempool_txids, zmq_added, zmq_raw, full_scan = zmq_ingest()
+            mempool_items = None
+            fetch_chunk = lambda chunk: _fetch_chunk_zmq(zmq_raw, chunk)
+        else:
+            # Mempool abfragen
+            mempool = RPC.call("getrawmempool", [True])
+            if not mempool:
+                return
+
+            mempool_items = list(mempool.items())
+            mempool_txids = set(txid for txid, _ in mempool_items)
+            fetch_chunk = _fetch_chunk_poll
+
+        mempool_size = len(mempool_txids)
+
+        # Seen-Index aus Redis (Binär-txids → hex)
+        seen = seen_index.txids(r)
+
+        # Kaltstart: Index leer, Mempool nicht → Restore von Disk, Delta in großen Batches
+        global _BOOTSTRAP
+        if not seen and mempool_size and _BOOTSTRAP is None:
+            _BOOTSTRAP = start_bootstrap(mempool_txids)
+            seen = seen_index.txids(r)
+        bootstrap = _BOOTSTRAP
+
+        # Entferne TXs, die nicht mehr im Mempool sind (HDEL + laufende Summen, eine Pipeline)
+        evicted = [tx for tx in seen if tx not in mempool_txids]
+        if evicted:
+            pipe = r.pipeline(transaction=False)
+            for i in range(0, len(evicted), SEEN_PIPE_CHUNK):
+                seen_index.remove(r, evicted[i:i + SEEN_PIPE_CHUNK], client=pipe)
+            pipe.execute()
+            seen.difference_update(evicted)
 
         # Aktuelle Top-Liste aus Redis
         raw_top = r.get(BTC_TOP_TXS_KEY)
-        current_top = []
+        current_top_raw = []
         if raw_top:
             try:
                 data = json.loads(raw_top)
-                current_top = data.get("top10", [])
+                current_top_raw = data.get("top10", [])
             except Exception:
-                current_top = []
+                current_top_raw = []
 
-        current_top = sorted(current_top, key=lambda x: x["btc_value"], reverse=True)[:BTC_TOP_TOP_N]
+        current_top = TopN(BTC_TOP_TOP_N)
+        current_top.extend(sorted(current_top_raw, key=lambda x: x["btc_value"], reverse=True))
 
-        # Top50-Ever laden
-        try:
-            with open(BTC_TOP_50_EVER_PATH, "r") as f:
-                top50_ever = json.load(f)
-        except Exception:
-            top50_ever = []
-
-        top50_ever = sorted(top50_ever, key=lambda x: x["btc_value"], reverse=True)[:BTC_TOP_TOP_N]
-        ever_seen = set(tx["txid"] for tx in top50_ever)
+        # Top50-Ever (In-Memory, Disk nur beim ersten Zyklus)
+        top50_ever = _TOP50_EVER if _TOP50_EVER is not None else load_top50_ever()
 
         # Kandidaten: TXs, die noch nicht gesehen oder in top-ever
-        candidates = [(txid, info) for txid, info in mempool_items if txid not in seen and txid not in ever_seen]
+        global _CARRY_OVER
+        if mempool_items is not None:
+            candidates = [(txid, info) for txid, info in mempool_items if txid not in seen and txid not in top50_ever]
+        else:
+            # ZMQ: nach Abgleich der ganze Mempool, sonst nur Übertrag + neue Events (info via getmempoolentry)
+            source = mempool_txids if full_scan else dict.fromkeys([*_CARRY_OVER, *zmq_added])
+            candidates = [
+                (txid, None) for txid in source
+                if txid in mempool_txids and txid not in seen and txid not in top50_ever
+            ]
+
+        # Priority-Queue: große TXs zuerst, Aging ab erstem Einreihen gegen Verhungern
+        # (ZMQ ohne Metadaten: Raw-Länge als Größe)
+        queued_now = time.time()
+        queue = CandidateQueue(
+            candidates,
+            now=queued_now,
+            aging_vb_per_s=BTC_TOP_PRIORITY_AGING_VB_PER_S,
+            size_hints={txid: len(raw) for txid, raw in zmq_raw.items()} if mode == "zmq" else None,
+            queued_at=_CARRY_OVER,
+            aging_max_vb=BTC_TOP_PRIORITY_AGING_MAX_VB,
+        )
 
         rpc_fetched = 0
         today_txid_history_path = os.path.join(
@@ -188,38 +470,61 @@ def update_btc_top():
             f"all_mempool_seen_{time.strftime('%Y%m%d', time.gmtime())}.jsonl" # ZEIT ist in UTC!!!
         )
 
-        for txid, info in candidates:
-            tx_detail = RPC.call("getrawtransaction", [txid, True])
-            if not tx_detail:
+        # Puffer pro Zyklus: Redis-Mutationen + JSONL-Zeilen werden nach der Schleife gesammelt geschrieben
+        seen_values = {}
+        history_entries = []
+
+        # getrawtransaction als JSON-RPC-Batches, parallel, mit Zeitbudget pro Zyklus
+        carry = []
+        if bootstrap is not None:
+            # Kaltstart: mehr Parallelität + Budget, Lock läuft währenddessen mit
+            fetch_deadline = time.time() + BTC_TOP_BOOTSTRAP_BUDGET
+            fetch_workers = BTC_TOP_BOOTSTRAP_FETCH_WORKERS
+            heartbeat = lambda: renew_lock(worker_pid)
+            if not bootstrap["total"]:
+                bootstrap["total"] = len(candidates)
+        else:
+            fetch_deadline = time.time() + BTC_TOP_FETCH_BUDGET
+            fetch_workers = BTC_TOP_FETCH_WORKERS
+            heartbeat = None
+
+        rpc_errors = 0
+        decode_errors = 0
+        wait_s = []     # Mempool-Eintritt ("time") → geholt
+
+        for txid, info, reply in fetch_candidates(
+            queue, fetch_deadline, carry, fetch_chunk, fetch_workers, heartbeat
+        ):
+            raw_hex = reply["result"]
+            if reply["error"] or not raw_hex:
+                # z. B. TX inzwischen gemined/verdrängt → nächster Zyklus entscheidet
+                rpc_errors += 1
                 continue
 
-            btc_value = sum(vout.get("value", 0) for vout in tx_detail.get("vout", []))
+            try:
+                tx_detail = rawtx.parse(raw_hex, with_script_types=False)
+            except rawtx.RawTxError as e:
+                print(f"[BTC_TOP] rawtx decode failed {txid}: {e}")
+                decode_errors += 1
+                continue
 
-            # Top-Liste aktualisieren
-            if len(current_top) < BTC_TOP_TOP_N or btc_value > current_top[-1]["btc_value"]:
-                current_top.append({"txid": txid, "btc_value": btc_value})
-                current_top = sorted(current_top, key=lambda x: x["btc_value"], reverse=True)[:BTC_TOP_TOP_N]
+            value_sat = tx_detail["value_sat"]
+            btc_value = value_sat / rawtx.SATS_PER_BTC
 
-            # Top50-Ever aktualisieren
-            if len(top50_ever) < BTC_TOP_TOP_N or btc_value > top50_ever[-1]["btc_value"]:
-                top50_ever.append({"txid": txid, "btc_value": btc_value})
-                top50_ever = sorted(top50_ever, key=lambda x: x["btc_value"], reverse=True)[:BTC_TOP_TOP_N]
-                ever_seen.add(txid)
+            # Top-Liste / Top50-Ever aktualisieren (Min-Heap, O(log N))
+            top_entry = {"txid": txid, "btc_value": btc_value}
+            current_top.push(top_entry)
+            top50_ever.push(top_entry)
 
-            # TX als gesehen markieren
-            r.sadd(BTC_TOP_SEEN_KEY, txid)
-
-            # Neu: SEEN_VALUE mit Value + Timestamp
-            seen_value_entry = {
-                "btc_value": btc_value,
-                "timestamp_ms": int(time.time() * 1000)
-            }
-            r.hset(BTC_TOP_SEEN_VALUE_KEY, txid, json.dumps(seen_value_entry))
+            # TX als gesehen markieren: Value (sat) + First-Seen (gepuffert)
+            seen_values[txid] = (value_sat, int(time.time() * 1000))
 
             rpc_fetched += 1
+            if info and info.get("time"):
+                wait_s.append(max(0.0, time.time() - info["time"]))
 
             # JSONL Logging
-            weight = tx_detail.get("weight", 0)
+            weight = tx_detail["weight"]
 
             fee_btc = info.get("fees", {}).get("base", 0) or 0
             fee_sat = int(fee_btc * 100_000_000)  # BTC → Satoshi
@@ -230,39 +535,130 @@ def update_btc_top():
                 "btc_value": round(btc_value, 8),
                 "weight": weight,
                 "fee_sat": fee_sat,
-                "mempool_size": len(mempool)
+                "mempool_size": mempool_size
             }
 
-            with open(today_txid_history_path, "a", buffering=1) as f:
-                f.write(json.dumps(entry) + "\n")
+            history_entries.append(entry)
+
+        # JSONL: ein open() + write() pro Zyklus
+        if history_entries:
+            with open(today_txid_history_path, "a") as f:
+                f.write("".join(json.dumps(e) + "\n" for e in history_entries))
+
+            # Binär-History im Gleichschritt (64 B / TX, ältere Tage liegen nur noch so auf der RAM-Disk)
+            try:
+                txid_history_binary.append_entries(
+                    today_txid_history_path[:-len(".jsonl")] + txid_history_binary.BIN_SUFFIX, history_entries
+                )
+            except Exception as e:
+                print(f"[BTC_TOP] binary history write failed: {e}")
+
+        # Seen-Index in einer Pipeline (HSETNX + laufende Summen)
+        if seen_values:
+            txids = list(seen_values)
+            pipe = r.pipeline(transaction=False)
+            for i in range(0, len(txids), SEEN_PIPE_CHUNK):
+                chunk = txids[i:i + SEEN_PIPE_CHUNK]
+                seen_index.add(r, {t: seen_values[t] for t in chunk}, client=pipe)
+            pipe.execute()
+
+        # Laufende Summen periodisch aus dem Index nachrechnen (auch beim ersten Zyklus)
+        global _LAST_TOTALS_RECONCILE_TS
+        if time.time() - _LAST_TOTALS_RECONCILE_TS >= BTC_TOP_SEEN_TOTALS_RECONCILE_INTERVAL:
+            try:
+                rec = seen_index.reconcile(r)
+                if rec["drift_count"] or rec["drift_sat"]:
+                    print(
+                        f"[BTC_TOP] seen totals reconciled: count={rec['count']} "
+                        f"drift_count={rec['drift_count']} drift_sat={rec['drift_sat']}"
+                    )
+                _LAST_TOTALS_RECONCILE_TS = time.time()
+            except Exception as e:
+                print(f"[BTC_TOP] seen totals reconcile failed: {e}")
+
+        # Event-Bus: Live-Consumer (tx_volume, tx_fees) lesen den Stream,
+        # JSONL bleibt das Archiv
+        if history_entries:
+            try:
+                pipe = r.pipeline(transaction=False)
+                for e in history_entries:
+                    xadd_event(pipe, e)
+                pipe.execute()
+            except Exception as e:
+                print(f"[BTC_TOP] stream xadd failed: {e}")
+
+        _CARRY_OVER = {txid: _CARRY_OVER.get(txid, queued_now) for txid in carry}
+        if carry:
+            print(f"[BTC_TOP] Zeitbudget erreicht → {len(carry)} Kandidaten in den nächsten Zyklus")
+
+        # Kaltstart-Fortschritt; fertig, sobald nichts mehr übertragen wird
+        if bootstrap is not None:
+            bootstrap["fetched"] += rpc_fetched
+            bootstrap["pending"] = len(carry)
+            if not carry:
+                _BOOTSTRAP = None
+                print(
+                    f"[BTC_TOP BOOTSTRAP] fertig: restored={bootstrap['restored']} "
+                    f"fetched={bootstrap['fetched']} in {time.time() - bootstrap['started']:.1f}s"
+                )
+                save_seen_snapshot(force=True)
+        else:
+            save_seen_snapshot()
 
 
         # Nur TXs behalten, die noch im Mempool sind
-        current_top = [tx for tx in current_top if tx["txid"] in mempool_txids]
+        current_top.retain(mempool_txids)
+        top10_items = current_top.items()
+        top50_ever_items = top50_ever.items()
 
         # Ergebnisse in Redis speichern (Top10 + Top50 Ever zusammen)
         r.set(
             BTC_TOP_TXS_KEY,
             json.dumps({
-                "top10": current_top,
-                "top50_ever": top50_ever,
+                "top10": top10_items,
+                "top50_ever": top50_ever_items,
                 "last_updated": time.time()
             }, separators=(",", ":"))
         )
         
-        # Persistenz weiterhin beibehalten (optional, aber sinnvoll)
-        save_top50_ever_if_changed(top50_ever)
+        # Persistenz: nur bei Änderung, atomar
+        save_top50_ever_if_changed(top50_ever_items)
+
+        # Projected Blocks: nur mit verbose Snapshot (Poll-Modus)
+        projection_ms = publish_projected_blocks(mempool) if mempool_items is not None else None
 
         # Monitoring
         t_end = time.time()
         elapsed_ms = int((t_end - t_start) * 1000)
         stats = {
             "last_run_ts": str(time.time()),
-            "mempool_examined": str(len(mempool_items)),
+            "mempool_examined": str(mempool_size),
+            "ingest_mode": mode,
             "candidates_fetched": str(len(candidates)),
             "rpc_fetched": str(rpc_fetched),
+            "rpc_errors": str(rpc_errors),
+            "decode_errors": str(decode_errors),
+            "candidates_pending": str(len(carry)),
+            "projection_ms": str(projection_ms) if projection_ms is not None else "-",
             "scan_time_ms": str(elapsed_ms),
         }
+        # Wartezeit der in diesem Zyklus geholten TXs (0 = nichts geholt)
+        wait_pct = percentiles(wait_s)
+        stats.update({
+            "wait_p50_s": f"{wait_pct.get(50, 0):.1f}",
+            "wait_p90_s": f"{wait_pct.get(90, 0):.1f}",
+            "wait_p99_s": f"{wait_pct.get(99, 0):.1f}",
+            "wait_max_s": f"{max(wait_s, default=0):.1f}",
+        })
+        if bootstrap is not None:
+            stats.update({
+                "bootstrap": "1" if _BOOTSTRAP is not None else "0",
+                "bootstrap_restored": str(bootstrap["restored"]),
+                "bootstrap_total": str(bootstrap["total"]),
+                "bootstrap_fetched": str(bootstrap["fetched"]),
+                "bootstrap_pending": str(bootstrap["pending"]),
+                "bootstrap_elapsed_s": str(int(time.time() - bootstrap["started"])),
+            })
         r.hset(BTC_TOP_STATS_KEY, mapping=stats)
 
     finally:
@@ -313,7 +709,7 @@ def btc_top_worker_loop():
             f"rpc_fetched={rpc_fetched} "    
         )
 
-        time.sleep(sleep_time)
+        BLOCKS.wait(sleep_time)
 
 
 
@@ -0,0 +1,136 @@
+# ================================================================================================================================= #
+# ------------------------------------🔀 SEEN INDEX MIGRATION (SEEN-SET + SEEN_VALUE-JSON → BINÄR-INDEX)----------------------------
+# ================================================================================================================================= #
+#
+# Einmalige Umstellung auf core/seen_index.py:
+#
+#   BTC_TOP_SEEN_KEY        SET  hex-txid                                   ┐
+#   BTC_TOP_SEEN_VALUE_KEY  HASH hex-txid → {"btc_value", "timestamp_ms"}   ┘ → BTC_TOP_SEEN_INDEX_KEY (32 B → 16 B)
+#
+# Bereits vorhandene Index-Einträge bleiben unverändert (HSETNX). SET-Members ohne Value
+# werden mit 0 sat übernommen (gelten weiter als gesehen). Danach Summen nachrechnen,
+# Altbestand löschen (außer --keep-old).
+#
+# ⚠️ btc_top_worker vorher stoppen.
+#
+#   python -m workers.services.migrate.seen_index_migrate [--keep-old] [--dry-run]
+# ================================================================================================================================= #
+
+import sys
+import json
+import time
+import argparse
+
+import redis
+
+from core import seen_index
+from core.redis_keys import (
+    BTC_TOP_SEEN_KEY,
+    BTC_TOP_SEEN_VALUE_KEY,
+    BTC_TOP_SEEN_INDEX_KEY,
+)
+
+BATCH = 5000
+
+
+def _d(x):
+    return x.decode() if isinstance(x, (bytes, bytearray)) else x
+
+
+def _memory_usage(r, key):
+    try:
+        return r.memory_usage(key) or 0
+    except Exception:
+        return 0
+
+
+def _flush(r, batch: dict) -> None:
+    if not batch:
+        return
+    pipe = r.pipeline(transaction=False)
+    seen_index.add(r, batch, client=pipe)
+    pipe.execute()
+    batch.clear()
+
+
+def migrate(keep_old: bool = False, dry_run: bool = False) -> dict:
+    r = redis.Redis(host="localhost", port=6379, db=0, decode_responses=False)
+
+    mem_before = _memory_usage(r, BTC_TOP_SEEN_KEY) + _memory_usage(r, BTC_TOP_SEEN_VALUE_KEY)
+    now_ms = int(time.time() * 1000)
+
+    migrated = 0
+    invalid = 0
+    with_value = set()
+    batch = {}
+
+    for txid, raw in r.hscan_iter(BTC_TOP_SEEN_VALUE_KEY, count=BATCH):
+        txid = _d(txid)
+        try:
+            entry = json.loads(_d(raw))
+            value_sat = seen_index.btc_to_sat(entry.get("btc_value", 0))
+            first_seen_ms = int(entry.get("timestamp_ms") or now_ms)
+            seen_index.txid_field(txid)
+        except Exception:
+            invalid += 1
+            continue
+
+        with_value.add(txid)
+        migrated += 1
+        if not dry_run:
+            batch[txid] = (value_sat, first_seen_ms)
+            if len(batch) >= BATCH:
+                _flush(r, batch)
+
+    set_only = 0
+    for txid in r.sscan_iter(BTC_TOP_SEEN_KEY, count=BATCH):
+        txid = _d(txid)
+        if txid in with_value:
+            continue
+        try:
+            seen_index.txid_field(txid)
+        except ValueError:
+            invalid += 1
+            continue
+
+        set_only += 1
+        if not dry_run:
+            batch[txid] = (0, now_ms)
+            if len(batch) >= BATCH:
+                _flush(r, batch)
+
+    summary = {
+        "migrated": migrated,
+        "set_only": set_only,
+        "invalid": invalid,
+        "mem_before": mem_before,
+    }
+
+    if dry_run:
+        print(f"[SEEN_INDEX MIGRATE] dry-run → nothing written | {summary}")
+        return summary
+
+    _flush(r, batch)
+    totals = seen_index.reconcile(r)
+
+    if not keep_old:
+        r.delete(BTC_TOP_SEEN_KEY, BTC_TOP_SEEN_VALUE_KEY)
+
+    summary["count"] = totals["count"]
+    summary["mem_after"] = _memory_usage(r, BTC_TOP_SEEN_INDEX_KEY)
+
+    print(f"[SEEN_INDEX MIGRATE] done | {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate btc_top seen set/hash to the binary seen index")
+    parser.add_argument("--keep-old", action="store_true", help="Altbestand (SET + JSON-Hash) nicht löschen")
+    parser.add_argument("--dry-run", action="store_true", help="nur zählen, nichts schreiben")
+    args = parser.parse_args(argv)
+
+    migrate(keep_old=args.keep_old, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
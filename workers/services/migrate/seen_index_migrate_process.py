@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+# ===============================
+# 🔧 Projekt-Root setzen
+# ===============================
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../../")
+)
+sys.path.insert(0, PROJECT_ROOT)
+
+# ===============================
+# 🔗 Migration importieren
+# ===============================
+from workers.services.migrate.seen_index_migrate import main
+
+
+if __name__ == "__main__":
+    print("[SEEN_INDEX_MIGRATE PROCESS] started")
+
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print("[SEEN_INDEX_MIGRATE PROCESS] stopped by Ctrl+C")
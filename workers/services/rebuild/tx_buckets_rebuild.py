@@ -0,0 +1,399 @@
+# ================================================================================================================================= #
+# ------------------------------------♻️ TX BUCKETS REBUILD (VOLUME + FEES AUS TXID-HISTORY)-----------------------------------------
+# ================================================================================================================================= #
+#
+# Baut die Bucket-Historien von btc_tx_volume_worker und btc_tx_fees_worker komplett
+# aus der txid_history neu auf (Snapshot kaputt / Bucket-Definition geändert):
+#
+#   1) ein Tag pro Task (ProcessPool) → Partialsummen pro Bucket
+#      (RAM-.bin per mmap + numpy, sonst Archiv / JSONL Zeile für Zeile)
+#   2) Merge aller Tage → Historie je Zeitfenster + offener Bucket
+#   3) frische Snapshots (Storage-Format) + Redis-Keys schreiben (JSON-Varianten / ZSET wie im Live-Worker)
+#
+# ⚠️ btc_tx_volume_worker und btc_tx_fees_worker vorher stoppen –
+#    sonst überschreiben sie die Redis-Keys mit ihrem alten RAM-State.
+#
+#   python -m workers.services.rebuild.tx_buckets_rebuild [--days N] [--procs N] [--dry-run]
+# ================================================================================================================================= #
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+import redis
+
+from core import txid_archive, txid_history_binary
+from core.bucket_aggregator import BucketAggregator
+from core.tx_event_stream import TxEventCursor
+from core.redis_keys import (
+    BTC_TX_VOLUME_OPEN_BUCKETS,
+    BTC_TX_VOLUME_TAIL_STATE,
+    BTC_TX_FEES_OPEN_BUCKETS,
+    BTC_TX_FEES_TAIL_STATE,
+)
+from workers.metrics.btc_tx_volume import btc_tx_volume_worker as volume_worker
+from workers.metrics.btc_tx_fees import btc_tx_fees_worker as fees_worker
+
+
+# =========================
+# Paths
+# =========================
+RAM_DIR = "/raid/data/ramdisk_bitcoin_dashboard/txid_history"   # heute (+ noch nicht persistierte Tage)
+ARCHIVE_DIR = "/raid/data/bitcoin_dashboard/txid_history"        # NVMe: zstd-Archiv / Raw-Kopie
+
+VOLUME_SNAPSHOT_DIR = volume_worker.SNAPSHOT_DIR
+FEES_SNAPSHOT_DIR = fees_worker.FEE_SNAPSHOT_DIR
+
+# Bucket-Definitionen direkt aus den Workern → Rebuild folgt jeder Änderung dort
+VOLUME_BUCKET_MS = {name: cfg["bucket_ms"] for name, cfg in volume_worker.BUCKETS.items()}
+FEES_BUCKET_MS = {name: cfg["bucket_ms"] for name, cfg in fees_worker.BUCKETS.items()}
+
+
+# =========================
+# Day Source
+# =========================
+def _iter_day_events(day: str):
+    """
+    Finalisierte Tage aus dem Archiv (enthält RAM + NVMe + Segmente),
+    sonst die RAM-Datei (aktueller als die 20-min-Kopie), sonst die NVMe-Raw-Kopie.
+    """
+    if txid_archive.available() and txid_archive.is_finalized(ARCHIVE_DIR, day):
+        yield from txid_archive.iter_day(ARCHIVE_DIR, day)
+        return
+
+    ram = txid_archive.raw_path(RAM_DIR, day)
+    if os.path.exists(ram):
+        yield from txid_archive.iter_day(RAM_DIR, day)
+        return
+
+    yield from txid_archive.iter_day(ARCHIVE_DIR, day)
+
+
+def _load_day_records(day: str):
+    """
+    RAM-.bin als numpy-View (load_day), wenn sie den Tag vollständig enthält:
+    JSONL schon abgeräumt (Storage prüft covers_jsonl vorher) oder .bin ≥ JSONL-Zeilen. Sonst None.
+    """
+    if txid_history_binary.np is None:
+        return None
+
+    path = txid_history_binary.day_path(RAM_DIR, day)
+    if not os.path.exists(path):
+        return None
+
+    jsonl = txid_archive.raw_path(RAM_DIR, day)
+    if os.path.exists(jsonl) and not txid_history_binary.covers_jsonl(path, jsonl):
+        return None
+
+    return txid_history_binary.load_day(path)
+
+
+def _sum_by_bucket(ts, values, size: int) -> dict:
+    np = txid_history_binary.np
+    starts, inverse = np.unique((ts // size) * size, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    return dict(zip(starts.tolist(), sums.tolist()))
+
+
+def _aggregate_records(day: str, records, volume_bucket_ms: dict, fees_bucket_ms: dict, t0: float) -> dict:
+    """aggregate_day auf der Binär-View: gleiche Dedupe-Regel (accepted_indices), vektorisiert."""
+    rows = records[txid_history_binary.accepted_indices(records)]
+    ts = rows["timestamp_ms"].astype("int64")
+
+    vol = rows["value_sat"] > 0
+    vol_ts = ts[vol]
+    vol_btc = rows["value_sat"][vol] / txid_history_binary.SATS_PER_BTC
+    volume = {name: _sum_by_bucket(vol_ts, vol_btc, size) for name, size in volume_bucket_ms.items()}
+
+    fee_mask = (rows["fee_sat"] > 0) & (rows["weight"] > 0)
+    fee_ts = ts[fee_mask]
+    fee_sat = rows["fee_sat"][fee_mask].astype("float64")
+    vbytes = rows["weight"][fee_mask] / 4
+    fees = {}
+    for name, size in fees_bucket_ms.items():
+        fee_sums = _sum_by_bucket(fee_ts, fee_sat, size)
+        vb_sums = _sum_by_bucket(fee_ts, vbytes, size)
+        fees[name] = {b: [int(round(fee_sums[b])), vb_sums[b]] for b in fee_sums}
+
+    return {
+        "day": day,
+        "events": int(len(rows)),
+        "last_ts_ms": int(ts.max()) if len(ts) else 0,
+        "volume": volume,
+        "fees": fees,
+        "elapsed_s": round(time.time() - t0, 2),
+    }
+
+
+# =========================
+# Map: ein Tag → Partialsummen
+# =========================
+def aggregate_day(day: str, volume_bucket_ms: dict, fees_bucket_ms: dict) -> dict:
+    """
+    Läuft im Worker-Prozess. Semantik identisch zu den Live-Workern:
+      volume: SUM(btc_value) pro Bucket (nur btc_value > 0)
+      fees:   SUM(fee_sat) / SUM(vbytes) pro Bucket (nur fee_sat > 0 und weight > 0)
+    """
+    t0 = time.time()
+
+    records = _load_day_records(day)
+    if records is not None:
+        return _aggregate_records(day, records, volume_bucket_ms, fees_bucket_ms, t0)
+
+    volume = {name: {} for name in volume_bucket_ms}
+    fees = {name: {} for name in fees_bucket_ms}
+
+    # gleiche Dedupe-Regel wie die Live-Worker: (timestamp_ms, txid) hinter dem Cursor
+    cursor = TxEventCursor()
+    events = 0
+    last_ts_ms = 0
+
+    for e in _iter_day_events(day):
+        try:
+            if not cursor.accept(e):
+                continue
+            ts = cursor.last_ts_ms
+
+            val = float(e.get("btc_value", 0.0))
+            fee = int(e.get("fee_sat", 0))
+            weight = int(e.get("weight", 0))
+        except Exception:
+            continue
+
+        events += 1
+        if ts > last_ts_ms:
+            last_ts_ms = ts
+
+        if val > 0:
+            for name, size in volume_bucket_ms.items():
+                b = (ts // size) * size
+                volume[name][b] = volume[name].get(b, 0.0) + val
+
+        if fee > 0 and weight > 0:
+            vbytes = weight / 4
+            for name, size in fees_bucket_ms.items():
+                b = (ts // size) * size
+                acc = fees[name].get(b)
+                if acc is None:
+                    fees[name][b] = [fee, vbytes]
+                else:
+                    acc[0] += fee
+                    acc[1] += vbytes
+
+    return {
+        "day": day,
+        "events": events,
+        "last_ts_ms": last_ts_ms,
+        "volume": volume,
+        "fees": fees,
+        "elapsed_s": round(time.time() - t0, 2),
+    }
+
+
+# =========================
+# Reduce
+# =========================
+def merge_partials(partials) -> dict:
+    volume = {name: {} for name in VOLUME_BUCKET_MS}
+    fees = {name: {} for name in FEES_BUCKET_MS}
+    last_ts_ms = 0
+
+    # Buckets an Tagesgrenzen (1y = 1d, Events kurz nach Mitternacht im Vortag) → addieren
+    for p in partials:
+        last_ts_ms = max(last_ts_ms, p["last_ts_ms"])
+
+        for name, buckets in p["volume"].items():
+            dst = volume[name]
+            for b, v in buckets.items():
+                dst[b] = dst.get(b, 0.0) + v
+
+        for name, buckets in p["fees"].items():
+            dst = fees[name]
+            for b, (fee, vb) in buckets.items():
+                acc = dst.get(b)
+                if acc is None:
+                    dst[b] = [fee, vb]
+                else:
+                    acc[0] += fee
+                    acc[1] += vb
+
+    return {"last_ts_ms": last_ts_ms, "volume": volume, "fees": fees}
+
+
+def _split_open(buckets: dict, bucket_ms: int, window_ms: int, now_ms: int):
+    """Sortierte, auf das Fenster gekürzte Historie + noch offener Bucket (falls vorhanden)."""
+    cutoff = now_ms - window_ms
+    starts = sorted(b for b in buckets if b >= cutoff)
+
+    open_start = None
+    if starts and starts[-1] + bucket_ms > now_ms:
+        open_start = starts.pop()
+
+    return starts, open_start
+
+
+def build_volume_state(merged: dict, now_ms: int):
+    buckets_out = {}
+    open_buckets = {}
+
+    for name, cfg in volume_worker.BUCKETS.items():
+        sums = merged["volume"][name]
+        starts, open_start = _split_open(sums, cfg["bucket_ms"], cfg["window_ms"], now_ms)
+
+        buckets_out[name] = {"history": [{"x": b, "y": sums[b]} for b in starts]}
+        if open_start is not None:
+            open_buckets[name] = {"cur_bucket": open_start, "bucket_sum": sums[open_start]}
+
+    return buckets_out, open_buckets
+
+
+def build_fees_state(merged: dict, now_ms: int):
+    buckets_out = {}
+    open_buckets = {}
+
+    for name, cfg in fees_worker.BUCKETS.items():
+        sums = merged["fees"][name]
+        starts, open_start = _split_open(sums, cfg["bucket_ms"], cfg["window_ms"], now_ms)
+
+        buckets_out[name] = {
+            "history": [
+                {"x": b, "y": round(sums[b][0] / sums[b][1], 2)}
+                for b in starts
+                if sums[b][1] > 0
+            ]
+        }
+        if open_start is not None:
+            fee, vb = sums[open_start]
+            open_buckets[name] = {"cur_bucket": open_start, "sum_fee": fee, "sum_vbytes": vb}
+
+    return buckets_out, open_buckets
+
+
+# =========================
+# Output
+# =========================
+def write_snapshot(snapshot_dir: str, prefix: str, last_ts_ms: int, buckets: dict, open_buckets: dict) -> str:
+    """Gleiches Format wie der Storage-Worker → Warmstart der Worker liest es direkt."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    day = time.strftime("%Y-%m-%d", time.gmtime())
+    path = os.path.join(snapshot_dir, f"{prefix}{day}.json")
+    tmp = path + ".tmp"
+
+    payload = {
+        "generated_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "last_ts_ms": last_ts_ms,
+        "buckets": buckets,
+        "rebuilt": True,
+    }
+    if open_buckets:
+        payload["open_buckets"] = open_buckets
+
+    with open(tmp, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+    os.replace(tmp, path)
+    return path
+
+
+def write_redis(r, worker_agg, buckets: dict, open_key: str, open_buckets: dict,
+                tail_state_key: str, now_ms: int) -> None:
+    """
+    Gleicher Publish-Weg wie der Live-Worker (BucketAggregator.republish):
+    JSON + _GZ/_BR/_ETAG (core.chart_payload) und/oder ZSET komplett neu (core.chart_series),
+    je nach CHART_SERIES_MODE.
+    """
+    agg = BucketAggregator(r, worker_agg.buckets, worker_agg.reducer, name=f"{worker_agg.name}][REBUILD")
+    agg.restore({"buckets": buckets, "open_buckets": open_buckets})
+    agg.republish(now_ms)
+
+    pipe = r.pipeline(transaction=True)
+    pipe.set(open_key, json.dumps(open_buckets, separators=(",", ":")))
+
+    # Tail-Position verwerfen → Worker liest nach dem Start ab Tag von last_ts_ms nach
+    pipe.delete(tail_state_key)
+    pipe.execute()
+
+
+# =========================
+# Main
+# =========================
+def rebuild(days_limit: int = 0, procs: int = 0, dry_run: bool = False) -> dict:
+    t0 = time.time()
+
+    days = sorted(
+        set(txid_archive.list_days(ARCHIVE_DIR))
+        | set(txid_archive.list_days(RAM_DIR))
+        | set(txid_history_binary.list_days(RAM_DIR))
+    )
+    if days_limit > 0:
+        days = days[-days_limit:]
+
+    if not days:
+        print("[REBUILD] no txid_history days found → nothing to do")
+        return {}
+
+    procs = procs or os.cpu_count() or 1
+    print(f"[REBUILD] {len(days)} days ({days[0]} → {days[-1]}) | procs={procs}")
+
+    partials = []
+    with ProcessPoolExecutor(max_workers=procs) as pool:
+        futures = [
+            pool.submit(aggregate_day, day, VOLUME_BUCKET_MS, FEES_BUCKET_MS)
+            for day in days
+        ]
+        for fut in futures:
+            p = fut.result()
+            partials.append(p)
+            print(f"[REBUILD] {p['day']}: {p['events']} events in {p['elapsed_s']}s")
+
+    merged = merge_partials(partials)
+    last_ts_ms = merged["last_ts_ms"]
+    now_ms = int(time.time() * 1000)
+
+    vol_buckets, vol_open = build_volume_state(merged, now_ms)
+    fee_buckets, fee_open = build_fees_state(merged, now_ms)
+
+    summary = {
+        "days": len(days),
+        "events": sum(p["events"] for p in partials),
+        "last_ts_ms": last_ts_ms,
+        "volume_points": {n: len(b["history"]) for n, b in vol_buckets.items()},
+        "fees_points": {n: len(b["history"]) for n, b in fee_buckets.items()},
+        "elapsed_s": round(time.time() - t0, 1),
+    }
+
+    if dry_run:
+        print(f"[REBUILD] dry-run → nothing written | {summary}")
+        return summary
+
+    vol_path = write_snapshot(VOLUME_SNAPSHOT_DIR, "btc_tx_volume_", last_ts_ms, vol_buckets, vol_open)
+    fee_path = write_snapshot(FEES_SNAPSHOT_DIR, "btc_tx_fees_", last_ts_ms, fee_buckets, fee_open)
+
+    r = redis.Redis(host="localhost", port=6379, db=0, decode_responses=False)
+    write_redis(r, volume_worker.AGG, vol_buckets,
+                BTC_TX_VOLUME_OPEN_BUCKETS, vol_open, BTC_TX_VOLUME_TAIL_STATE, now_ms)
+    write_redis(r, fees_worker.AGG, fee_buckets,
+                BTC_TX_FEES_OPEN_BUCKETS, fee_open, BTC_TX_FEES_TAIL_STATE, now_ms)
+
+    print(f"[REBUILD] snapshots → {os.path.basename(vol_path)}, {os.path.basename(fee_path)}")
+    print(f"[REBUILD] done | {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild tx volume/fees buckets from txid_history")
+    parser.add_argument("--days", type=int, default=0, help="nur die letzten N Tage (0 = alle)")
+    parser.add_argument("--procs", type=int, default=0, help="Prozesse (0 = cpu_count)")
+    parser.add_argument("--dry-run", action="store_true", help="nur rechnen, nichts schreiben")
+    args = parser.parse_args(argv)
+
+    rebuild(days_limit=args.days, procs=args.procs, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+# ===============================
+# 🔧 Projekt-Root setzen
+# ===============================
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../../")
+)
+sys.path.insert(0, PROJECT_ROOT)
+
+# ===============================
+# 🔗 Rebuild importieren
+# ===============================
+from workers.services.rebuild.tx_buckets_rebuild import main
+
+
+if __name__ == "__main__":
+    print("[TX_BUCKETS_REBUILD PROCESS] started")
+
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print("[TX_BUCKETS_REBUILD PROCESS] stopped by Ctrl+C")
@@ -6,9 +6,12 @@ import os
 import re
 import time
 import json
+import glob
 import shutil
 import redis
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from core import txid_archive, txid_history_binary, chart_series
 
 # =============
 # Konfiguration
@@ -18,6 +21,21 @@ INTERVAL_S = 60 * 20  # 20 Minuten (zentraler Takt)
 BASE_DST_DIR = "/raid/data/bitcoin_dashboard"
 LOCK_PATH = os.path.join(BASE_DST_DIR, ".storage_worker.lock")
 
+TXID_SRC_DIR = "/raid/data/ramdisk_bitcoin_dashboard/txid_history"
+TXID_DST_DIR = os.path.join(BASE_DST_DIR, "txid_history")
+TXID_DEGRADED_MARKER_PREFIX = ".degraded_"
+
+# Archivierung: pro Lauf höchstens N Tage (Erst-Deploy mit vielen Alt-Tagen verteilt sich
+# über mehrere Intervalle), fehlgeschlagene Tage erst nach Backoff erneut versuchen
+TXID_ARCHIVE_MAX_DAYS_PER_RUN = 2
+TXID_ARCHIVE_RETRY_BASE_S = INTERVAL_S
+TXID_ARCHIVE_RETRY_MAX_S = 60 * 60 * 24
+# btc_top wählt die Tagesdatei beim Zyklusstart → kurz nach Mitternacht landen noch Appends im Vortag.
+# Ein Tag wird erst finalisiert, wenn Mitternacht + Grace vorbei ist und die RAM-Datei so lange ruht.
+TXID_ARCHIVE_GRACE_S = INTERVAL_S
+# RAM-Disk: JSONL nur für die letzten N Tage (heute + gestern), ältere Tage bleiben dort nur als .bin
+TXID_RAM_JSONL_KEEP_DAYS = 2
+
 
 # =======
 # Locking
@@ -101,10 +119,10 @@ def persist_txid_history():
     (Prefix-Check, Marker-Latch, Segment-Mode)
     """
 
-    SRC_DIR = "/raid/data/ramdisk_bitcoin_dashboard/txid_history"
-    DST_DIR = os.path.join(BASE_DST_DIR, "txid_history")
+    SRC_DIR = TXID_SRC_DIR
+    DST_DIR = TXID_DST_DIR
 
-    DEGRADED_MARKER_PREFIX = ".degraded_"
+    DEGRADED_MARKER_PREFIX = TXID_DEGRADED_MARKER_PREFIX
     FNAME_RE = re.compile(r"^all_mempool_seen_(\d{8})\.jsonl$")
 
     MIN_RAM_BYTES = 1024  # 1 KB Schutzgrenze
@@ -134,8 +152,10 @@ def persist_txid_history():
         if day > today:
             continue
 
-        # Alte Tage: copy-once
+        # Alte Tage: zstd-Archiv (archive_txid_history), Raw copy-once nur ohne zstandard
         if day < today:
+            if txid_archive.available():
+                continue
             if not os.path.exists(dst_main) and os.path.exists(src):
                 atomic_copy(src, dst_main)
                 print(f"[STORAGE][TXID] finalized {fname}")
@@ -186,6 +206,133 @@ def persist_txid_history():
         print(f"[STORAGE][TXID] degraded → segment {os.path.basename(seg)}")
 
 
+# ============================
+# STORAGE_TXID-HISTORY_ARCHIVE
+# ============================
+_ARCHIVE_RETRY = {}   # day → (fehlschläge, nächster Versuch ts)
+
+
+def _archive_failed(day: str, reason: str) -> None:
+    failures = _ARCHIVE_RETRY.get(day, (0, 0))[0] + 1
+    delay = min(TXID_ARCHIVE_RETRY_MAX_S, TXID_ARCHIVE_RETRY_BASE_S * 2 ** (failures - 1))
+    _ARCHIVE_RETRY[day] = (failures, time.time() + delay)
+
+    for path in (txid_archive.archive_path(TXID_DST_DIR, day),
+                 txid_archive.index_path(TXID_DST_DIR, day)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    print(
+        f"[STORAGE][TXID] archive FAILED for {day} ({reason}) → raw data kept, "
+        f"retry #{failures} in {int(delay)}s"
+    )
+
+
+def archive_day(day: str) -> bool:
+    """Einen Tag finalisieren + verifizieren, danach Rohdaten auf NVMe löschen. True = archiviert."""
+    segments = sorted(glob.glob(
+        os.path.join(TXID_DST_DIR, f"all_mempool_seen_{day}.segment_*.jsonl")
+    ))
+    raw_nvme = txid_archive.raw_path(TXID_DST_DIR, day)
+    sources = [txid_archive.raw_path(TXID_SRC_DIR, day), raw_nvme] + segments
+
+    t0 = time.time()
+    lines = txid_archive.finalize_day(sources, TXID_DST_DIR, day)
+
+    if not txid_archive.verify_day(TXID_DST_DIR, day, lines):
+        _archive_failed(day, "verify")
+        return False
+
+    for path in [raw_nvme] + segments + [os.path.join(TXID_DST_DIR, f"{TXID_DEGRADED_MARKER_PREFIX}{day}")]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    _ARCHIVE_RETRY.pop(day, None)
+    size = safe_getsize(txid_archive.archive_path(TXID_DST_DIR, day))
+    print(
+        f"[STORAGE][TXID] archived {day}: {lines} lines, "
+        f"{len(segments)} segments merged, {size} bytes, {time.time() - t0:.1f}s"
+    )
+    return True
+
+
+def _day_settled(day: str, now: float) -> bool:
+    """Tag abgeschlossen: Mitternacht + Grace vorbei und keine Appends mehr in der RAM-Datei seit Grace."""
+    day_end = datetime.strptime(day, "%Y%m%d").replace(tzinfo=timezone.utc).timestamp() + 86400
+    if now < day_end + TXID_ARCHIVE_GRACE_S:
+        return False
+    try:
+        mtime = os.path.getmtime(txid_archive.raw_path(TXID_SRC_DIR, day))
+    except FileNotFoundError:
+        return True
+    return mtime <= now - TXID_ARCHIVE_GRACE_S
+
+
+def archive_txid_history(max_days: int = TXID_ARCHIVE_MAX_DAYS_PER_RUN):
+    """
+    Finalisiert vergangene Tage → zstd-Frames + Sidecar-Index (core.txid_archive).
+    Quellen: RAM-Datei, NVMe-Kopie und degraded Segmente (dedupliziert).
+    Rohdaten auf NVMe werden erst nach erfolgreicher Verifikation gelöscht.
+
+    Nur abgeschlossene Tage (_day_settled): is_finalized sperrt jedes spätere Nachfinalisieren.
+
+    Pro Lauf höchstens max_days Versuche (älteste zuerst); Fehler / Verify-Fehler
+    eines Tages → exponentieller Backoff, die übrigen Tage laufen weiter.
+    """
+    if not txid_archive.available():
+        return
+
+    days = set(txid_archive.list_days(TXID_DST_DIR)) | set(txid_archive.list_days(TXID_SRC_DIR))
+    now = time.time()
+
+    pending = [
+        day for day in sorted(days)
+        if _day_settled(day, now)
+        and not txid_archive.is_finalized(TXID_DST_DIR, day)
+        and _ARCHIVE_RETRY.get(day, (0, 0))[1] <= now
+    ]
+
+    for day in pending[:max_days]:
+        try:
+            archive_day(day)
+        except Exception as e:
+            _archive_failed(day, str(e))
+
+    if len(pending) > max_days:
+        print(f"[STORAGE][TXID] {len(pending) - max_days} days left for the next run")
+
+
+def trim_ram_txid_jsonl(keep_days: int = TXID_RAM_JSONL_KEEP_DAYS):
+    """
+    Ältere RAM-JSONL löschen, sobald der Tag auf NVMe gesichert ist (zstd-Archiv bzw. Raw-Kopie)
+    und die .bin daneben alle Zeilen enthält → die RAM-Disk hält ältere Tage nur noch binär.
+    Ohne vollständige .bin (Deploy-Tag, fehlgeschlagener Binär-Write) bleibt die JSONL bis zum btc_top-Pruning.
+    """
+    first_kept = (datetime.now(timezone.utc) - timedelta(days=keep_days - 1)).strftime("%Y%m%d")
+
+    for day in txid_archive.list_days(TXID_SRC_DIR):
+        jsonl = txid_archive.raw_path(TXID_SRC_DIR, day)
+        if day >= first_kept or not os.path.exists(jsonl):
+            continue
+
+        if txid_archive.available():
+            secured = txid_archive.is_finalized(TXID_DST_DIR, day)
+        else:
+            secured = os.path.exists(txid_archive.raw_path(TXID_DST_DIR, day))
+        if not secured:
+            continue
+
+        if not txid_history_binary.covers_jsonl(txid_history_binary.day_path(TXID_SRC_DIR, day), jsonl):
+            continue
+
+        os.remove(jsonl)
+        print(f"[STORAGE][TXID] RAM jsonl {day} removed (archived, .bin complete)")
+
+
 # ================================================================================================================================= #
 
 
@@ -289,18 +436,11 @@ def persist_btc_tx_volume():
 
     buckets = {}
 
+    # JSON-Blob oder ZSET (CHART_SERIES_MODE = "zset" schreibt keinen Blob)
     for name, key in keys.items():
-        raw = r.get(key)
-        if not raw:
-            continue
-
-        try:
-            data = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
-        except Exception:
-            continue
-
-        if "history" in data and data["history"]:
-            buckets[name] = { "history": data["history"] }
+        history = chart_series.read_history(r, key)
+        if history:
+            buckets[name] = {"history": history}
 
     if not buckets:
         print("[STORAGE][BTC_TX_VOLUME] skip (no data)")
@@ -461,18 +601,11 @@ def persist_btc_tx_fees():
     # ---------------------------
     # 📊 History Buckets
     # ---------------------------
+    # JSON-Blob oder ZSET (CHART_SERIES_MODE = "zset" schreibt keinen Blob)
     for name, key in keys.items():
-        raw = r.get(key)
-        if not raw:
-            continue
-
-        try:
-            data = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
-        except Exception:
-            continue
-
-        if "history" in data and data["history"]:
-            buckets[name] = {"history": data["history"]}
+        history = chart_series.read_history(r, key)
+        if history:
+            buckets[name] = {"history": history}
 
     if not buckets:
         print("[STORAGE][BTC_TX_FEES] skip (no data)")
@@ -583,18 +716,11 @@ def persist_dashboard_traffic():
 
     buckets = {}
 
+    # JSON-Blob oder ZSET (CHART_SERIES_MODE = "zset" schreibt keinen Blob)
     for name, key in keys.items():
-        raw = r.get(key)
-        if not raw:
-            continue
-
-        try:
-            data = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
-        except Exception:
-            continue
-
-        if data.get("history"):
-            buckets[name] = {"history": data["history"]}
+        history = chart_series.read_history(r, key)
+        if history:
+            buckets[name] = {"history": history}
 
     if not buckets:
         print("[STORAGE][DASHBOARD_TRAFFIC] skip (no data)")
@@ -678,13 +804,21 @@ def run_once():
     """
     Führt alle Storage-Jobs auf einmal aus
     """
-    persist_txid_history()
-    persist_btc_volume()
-    persist_btc_tx_volume()
-    persist_btc_tx_amount()
-    persist_btc_tx_fees()
-    persist_dashboard_traffic()
-    
+    for job in (
+        persist_txid_history,
+        archive_txid_history,
+        trim_ram_txid_jsonl,
+        persist_btc_volume,
+        persist_btc_tx_volume,
+        persist_btc_tx_amount,
+        persist_btc_tx_fees,
+        persist_dashboard_traffic,
+    ):
+        # ein fehlschlagender Job darf die übrigen Snapshots nicht blockieren
+        try:
+            job()
+        except Exception as e:
+            print(f"[STORAGE ERROR] {job.__name__}: {e}")
 
 
 def main():